@@ -0,0 +1,37 @@
+# examples/local_agents.py
+import asyncio
+import logging
+import sys
+from limoce import NetworkManager
+from limoce.migration_agent import start_local_agents
+
+async def main(checkpoint_path: str):
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    # Two "nodes" on one machine: agents on 8081 and 8082
+    agents = await start_local_agents("/tmp/limoce_agents", [8081, 8082])
+
+    network_mgr = NetworkManager("127.0.0.1", 8082)
+    network_mgr.register_device("node_8081", "127.0.0.1", 8081)
+    network_mgr.register_device("node_8082", "127.0.0.1", 8082)
+
+    try:
+        result = await network_mgr.transfer_checkpoint(
+            "node_8081",
+            "node_8082",
+            {
+                "migration_id": "local_test",
+                "container_id": "test_container",
+                "checkpoint_path": checkpoint_path
+            }
+        )
+        logger.info(f"Transfer result: {result}")
+        logger.info(f"Connection pool: {network_mgr.pool_stats()}")
+    finally:
+        await network_mgr.close()
+        for agent in agents:
+            await agent.stop()
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1]))
@@ -0,0 +1,34 @@
+# examples/migration_under_load.py
+import asyncio
+import logging
+import sys
+from limoce.benchmark import DynYCSB, FakeContainerManager, LocalTestbed, MigrationUnderLoad
+
+async def main(workload_file: str, service_pid: int):
+    logging.basicConfig(level=logging.INFO)
+    logger = logging.getLogger(__name__)
+
+    # Migrate a fake 256 MB container over a local agent; the database
+    # process stands in for the container and is frozen during downtime
+    container_manager = FakeContainerManager(
+        memory_bytes=256 * 1024 * 1024,
+        dirty_rate=8 * 1024 * 1024,
+        service_pid=service_pid
+    )
+    async with LocalTestbed("/tmp/limoce_under_load", container_manager) as testbed:
+        harness = MigrationUnderLoad(DynYCSB(), testbed.coordinator)
+        for strategy in ("stop_and_copy", "pre_copy"):
+            impact = await harness.run(
+                "redis",
+                workload_file,
+                testbed.SOURCE_ID,
+                testbed.TARGET_ID,
+                "bench_container",
+                migrate_after=20,
+                additional_props={"redis.host": "127.0.0.1", "redis.port": 6379},
+                strategy=strategy
+            )
+            logger.info(f"{strategy}: {impact.to_dict()}")
+
+if __name__ == "__main__":
+    asyncio.run(main(sys.argv[1], int(sys.argv[2])))
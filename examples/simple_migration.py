@@ -55,7 +55,7 @@ async def main():
     finally:
         # Cleanup
         container.remove(force=True)
-        await network_mgr.close_session("source_host")
+        await network_mgr.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
@@ -10,9 +10,11 @@ setup(
         "docker>=5.0.0",
         "aiohttp>=3.8.0",
         "prometheus_client>=0.12.0",
+        "numpy>=1.20.0",
         "pandas>=1.3.0",
         "matplotlib>=3.4.0",
         "seaborn>=0.11.0",
+        "hdrhistogram>=0.10.0",
         "pymongo>=3.12.0",
         "psutil>=5.8.0",
         "paramiko>=2.8.0",
@@ -22,6 +24,13 @@ setup(
             "pytest>=6.0.0",
             "pytest-asyncio>=0.15.0",
             "pytest-cov>=2.12.0",
+        ],
+        "compression": [
+            "lz4>=3.1.0",
+            "zstandard>=0.15.0",
+        ],
+        "columnar": [
+            "pyarrow>=8.0.0",
         ]
     },
     author="Your Name",
@@ -2,6 +2,11 @@
 from .container_manager import ContainerManager
 from .network_manager import NetworkManager
 from .migration_coordinator import MigrationCoordinator
+from .migration_scheduler import MigrationScheduler
+from .cost_model import MigrationCostModel
+from .placement import PlacementEngine
+from .migration_agent import MigrationAgent
+from .failure_detector import PhiAccrualDetector, HeartbeatScheduler
 from .benchmark import DynYCSB, BenchmarkMetrics, MetricsCollector
 from .utils import setup_logging
 
@@ -11,6 +16,12 @@ __all__ = [
     'ContainerManager',
     'NetworkManager',
     'MigrationCoordinator',
+    'MigrationScheduler',
+    'MigrationCostModel',
+    'PlacementEngine',
+    'MigrationAgent',
+    'PhiAccrualDetector',
+    'HeartbeatScheduler',
     'DynYCSB',
     'BenchmarkMetrics',
     'MetricsCollector',
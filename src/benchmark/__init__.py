@@ -1,5 +1,12 @@
 # src/benchmark/__init__.py
 from .dyn_ycsb import DynYCSB
-from .metrics import BenchmarkMetrics, MetricsCollector
+from .columnar import ColumnarTable, read_columnar
+from .metrics import BenchmarkMetrics, MetricsCollector, StatusSample
+from .migration_harness import MigrationImpact, MigrationUnderLoad
+from .fakes import FakeContainerManager, LocalTestbed
 
-__all__ = ['DynYCSB', 'BenchmarkMetrics', 'MetricsCollector']
\ No newline at end of file
+__all__ = [
+    'DynYCSB', 'BenchmarkMetrics', 'MetricsCollector', 'StatusSample',
+    'ColumnarTable', 'read_columnar',
+    'MigrationImpact', 'MigrationUnderLoad', 'FakeContainerManager', 'LocalTestbed'
+]
\ No newline at end of file
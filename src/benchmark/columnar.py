@@ -0,0 +1,232 @@
+# src/benchmark/columnar.py
+import glob
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    pq = None
+
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+FORMATS = (FORMAT_PARQUET, FORMAT_ARROW)
+
+_EXTENSIONS = {FORMAT_PARQUET: ".parquet", FORMAT_ARROW: ".arrow"}
+
+def _require_pyarrow():
+    if pa is None:
+        raise ValueError("Parquet/Arrow output needs pyarrow")
+
+class _Column:
+    """
+    One typed column: float64, int64, datetime64[ns], or strings kept as
+    int32 codes into a list of distinct values. Ints widen to float64 when
+    a float or a missing value arrives.
+    """
+
+    def __init__(self, value, capacity: int):
+        if isinstance(value, str):
+            self.kind = "string"
+            dtype = np.int32
+        elif isinstance(value, (datetime, np.datetime64, pd.Timestamp)):
+            self.kind = "datetime"
+            dtype = "datetime64[ns]"
+        elif isinstance(value, (bool, int, np.integer)):
+            self.kind = "int"
+            dtype = np.int64
+        else:
+            self.kind = "float"
+            dtype = np.float64
+        self.values = np.empty(capacity, dtype=dtype)
+        self.categories: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def fill_missing(self, start: int, end: int):
+        if start >= end:
+            return
+        if self.kind == "int":
+            self._widen()
+        if self.kind == "string":
+            self.values[start:end] = -1
+        elif self.kind == "datetime":
+            self.values[start:end] = np.datetime64("NaT")
+        else:
+            self.values[start:end] = np.nan
+
+    def _widen(self):
+        self.values = self.values.astype(np.float64)
+        self.kind = "float"
+
+    def set(self, index: int, value):
+        if value is None:
+            self.fill_missing(index, index + 1)
+        elif self.kind == "string":
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.categories)
+                self.categories.append(value)
+            self.values[index] = code
+        elif self.kind == "datetime":
+            self.values[index] = np.datetime64(value, "ns")
+        else:
+            if self.kind == "int" and not isinstance(value, (bool, int, np.integer)):
+                self._widen()
+            self.values[index] = value
+
+    def grow(self, capacity: int):
+        values = np.empty(capacity, dtype=self.values.dtype)
+        values[:len(self.values)] = self.values
+        self.values = values
+
+    def to_pandas(self, size: int):
+        if self.kind == "string":
+            return pd.Categorical.from_codes(self.values[:size], self.categories)
+        return self.values[:size].copy()
+
+    def to_arrow(self, size: int):
+        values = self.values[:size]
+        if self.kind == "string":
+            # Missing values have code -1, the trailing None
+            strings = np.array(self.categories + [None], dtype=object)[values]
+            return pa.array(strings, type=pa.string())
+        # NaN and NaT become nulls
+        return pa.array(values, from_pandas=True)
+
+class ColumnarTable:
+    def __init__(self,
+                 path: Optional[str] = None,
+                 format: str = FORMAT_PARQUET,
+                 row_group_size: int = 65536,
+                 initial_capacity: int = 1024):
+        """
+        Append-only table of rows (dicts) kept as typed column arrays.
+        Arrays are preallocated and double when full; a column first seen
+        in a later row is backfilled with missing values.
+
+        With a path, every row_group_size rows are flushed to a new part
+        file in that directory and dropped from memory, so memory stays
+        bounded however long the run is; close() flushes the rest. Parts
+        of a table may differ in columns when new ones turn up later.
+
+        Args:
+            path: Directory part files are written to; in memory only if None
+            format: 'parquet' or 'arrow' (Arrow IPC, memory-mapped on read)
+            row_group_size: Rows per part file
+            initial_capacity: Rows preallocated up front
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format: {format}")
+        if path is not None:
+            _require_pyarrow()
+            os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self.columns: Dict[str, _Column] = {}
+        self.capacity = initial_capacity
+        # Rows in memory, and rows already flushed to part files
+        self.size = 0
+        self.flushed_rows = 0
+        self.parts: List[str] = []
+
+    def __len__(self) -> int:
+        return self.flushed_rows + self.size
+
+    def append(self, row: Dict):
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for column in self.columns.values():
+                column.grow(self.capacity)
+
+        index = self.size
+        for name, value in row.items():
+            column = self.columns.get(name)
+            if column is None:
+                if value is None:
+                    continue
+                column = self.columns[name] = _Column(value, self.capacity)
+                column.fill_missing(0, index)
+            column.set(index, value)
+        for name, column in self.columns.items():
+            if name not in row:
+                column.fill_missing(index, index + 1)
+        self.size += 1
+
+        if self.path is not None and self.size >= self.row_group_size:
+            self.flush()
+
+    def _buffer_to_arrow(self) -> "pa.Table":
+        return pa.table({
+            name: column.to_arrow(self.size) for name, column in self.columns.items()
+        })
+
+    def flush(self):
+        """Write the rows in memory as a new part file."""
+        if self.path is None or self.size == 0:
+            return
+        part = os.path.join(
+            self.path, f"part-{len(self.parts):05d}{_EXTENSIONS[self.format]}"
+        )
+        table = self._buffer_to_arrow()
+        if self.format == FORMAT_PARQUET:
+            pq.write_table(table, part)
+        else:
+            with pa.OSFile(part, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        self.parts.append(part)
+        self.flushed_rows += self.size
+        # Keep the allocated arrays for the next row group
+        self.size = 0
+
+    def close(self):
+        self.flush()
+
+    def to_arrow(self) -> "pa.Table":
+        """Flushed parts (memory-mapped) followed by the rows in memory."""
+        _require_pyarrow()
+        tables = [_read_part(part) for part in self.parts]
+        if self.size or not tables:
+            tables.append(self._buffer_to_arrow())
+        return _concat(tables)
+
+    def to_dataframe(self) -> pd.DataFrame:
+        if self.parts:
+            return self.to_arrow().to_pandas()
+        return pd.DataFrame({
+            name: column.to_pandas(self.size) for name, column in self.columns.items()
+        })
+
+def _read_part(path: str) -> "pa.Table":
+    if path.endswith(_EXTENSIONS[FORMAT_ARROW]):
+        return pa.ipc.open_file(pa.memory_map(path)).read_all()
+    return pq.read_table(path, memory_map=True)
+
+def _concat(tables: List["pa.Table"]) -> "pa.Table":
+    try:
+        return pa.concat_tables(tables, promote_options="permissive")
+    except TypeError:
+        # pyarrow before 14
+        return pa.concat_tables(tables, promote=True)
+
+def read_columnar(path: str) -> "pa.Table":
+    """
+    Read back the part files a ColumnarTable wrote to path, memory-mapped
+    (zero-copy for Arrow IPC parts).
+    """
+    _require_pyarrow()
+    parts = sorted(
+        glob.glob(os.path.join(path, "part-*.parquet")) +
+        glob.glob(os.path.join(path, "part-*.arrow"))
+    )
+    if not parts:
+        return pa.table({})
+    return _concat([_read_part(part) for part in parts])
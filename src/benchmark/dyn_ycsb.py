@@ -1,35 +1,129 @@
 # src/benchmark/dyn_ycsb.py
 import asyncio
 import logging
+import re
+import shutil
+import tempfile
+from collections import deque
 from datetime import datetime
-from typing import List, Tuple, Dict, Optional
+from typing import Callable, List, Tuple, Dict, Optional
 import subprocess
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from .metrics import BenchmarkMetrics, MetricsCollector
+from . import columnar
+from .latency import LatencyHistograms
+from .metrics import (
+    TIMELINE_WINDOW, BenchmarkMetrics, MetricsCollector, StatusSample, merge_metrics
+)
+
+# "2024-05-01 12:00:03:512 3 sec: 2992 operations; 997.3 current ops/sec; ..."
+_STATUS_RE = re.compile(
+    r'(\d+) sec: (\d+) operations;(?: ([\d.]+) current ops/sec;)?'
+)
+# "[READ: Count=998, Max=2345, Min=95, Avg=310.4, 90=512, 99=1022, ...]"
+_OPERATION_RE = re.compile(r'\[([A-Z][A-Z0-9_-]*): ([^\]]*)\]')
+# Older YCSB: "[READ AverageLatency(us)=310.4]"
+_AVERAGE_RE = re.compile(r'\[([A-Z][A-Z0-9_-]*) AverageLatency\(us\)=([\d.]+)\]')
+
+def _split(total: int, parts: int) -> List[int]:
+    """Split total into parts integers differing by at most one."""
+    share, remainder = divmod(total, parts)
+    return [share + (1 if i < remainder else 0) for i in range(parts)]
+
+def read_workload_properties(path: str) -> Dict[str, str]:
+    """Properties of a YCSB workload file (key=value lines)."""
+    properties = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            key, _, value = line.partition('=')
+            properties[key.strip()] = value.strip()
+    return properties
+
+def _parse_status_line(line: str) -> Optional[StatusSample]:
+    """Parse a YCSB -s status line; None for any other line."""
+    match = _STATUS_RE.search(line)
+    if match is None:
+        return None
+    try:
+        timestamp = datetime.strptime(line[:23], '%Y-%m-%d %H:%M:%S:%f')
+    except ValueError:
+        timestamp = datetime.now()
+
+    latencies = {}
+    for operation, fields in _OPERATION_RE.findall(line):
+        values = {}
+        for item in fields.split(','):
+            key, _, value = item.strip().partition('=')
+            try:
+                values[key] = float(value)
+            except ValueError:
+                continue
+        latencies[operation] = values
+    for operation, average in _AVERAGE_RE.findall(line):
+        latencies.setdefault(operation, {})['Avg'] = float(average)
+
+    return StatusSample(
+        timestamp=timestamp,
+        elapsed=int(match.group(1)),
+        operations=int(match.group(2)),
+        throughput=float(match.group(3) or 0.0),
+        latencies=latencies
+    )
 
 class DynYCSB:
-    def __init__(self, ycsb_home: Optional[str] = None):
+    def __init__(self, ycsb_home: Optional[str] = None, metrics_dir: Optional[str] = None):
         """
         Initialize DynYCSB benchmark manager.
         
         Args:
             ycsb_home: Path to YCSB installation directory. If None, will try to use YCSB_HOME env variable.
+            metrics_dir: Directory metrics and status samples are streamed
+                to as Parquet. If None, a temporary directory is used when
+                pyarrow is installed, removed by close(); without pyarrow
+                they are kept in memory, which grows with the length of
+                the run.
         """
         self.ycsb_home = ycsb_home or os.environ.get('YCSB_HOME')
         if not self.ycsb_home:
             raise ValueError("YCSB_HOME not set and not provided")
         
         self.logger = logging.getLogger("limoce.benchmark")
-        self.metrics_collector = MetricsCollector()
+        self._metrics_tempdir: Optional[tempfile.TemporaryDirectory] = None
+        if metrics_dir is None:
+            if columnar.pa is not None:
+                # Also removed when garbage collected or at exit
+                self._metrics_tempdir = tempfile.TemporaryDirectory(prefix="limoce-metrics-")
+                metrics_dir = self._metrics_tempdir.name
+                self.logger.info(f"Streaming benchmark metrics to {metrics_dir}")
+            else:
+                self.logger.warning(
+                    "pyarrow not installed and no metrics_dir given: status samples "
+                    "are kept in memory, which is unbounded on long runs"
+                )
+        self.metrics_dir = metrics_dir
+        self.metrics_collector = MetricsCollector(metrics_dir)
+
+    def close(self):
+        """
+        Flush the collected metrics, and remove them if they were streamed
+        to a temporary directory rather than a given metrics_dir.
+        """
+        self.metrics_collector.close()
+        if self._metrics_tempdir is not None:
+            self._metrics_tempdir.cleanup()
+            self._metrics_tempdir = None
 
     def generate_workload_file(self, 
                              workload_type: str,
                              target_throughput: int,
                              operation_count: int,
-                             filename: str) -> str:
+                             filename: str,
+                             record_count: int = 1000000) -> str:
         """Generate custom workload file."""
         workload_template = {
             'A': {
@@ -67,7 +161,7 @@ class DynYCSB:
         
         with open(workload_path, 'w') as f:
             f.write(f"# Workload {workload_type} configuration\n")
-            f.write("recordcount=1000000\n")
+            f.write(f"recordcount={record_count}\n")
             f.write(f"operationcount={operation_count}\n")
             f.write(f"target={target_throughput}\n")
             
@@ -81,14 +175,42 @@ class DynYCSB:
                              database: str,
                              workload_file: str,
                              phase: str = 'run',
-                             additional_props: Optional[Dict] = None) -> BenchmarkMetrics:
-        """Execute YCSB workload."""
+                             additional_props: Optional[Dict] = None,
+                             status_interval: int = 1,
+                             on_status: Optional[Callable[[StatusSample], None]] = None,
+                             histogram_dir: Optional[str] = None,
+                             timeline_window: int = TIMELINE_WINDOW) -> BenchmarkMetrics:
+        """
+        Execute YCSB workload.
+
+        Status lines are parsed as YCSB prints them, so per-interval
+        throughput and latency are available while the run is going.
+        Latencies are recorded in HdrHistogram logs per operation type and
+        loaded into the returned metrics' latency histograms.
+
+        Args:
+            status_interval: Seconds between YCSB status lines
+            on_status: Called with every StatusSample as it arrives; pass
+                MetricsCollector.add_status to keep the full series
+            histogram_dir: Where to keep the .hdr logs; a temporary
+                directory removed after loading when None
+            timeline_window: Most recent status samples kept in the
+                returned metrics' timeline, so memory stays bounded on
+                long runs
+        """
+        log_dir = histogram_dir or tempfile.mkdtemp(prefix="ycsb-hdr-")
+        os.makedirs(log_dir, exist_ok=True)
+        log_prefix = os.path.join(log_dir, f"{phase}-")
         cmd = [
             os.path.join(self.ycsb_home, 'bin', 'ycsb'),
             phase,
             database,
             '-P', workload_file,
-            '-s'  # Add status flag for progress
+            '-s',  # Add status flag for progress
+            '-p', f"status.interval={status_interval}",
+            '-p', "measurementtype=hdrhistogram",
+            '-p', "hdrhistogram.fileoutput=true",
+            '-p', f"hdrhistogram.output.path={log_prefix}"
         ]
         
         # Add additional properties
@@ -100,60 +222,201 @@ class DynYCSB:
             process = await asyncio.create_subprocess_exec(
                 *cmd,
                 stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+                stderr=asyncio.subprocess.PIPE,
+                limit=1024 * 1024
             )
-            
-            stdout, stderr = await process.communicate()
+
+            timeline = deque(maxlen=timeline_window)
+            summary: List[str] = []
+            # Only the end of stderr is kept, for error reports
+            stderr_tail = deque(maxlen=50)
+
+            async def read_stdout():
+                async for line in process.stdout:
+                    line = line.decode(errors='replace')
+                    # Only the bracketed summary lines are parsed
+                    if line.startswith('['):
+                        summary.append(line)
+
+            async def read_stderr():
+                async for line in process.stderr:
+                    line = line.decode(errors='replace').rstrip()
+                    sample = _parse_status_line(line)
+                    if sample is None:
+                        stderr_tail.append(line)
+                        continue
+                    timeline.append(sample)
+                    if on_status is not None:
+                        on_status(sample)
+
+            await asyncio.gather(read_stdout(), read_stderr())
+            await process.wait()
             
             if process.returncode != 0:
-                self.logger.error(f"Workload execution failed: {stderr.decode()}")
+                errors = '\n'.join(stderr_tail)
+                self.logger.error(f"Workload execution failed: {errors}")
                 raise Exception("Workload execution failed")
 
             # Parse results
-            results = self._parse_ycsb_output(stdout.decode())
+            results = self._parse_ycsb_output(''.join(summary))
+            latency = LatencyHistograms()
+            await asyncio.get_event_loop().run_in_executor(
+                None, latency.load_directory, log_prefix
+            )
+            if latency:
+                overall = latency.summary()
+                results['latency_avg'] = overall['mean']
+                results['latency_95th'] = overall['p95']
+                results['latency_99th'] = overall['p99']
             
             return BenchmarkMetrics(
                 throughput=results.get('throughput', 0),
                 latency_avg=results.get('latency_avg', 0),
                 latency_95th=results.get('latency_95th', 0),
                 latency_99th=results.get('latency_99th', 0),
-                error_count=results.get('error_count', 0)
+                error_count=results.get('error_count', 0),
+                timeline=list(timeline),
+                operations=results.get('operations', {}),
+                latency=latency
             )
             
         except Exception as e:
             self.logger.error(f"Error executing workload: {e}")
             raise
+        finally:
+            if histogram_dir is None:
+                shutil.rmtree(log_dir, ignore_errors=True)
+
+    async def execute_sharded(self,
+                              database: str,
+                              workload_file: str,
+                              clients: int,
+                              target_throughput: int,
+                              operation_count: int,
+                              record_count: int = 1000000,
+                              phase: str = 'run',
+                              additional_props: Optional[Dict] = None,
+                              status_interval: int = 1,
+                              on_status: Optional[Callable[[int, StatusSample], None]] = None,
+                              histogram_dir: Optional[str] = None,
+                              timeline_window: int = TIMELINE_WINDOW) -> BenchmarkMetrics:
+        """
+        Run a workload from several YCSB client processes at once.
+
+        Client i gets its own slice of the keyspace (insertstart and
+        insertcount) and its share of the operations and the target
+        throughput. Their results are merged: throughput and errors add up
+        and latency histograms are combined.
+
+        Args:
+            clients: Client processes to run
+            target_throughput: Total ops/sec across clients (0 for unthrottled)
+            operation_count: Total operations across clients
+            record_count: Records in the keyspace being partitioned
+            on_status: Called with (client index, StatusSample)
+            histogram_dir: Keeps each client's .hdr logs in client-<i>
+            timeline_window: Most recent seconds of merged status samples
+                kept in the returned metrics' timeline
+        """
+        if clients < 1:
+            raise ValueError("At least one YCSB client is needed")
+
+        starts = [0]
+        for count in _split(record_count, clients):
+            starts.append(starts[-1] + count)
+        operations = _split(operation_count, clients)
+        targets = _split(target_throughput, clients)
+
+        runs = []
+        for i in range(clients):
+            props = dict(additional_props or {})
+            props.update({
+                'insertstart': starts[i],
+                'insertcount': starts[i + 1] - starts[i],
+                'operationcount': operations[i]
+            })
+            # Zero means unthrottled to YCSB, so every client targets at
+            # least 1; an unthrottled run overrides the workload file's target
+            props['target'] = max(targets[i], 1) if target_throughput else 0
+            runs.append(self.execute_workload(
+                database,
+                workload_file,
+                phase=phase,
+                additional_props=props,
+                status_interval=status_interval,
+                on_status=(lambda sample, i=i: on_status(i, sample)) if on_status else None,
+                histogram_dir=(os.path.join(histogram_dir, f"client-{i}")
+                               if histogram_dir else None),
+                timeline_window=timeline_window
+            ))
+        return merge_metrics(await asyncio.gather(*runs))
 
     def _parse_ycsb_output(self, output: str) -> Dict:
-        """Parse YCSB output to extract metrics."""
+        """
+        Parse YCSB output to extract metrics.
+
+        Every operation type's summary lines are kept under 'operations'.
+        Overall latency is the count-weighted average over successful
+        operations and the worst per-operation percentiles; execute_workload
+        replaces these with exact figures when histograms are available.
+        Errors are operations that returned anything but OK.
+        """
         results = {}
+        operations: Dict[str, Dict[str, float]] = {}
         
         for line in output.split('\n'):
-            if '[OVERALL]' in line:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    metric = parts[1].strip()
-                    value = float(parts[2].strip())
-                    if 'Throughput' in metric:
-                        results['throughput'] = value
-            elif '[READ]' in line or '[UPDATE]' in line:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    metric = parts[1].strip()
-                    value = float(parts[2].strip())
-                    if 'AverageLatency' in metric:
-                        results['latency_avg'] = value
-                    elif '95thPercentileLatency' in metric:
-                        results['latency_95th'] = value
-                    elif '99thPercentileLatency' in metric:
-                        results['latency_99th'] = value
-            
+            parts = [part.strip() for part in line.split(',')]
+            if len(parts) < 3 or not parts[0].startswith('['):
+                continue
+            section = parts[0].strip('[]')
+            try:
+                value = float(parts[2])
+            except ValueError:
+                continue
+            if section == 'OVERALL':
+                if 'Throughput' in parts[1]:
+                    results['throughput'] = value
+            else:
+                operations.setdefault(section, {})[parts[1]] = value
+
+        # Failed operations are counted under their own type's return codes
+        # and timed again under <TYPE>-FAILED
+        has_returns = any(
+            key.startswith('Return=') for values in operations.values() for key in values
+        )
+        errors = 0
+        weighted = count = 0.0
+        for section, values in operations.items():
+            if has_returns:
+                errors += sum(
+                    v for k, v in values.items() if k.startswith('Return=') and k != 'Return=OK'
+                )
+            elif section.endswith('-FAILED'):
+                errors += values.get('Operations', 0)
+
+            if section.endswith('-FAILED') or section == 'CLEANUP':
+                continue
+            operation_count = values.get('Operations', 0)
+            if 'AverageLatency(us)' in values and operation_count:
+                weighted += values['AverageLatency(us)'] * operation_count
+                count += operation_count
+            for metric, key in (('95thPercentileLatency(us)', 'latency_95th'),
+                                ('99thPercentileLatency(us)', 'latency_99th')):
+                if metric in values:
+                    results[key] = max(results.get(key, 0.0), values[metric])
+
+        if count:
+            results['latency_avg'] = weighted / count
+        results['error_count'] = int(errors)
+        results['operations'] = operations
         return results
 
     async def run_benchmark(self, 
                           database: str,
                           workload_sequence: List[Tuple[str, int, int]],
-                          additional_props: Optional[Dict] = None) -> pd.DataFrame:
+                          additional_props: Optional[Dict] = None,
+                          clients: int = 1,
+                          record_count: int = 1000000) -> pd.DataFrame:
         """
         Run complete benchmark sequence.
         
@@ -161,6 +424,9 @@ class DynYCSB:
             database: Target database (e.g., 'mongodb', 'cassandra')
             workload_sequence: List of (workload_type, duration, target_throughput) tuples
             additional_props: Additional YCSB properties
+            clients: YCSB client processes per workload, sharing its
+                keyspace and target throughput (see execute_sharded)
+            record_count: Records in the keyspace
         """
         for idx, (workload_type, duration, target_throughput) in enumerate(workload_sequence):
             self.logger.info(f"Running workload {workload_type} "
@@ -171,15 +437,33 @@ class DynYCSB:
                 workload_type,
                 target_throughput,
                 int(target_throughput * duration),
-                f'workload_{idx}.spec'
+                f'workload_{idx}.spec',
+                record_count
             )
             
-            # Execute workload
-            metrics = await self.execute_workload(
-                database,
-                workload_file,
-                additional_props=additional_props
-            )
+            # Execute workload, recording status samples as they arrive
+            if clients > 1:
+                metrics = await self.execute_sharded(
+                    database,
+                    workload_file,
+                    clients,
+                    target_throughput,
+                    int(target_throughput * duration),
+                    record_count,
+                    additional_props=additional_props,
+                    on_status=lambda client, sample: self.metrics_collector.add_status(
+                        workload_type, sample, client
+                    )
+                )
+            else:
+                metrics = await self.execute_workload(
+                    database,
+                    workload_file,
+                    additional_props=additional_props,
+                    on_status=lambda sample: self.metrics_collector.add_status(
+                        workload_type, sample
+                    )
+                )
             
             # Record metrics
             self.metrics_collector.add_metrics(
@@ -192,6 +476,7 @@ class DynYCSB:
             if idx < len(workload_sequence) - 1:
                 await asyncio.sleep(1)
                 
+        self.metrics_collector.close()
         return self.metrics_collector.get_dataframe()
 
     def plot_results(self, results: pd.DataFrame):
@@ -216,6 +501,14 @@ class DynYCSB:
         plt.show()
 
     def save_results(self, results: pd.DataFrame, filename: str):
-        """Save benchmark results to file."""
-        results.to_csv(filename, index=False)
+        """
+        Save benchmark results to file: Parquet, Arrow IPC (.arrow,
+        .feather) or CSV, by extension.
+        """
+        if filename.endswith('.parquet'):
+            results.to_parquet(filename, index=False)
+        elif filename.endswith(('.arrow', '.feather')):
+            results.to_feather(filename)
+        else:
+            results.to_csv(filename, index=False)
         self.logger.info(f"Results saved to {filename}")
\ No newline at end of file
@@ -0,0 +1,267 @@
+# src/benchmark/fakes.py
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, List, Optional
+from ..migration_agent import MigrationAgent, start_local_agents
+from ..migration_coordinator import MigrationCoordinator
+from ..network_manager import NetworkManager
+from ..prometheus_metrics import MigrationMetrics
+
+# Metadata images CRIU writes next to the memory pages; restores check for
+# inventory, pstree and mm images, pre-dumps only carry pagemap and pages
+_METADATA_IMAGES = ("inventory.img", "pstree.img", "core-1.img", "mm-1.img")
+_WRITE_SIZE = 1024 * 1024
+
+def write_synthetic_images(image_dir: str,
+                           page_bytes: int,
+                           full: bool = True,
+                           dump_rate: Optional[float] = None) -> int:
+    """
+    Write a CRIU-shaped image directory with page_bytes of random memory
+    pages, at most dump_rate bytes/sec. Only pagemap and pages images
+    when not full (a pre-dump). Returns the bytes written.
+    """
+    os.makedirs(image_dir, exist_ok=True)
+    start = time.monotonic()
+    written = 0
+
+    # Pages first so the small images (closed last, as with CRIU) trail
+    with open(os.path.join(image_dir, "pages-1.img"), "wb") as f:
+        while written < page_bytes:
+            size = min(_WRITE_SIZE, page_bytes - written)
+            f.write(os.urandom(size))
+            written += size
+            if dump_rate:
+                ahead = written / dump_rate - (time.monotonic() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+    with open(os.path.join(image_dir, "pagemap-1.img"), "wb") as f:
+        f.write(os.urandom(64) + page_bytes.to_bytes(8, "little"))
+    if full:
+        for name in _METADATA_IMAGES:
+            with open(os.path.join(image_dir, name), "wb") as f:
+                f.write(os.urandom(4096))
+    return written
+
+def _free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket() as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+class FakeContainerManager:
+    def __init__(self,
+                 memory_bytes: int = 64 * 1024 * 1024,
+                 dirty_rate: float = 4 * 1024 * 1024,
+                 dump_rate: Optional[float] = None,
+                 restore_rate: Optional[float] = None,
+                 restore_delay: float = 0.05,
+                 service_pid: Optional[int] = None,
+                 service_address: str = "127.0.0.1",
+                 metrics: Optional[MigrationMetrics] = None):
+        """
+        Stand-in for ContainerManager on the migration path, for running
+        migrations on one box without Docker or CRIU.
+
+        Checkpoints write synthetic page images: the whole memory, or what
+        dirty_rate dirtied since the previous dump when building on one.
+        With service_pid, that process is frozen (SIGSTOP) from the final
+        checkpoint until the restore (SIGCONT), so a workload against it
+        sees the downtime a real migration would cause.
+
+        Args:
+            memory_bytes: Memory of every fake container
+            dirty_rate: Bytes/sec the fake containers dirty
+            dump_rate: Bytes/sec images are written at; unthrottled if None
+            restore_rate: Bytes/sec restores read images at; instant if None
+            restore_delay: Fixed seconds every restore takes
+            service_pid: Process standing in for the container's service
+            service_address: Address returned for readiness probes
+        """
+        self.memory_bytes = memory_bytes
+        self.dirty_rate = dirty_rate
+        self.dump_rate = dump_rate
+        self.restore_rate = restore_rate
+        self.restore_delay = restore_delay
+        self.service_pid = service_pid
+        self.service_address = service_address
+        self.metrics = metrics or MigrationMetrics()
+        self.logger = logging.getLogger("limoce.fake")
+
+        # container id -> 'running' or 'frozen'
+        self.states: Dict[str, str] = {}
+        self._last_dump: Dict[str, float] = {}
+        # (event, container id, monotonic time), for tests
+        self.events: List[tuple] = []
+
+    def _dirty_bytes(self, container_id: str, incremental: bool) -> int:
+        last = self._last_dump.get(container_id)
+        self._last_dump[container_id] = time.monotonic()
+        if not incremental or last is None:
+            return self.memory_bytes
+        return min(self.memory_bytes, int(self.dirty_rate * (time.monotonic() - last)))
+
+    def _signal(self, signum: int):
+        if self.service_pid is not None:
+            try:
+                os.kill(self.service_pid, signum)
+            except ProcessLookupError:
+                self.logger.warning(f"Service process {self.service_pid} is gone")
+
+    def _event(self, event: str, container_id: str):
+        self.events.append((event, container_id, time.monotonic()))
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    def get_container_stats(self, container_id: str) -> Dict:
+        stats = {
+            'cpu_percent': 0.0,
+            'memory_usage': self.memory_bytes,
+            'memory_percent': 0.0,
+            'network_rx_bytes': 0,
+            'network_tx_bytes': 0,
+            'timestamp': time.time()
+        }
+        self.metrics.observe_container(container_id, stats)
+        return stats
+
+    def get_dirty_page_window(self, container_id: str, seconds: Optional[float] = None) -> Dict:
+        return {'samples': 1, 'dirty_rate_mean': float(self.dirty_rate)}
+
+    def pause_dirty_pages(self, container_id: str) -> bool:
+        return False
+
+    def resume_dirty_pages(self, container_id: str):
+        return None
+
+    def unsubscribe_dirty_pages(self, container_id: str):
+        pass
+
+    async def pre_dump_container_async(self,
+                                       container_id: str,
+                                       image_dir: str,
+                                       parent_dir: Optional[str] = None) -> bool:
+        page_bytes = self._dirty_bytes(container_id, parent_dir is not None)
+        self._event("pre_dump", container_id)
+        await asyncio.get_event_loop().run_in_executor(
+            None, write_synthetic_images, image_dir, page_bytes, False, self.dump_rate
+        )
+        return True
+
+    async def checkpoint_container_async(self,
+                                         container_id: str,
+                                         checkpoint_dir: str,
+                                         checkpoint_name: Optional[str] = None,
+                                         parent_dir: Optional[str] = None) -> bool:
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
+        # The container stops with its final checkpoint
+        self.states[container_id] = "frozen"
+        self._signal(signal.SIGSTOP)
+        self._event("checkpoint", container_id)
+        page_bytes = self._dirty_bytes(container_id, parent_dir is not None)
+        await asyncio.get_event_loop().run_in_executor(
+            None,
+            write_synthetic_images,
+            os.path.join(checkpoint_dir, checkpoint_name),
+            page_bytes,
+            True,
+            self.dump_rate
+        )
+        return True
+
+    async def restore_container_async(self,
+                                      container_id: str,
+                                      checkpoint_dir: str,
+                                      checkpoint_name: Optional[str] = None) -> bool:
+        delay = self.restore_delay
+        if self.restore_rate:
+            delay += self.memory_bytes / self.restore_rate
+        await asyncio.sleep(delay)
+        self.states[container_id] = "running"
+        self._signal(signal.SIGCONT)
+        self._event("restore", container_id)
+        return True
+
+    async def wait_until_running(self, container_id: str, timeout: float = 30.0) -> bool:
+        return self.states.get(container_id, "running") == "running"
+
+    async def get_container_address(self, container_id: str) -> Optional[str]:
+        return self.service_address
+
+    async def get_container_cpu_request(self, container_id: str) -> float:
+        return 0.0
+
+    def checkpoint_container_lazy(self, *args, **kwargs):
+        self.logger.error("Post-copy needs CRIU lazy pages; not available in fakes")
+        return None
+
+    def restore_container_lazy(self, *args, **kwargs):
+        self.logger.error("Post-copy needs CRIU lazy pages; not available in fakes")
+        return None
+
+class LocalTestbed:
+    SOURCE_ID = "local_source"
+    TARGET_ID = "local_target"
+
+    def __init__(self,
+                 work_dir: str,
+                 container_manager: Optional[FakeContainerManager] = None,
+                 port: Optional[int] = None,
+                 network_options: Optional[Dict] = None,
+                 **coordinator_options):
+        """
+        A coordinator migrating from this box to a migration agent on
+        127.0.0.1, with a fake container manager by default: the real
+        transfer path without Docker or CRIU.
+
+        Args:
+            work_dir: Holds source checkpoints and the agent's directory
+            container_manager: Container back end; FakeContainerManager()
+                if None
+            port: Agent port; a free one if None
+            network_options: Extra NetworkManager arguments
+            coordinator_options: Extra MigrationCoordinator arguments
+        """
+        self.work_dir = work_dir
+        self.container_manager = container_manager or FakeContainerManager()
+        self.port = port
+        self.network_options = network_options or {}
+        self.coordinator_options = coordinator_options
+        self.agent: Optional[MigrationAgent] = None
+        self.network_manager: Optional[NetworkManager] = None
+        self.coordinator: Optional[MigrationCoordinator] = None
+
+    async def start(self) -> "LocalTestbed":
+        port = self.port or _free_port()
+        self.agent = (await start_local_agents(self.work_dir, [port]))[0]
+        self.network_manager = NetworkManager("127.0.0.1", port, **self.network_options)
+        self.network_manager.register_device(self.TARGET_ID, "127.0.0.1", port)
+        self.coordinator = MigrationCoordinator(
+            self.container_manager,
+            self.network_manager,
+            checkpoint_dir=os.path.join(self.work_dir, "source"),
+            **self.coordinator_options
+        )
+        return self
+
+    async def stop(self):
+        if self.network_manager is not None:
+            await self.network_manager.close()
+        if self.agent is not None:
+            await self.agent.stop()
+
+    async def __aenter__(self) -> "LocalTestbed":
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    async def migrate(self, container_id: str, **kwargs) -> str:
+        """start_migration from the local source to the local agent."""
+        return await self.coordinator.start_migration(
+            self.SOURCE_ID, self.TARGET_ID, container_id, **kwargs
+        )
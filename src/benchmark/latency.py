@@ -0,0 +1,138 @@
+# src/benchmark/latency.py
+import glob
+import os
+import sys
+from typing import Dict, Iterable, List, Optional
+from hdrh.histogram import HdrHistogram
+from hdrh.log import HistogramLogReader
+
+# Latencies are recorded in microseconds, up to an hour, to 3 significant
+# digits as YCSB does
+LOWEST_LATENCY = 1
+HIGHEST_LATENCY = 3600 * 1000 * 1000
+SIGNIFICANT_FIGURES = 3
+
+SUMMARY_PERCENTILES = (50.0, 90.0, 95.0, 99.0, 99.9, 99.99)
+
+def _new_histogram() -> HdrHistogram:
+    return HdrHistogram(LOWEST_LATENCY, HIGHEST_LATENCY, SIGNIFICANT_FIGURES)
+
+def _is_success(operation: str) -> bool:
+    # CLEANUP times client shutdown, not requests
+    return not operation.endswith("-FAILED") and operation != "CLEANUP"
+
+class LatencyHistograms:
+    def __init__(self):
+        """
+        Latency histograms per YCSB operation type (READ, UPDATE, INSERT,
+        SCAN, READ-MODIFY-WRITE, ...). Histograms of different phases and
+        runs merge without loss, so any percentile of the combined data
+        can be read back exactly to the histogram's precision.
+        """
+        self.histograms: Dict[str, HdrHistogram] = {}
+
+    def __bool__(self) -> bool:
+        return any(h.get_total_count() for h in self.histograms.values())
+
+    def operations(self) -> List[str]:
+        return sorted(self.histograms)
+
+    def histogram(self, operation: str) -> HdrHistogram:
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = _new_histogram()
+        return histogram
+
+    def record(self, operation: str, latency_us: int, count: int = 1):
+        self.histogram(operation).record_value(latency_us, count)
+
+    def load_log(self,
+                 operation: str,
+                 path: str,
+                 start: float = 0.0,
+                 end: float = sys.maxsize):
+        """
+        Add the intervals of an HdrHistogram log written by YCSB
+        (hdrhistogram.fileoutput) between start and end seconds into the run.
+        """
+        reader = HistogramLogReader(path, _new_histogram())
+        try:
+            destination = self.histogram(operation)
+            while reader.add_next_interval_histogram(destination, start, end) is not None:
+                pass
+        finally:
+            reader.close()
+
+    def load_directory(self, path_prefix: str) -> List[str]:
+        """
+        Load every <path_prefix><OPERATION>.hdr log; returns the operations
+        found.
+        """
+        loaded = []
+        for path in sorted(glob.glob(f"{path_prefix}*.hdr")):
+            operation = os.path.basename(path)[len(os.path.basename(path_prefix)):-len(".hdr")]
+            if operation:
+                self.load_log(operation, path)
+                loaded.append(operation)
+        return loaded
+
+    def merge(self, other: "LatencyHistograms"):
+        """Add another set's histograms, e.g. of a later phase or run."""
+        for operation, histogram in other.histograms.items():
+            self.histogram(operation).add(histogram)
+
+    def combined(self, operations: Optional[Iterable[str]] = None) -> HdrHistogram:
+        """
+        One histogram over the given operations; all successful operations
+        when None.
+        """
+        if operations is None:
+            operations = [op for op in self.histograms if _is_success(op)]
+        histogram = _new_histogram()
+        for operation in operations:
+            if operation in self.histograms:
+                histogram.add(self.histograms[operation])
+        return histogram
+
+    def percentile(self, percentile: float, operation: Optional[str] = None) -> float:
+        """Latency (us) at a percentile of one operation or all successful ones."""
+        if operation is not None:
+            histogram = self.histograms.get(operation)
+            if histogram is None:
+                return 0.0
+        else:
+            histogram = self.combined()
+        if not histogram.get_total_count():
+            return 0.0
+        return float(histogram.get_value_at_percentile(percentile))
+
+    def summary(self, operation: Optional[str] = None) -> Dict:
+        """Count, mean, min, max and SUMMARY_PERCENTILES, in us."""
+        histogram = (self.histograms.get(operation) or _new_histogram()
+                     if operation is not None else self.combined())
+        count = histogram.get_total_count()
+        result = {
+            'count': count,
+            'mean': histogram.get_mean_value() if count else 0.0,
+            'min': histogram.get_min_value() if count else 0,
+            'max': histogram.get_max_value() if count else 0
+        }
+        for percentile in SUMMARY_PERCENTILES:
+            result[f'p{percentile:g}'] = (
+                histogram.get_value_at_percentile(percentile) if count else 0
+            )
+        return result
+
+    def encode(self) -> Dict[str, str]:
+        """Compressed, base64 histograms per operation, e.g. to save as JSON."""
+        return {
+            operation: histogram.encode().decode()
+            for operation, histogram in self.histograms.items()
+        }
+
+    @classmethod
+    def decode(cls, encoded: Dict[str, str]) -> "LatencyHistograms":
+        histograms = cls()
+        for operation, payload in encoded.items():
+            histograms.histogram(operation).add(HdrHistogram.decode(payload.encode()))
+        return histograms
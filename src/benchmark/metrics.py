@@ -1,7 +1,64 @@
 # src/benchmark/metrics.py
-from dataclasses import dataclass
-from typing import Dict, List
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+import os
 import pandas as pd
+from .columnar import FORMAT_PARQUET, ColumnarTable, pc
+from .latency import LatencyHistograms
+
+# Status samples a BenchmarkMetrics keeps in memory by default; the full
+# series is streamed to a MetricsCollector through on_status
+TIMELINE_WINDOW = 600
+
+# YCSB status fields and the column suffixes they are flattened to
+_LATENCY_FIELDS = {
+    'Count': 'count',
+    'Avg': 'latency_avg',
+    '90': 'latency_90th',
+    '95': 'latency_95th',
+    '99': 'latency_99th',
+    'Max': 'latency_max'
+}
+
+@dataclass
+class StatusSample:
+    """One YCSB status line: the interval ending at timestamp."""
+    timestamp: datetime
+    # Seconds since the run started
+    elapsed: int
+    # Operations completed so far
+    operations: int
+    # Operations/sec over the interval
+    throughput: float
+    # Per operation type (READ, UPDATE, ...): Count, Avg, 99, ... in us
+    latencies: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def latency_avg(self) -> float:
+        """Average latency over all successful operations of the interval."""
+        total = count = 0.0
+        for operation, values in self.latencies.items():
+            if operation.endswith('-FAILED') or 'Avg' not in values:
+                continue
+            weight = values.get('Count', 1.0)
+            total += values['Avg'] * weight
+            count += weight
+        return total / count if count else 0.0
+
+    def to_dict(self) -> Dict:
+        row = {
+            'timestamp': self.timestamp,
+            'elapsed': self.elapsed,
+            'operations': self.operations,
+            'throughput': self.throughput,
+            'latency_avg': self.latency_avg()
+        }
+        for operation, values in self.latencies.items():
+            prefix = operation.lower().replace('-', '_')
+            for name, suffix in _LATENCY_FIELDS.items():
+                if name in values:
+                    row[f'{prefix}_{suffix}'] = values[name]
+        return row
 
 @dataclass
 class BenchmarkMetrics:
@@ -10,16 +67,156 @@ class BenchmarkMetrics:
     latency_95th: float
     latency_99th: float
     error_count: int
+    # The most recent status samples of the run, at most the window
+    # execute_workload was given (the full series goes to on_status)
+    timeline: List[StatusSample] = field(default_factory=list)
+    # Summary figures of each operation type, as YCSB printed them
+    operations: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # Latency histograms per operation type
+    latency: LatencyHistograms = field(default_factory=LatencyHistograms)
+    # YCSB client processes the figures were merged from
+    clients: int = 1
+
+def _merge_operations(parts: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """
+    Combine per-operation summaries: counts add up, averages are
+    count-weighted and percentiles and maxima take the worst client's
+    (the histograms give exact merged percentiles).
+    """
+    merged: Dict[str, Dict[str, float]] = {}
+    for operations in parts:
+        for operation, values in operations.items():
+            target = merged.setdefault(operation, {})
+            count = values.get('Operations', 0)
+            previous = target.get('Operations', 0)
+            for metric, value in values.items():
+                if metric == 'Operations' or metric.startswith('Return='):
+                    target[metric] = target.get(metric, 0) + value
+                elif metric.startswith('Average'):
+                    total = previous + count
+                    target[metric] = ((target.get(metric, 0) * previous + value * count) / total
+                                      if total else value)
+                elif metric.startswith('Min'):
+                    target[metric] = min(target.get(metric, value), value)
+                else:
+                    target[metric] = max(target.get(metric, value), value)
+    return merged
+
+def _merge_timelines(timelines: List[List[StatusSample]],
+                     window: Optional[int] = None) -> List[StatusSample]:
+    """
+    Add up the clients' status samples of each elapsed second, keeping the
+    latest window seconds (by default as many as the longest timeline).
+    """
+    if window is None:
+        window = max((len(timeline) for timeline in timelines), default=0)
+    by_second: Dict[int, StatusSample] = {}
+    for timeline in timelines:
+        for sample in timeline:
+            merged = by_second.get(sample.elapsed)
+            if merged is None:
+                by_second[sample.elapsed] = StatusSample(
+                    sample.timestamp, sample.elapsed, sample.operations,
+                    sample.throughput, {op: dict(v) for op, v in sample.latencies.items()}
+                )
+                continue
+            merged.timestamp = max(merged.timestamp, sample.timestamp)
+            merged.operations += sample.operations
+            merged.throughput += sample.throughput
+            for operation, values in sample.latencies.items():
+                target = merged.latencies.setdefault(operation, {})
+                count = values.get('Count', 0)
+                previous = target.get('Count', 0)
+                for key, value in values.items():
+                    if key == 'Count':
+                        target[key] = previous + value
+                    elif key == 'Avg':
+                        total = previous + count
+                        target[key] = ((target.get(key, 0) * previous + value * count) / total
+                                       if total else value)
+                    elif key == 'Min':
+                        target[key] = min(target.get(key, value), value)
+                    else:
+                        target[key] = max(target.get(key, value), value)
+    seconds = sorted(by_second)[-window:] if window else []
+    return [by_second[second] for second in seconds]
+
+def merge_metrics(results: List[BenchmarkMetrics]) -> BenchmarkMetrics:
+    """
+    Metrics of YCSB clients that ran concurrently: throughput and errors
+    add up, latency histograms merge, so overall percentiles are exact.
+    """
+    latency = LatencyHistograms()
+    for result in results:
+        latency.merge(result.latency)
+    operations = _merge_operations([result.operations for result in results])
+
+    if latency:
+        overall = latency.summary()
+        latency_avg, latency_95th, latency_99th = overall['mean'], overall['p95'], overall['p99']
+    else:
+        # Without histograms only approximations are left
+        counts = [
+            sum(values.get('Operations', 0) for op, values in result.operations.items()
+                if not op.endswith('-FAILED') and op != 'CLEANUP')
+            for result in results
+        ]
+        latency_avg = (sum(r.latency_avg * c for r, c in zip(results, counts)) / sum(counts)
+                       if sum(counts) else 0.0)
+        latency_95th = max((result.latency_95th for result in results), default=0.0)
+        latency_99th = max((result.latency_99th for result in results), default=0.0)
+
+    return BenchmarkMetrics(
+        throughput=sum(result.throughput for result in results),
+        latency_avg=latency_avg,
+        latency_95th=latency_95th,
+        latency_99th=latency_99th,
+        error_count=sum(result.error_count for result in results),
+        timeline=_merge_timelines([result.timeline for result in results]),
+        operations=operations,
+        latency=latency,
+        clients=sum(result.clients for result in results)
+    )
 
 class MetricsCollector:
-    def __init__(self):
-        self.metrics: List[Dict] = []
+    def __init__(self,
+                 output_dir: Optional[str] = None,
+                 format: str = FORMAT_PARQUET,
+                 row_group_size: int = 65536):
+        """
+        Per-run metrics and per-interval status samples, kept column-wise
+        in typed arrays.
+
+        Args:
+            output_dir: When set, samples are flushed to Parquet or Arrow
+                part files under <output_dir>/metrics and
+                <output_dir>/status every row_group_size rows, keeping
+                memory bounded over long runs (needs pyarrow)
+            format: 'parquet' or 'arrow'
+            row_group_size: Rows per part file
+        """
+        self.output_dir = output_dir
+        self.metrics = ColumnarTable(
+            os.path.join(output_dir, "metrics") if output_dir else None,
+            format, row_group_size
+        )
+        self.status = ColumnarTable(
+            os.path.join(output_dir, "status") if output_dir else None,
+            format, row_group_size
+        )
+        # Histograms merged over every run, overall and per workload type
+        self.latency = LatencyHistograms()
+        self.latency_by_workload: Dict[str, LatencyHistograms] = {}
 
     def add_metrics(self, 
                    timestamp, 
                    workload_type: str, 
                    metrics: BenchmarkMetrics):
         """Add metrics to collection."""
+        self.latency.merge(metrics.latency)
+        self.latency_by_workload.setdefault(workload_type, LatencyHistograms()).merge(
+            metrics.latency
+        )
         self.metrics.append({
             'timestamp': timestamp,
             'workload_type': workload_type,
@@ -27,9 +224,65 @@ class MetricsCollector:
             'latency_avg': metrics.latency_avg,
             'latency_95th': metrics.latency_95th,
             'latency_99th': metrics.latency_99th,
-            'error_count': metrics.error_count
+            'latency_999th': metrics.latency.percentile(99.9),
+            'error_count': metrics.error_count,
+            'clients': metrics.clients
         })
 
+    def add_status(self, workload_type: str, sample: StatusSample, client: int = 0):
+        """Add a status sample of a running workload (of one of its clients)."""
+        self.status.append({'workload_type': workload_type, 'client': client, **sample.to_dict()})
+
+    def percentile(self,
+                   percentile: float,
+                   operation: Optional[str] = None,
+                   workload_type: Optional[str] = None) -> float:
+        """
+        Latency (us) at any percentile over all runs so far, optionally of
+        one operation type and/or workload type.
+        """
+        if workload_type is not None:
+            latency = self.latency_by_workload.get(workload_type)
+            if latency is None:
+                return 0.0
+        else:
+            latency = self.latency
+        return latency.percentile(percentile, operation)
+
+    def get_latency_dataframe(self) -> pd.DataFrame:
+        """Merged latency summary per workload type and operation."""
+        rows = []
+        for workload_type, latency in sorted(self.latency_by_workload.items()):
+            for operation in latency.operations():
+                rows.append({
+                    'workload_type': workload_type,
+                    'operation': operation,
+                    **latency.summary(operation)
+                })
+        return pd.DataFrame(rows)
+
     def get_dataframe(self) -> pd.DataFrame:
         """Convert metrics to pandas DataFrame."""
-        return pd.DataFrame(self.metrics)
\ No newline at end of file
+        return self.metrics.to_dataframe()
+
+    def get_status_dataframe(self, workload_type: Optional[str] = None) -> pd.DataFrame:
+        """
+        Per-interval throughput and latency of every workload run, or of
+        one workload type. With output_dir this reads the flushed parts
+        back in (filtering them before conversion); for very long runs,
+        analyse them with read_columnar instead.
+        """
+        if workload_type is None:
+            return self.status.to_dataframe()
+        if self.status.parts:
+            table = self.status.to_arrow()
+            return table.filter(pc.equal(table['workload_type'], workload_type)).to_pandas()
+        frame = self.status.to_dataframe()
+        if frame.empty:
+            return frame
+        return frame[frame['workload_type'] == workload_type].reset_index(drop=True)
+
+    def close(self):
+        """Flush the samples still in memory to output_dir."""
+        self.metrics.close()
+        self.status.close()
\ No newline at end of file
@@ -0,0 +1,311 @@
+# src/benchmark/microbench.py
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from ..cgroup_collector import CgroupCollector
+from ..chunk_store import CHUNKING_CDC, CHUNKING_FIXED, ChunkStore
+from ..container_stats import parse_stats
+from ..failure_detector import HeartbeatScheduler, PhiAccrualDetector
+from ..migration_agent import start_local_agents
+from ..network_manager import NetworkManager
+from ..placement import PlacementEngine
+from .fakes import FakeContainerManager, LocalTestbed, _free_port, write_synthetic_images
+
+MB = 1024 * 1024
+
+@dataclass
+class Microbenchmark:
+    name: str
+    unit: str
+    # (work dir, scale) -> (items processed, seconds taken), timing only
+    # the measured section
+    run: Callable[[str, float], Awaitable[Tuple[float, float]]]
+
+def _raw_stats() -> Dict:
+    """A Docker stats sample shaped like the Engine API's."""
+    return {
+        'cpu_stats': {
+            'cpu_usage': {'total_usage': 2_000_000_000, 'percpu_usage': [5e8] * 4},
+            'system_cpu_usage': 90_000_000_000,
+            'online_cpus': 4
+        },
+        'precpu_stats': {
+            'cpu_usage': {'total_usage': 1_900_000_000},
+            'system_cpu_usage': 89_000_000_000
+        },
+        'memory_stats': {'usage': 200 * MB, 'limit': 512 * MB},
+        'networks': {
+            'eth0': {'rx_bytes': 123456, 'tx_bytes': 654321},
+            'eth1': {'rx_bytes': 1000, 'tx_bytes': 2000}
+        }
+    }
+
+async def bench_parse_stats(work_dir: str, scale: float) -> Tuple[float, float]:
+    raw = _raw_stats()
+    count = max(int(50000 * scale), 1)
+    start = time.perf_counter()
+    for _ in range(count):
+        parse_stats(raw)
+    return count, time.perf_counter() - start
+
+def _fake_cgroup_tree(root: str, containers: int) -> List[str]:
+    """A cgroup v2 hierarchy with Docker's systemd layout."""
+    open(os.path.join(root, "cgroup.controllers"), "w").close()
+    container_ids = []
+    for i in range(containers):
+        container_id = f"{i:064x}"
+        path = os.path.join(root, "system.slice", f"docker-{container_id}.scope")
+        os.makedirs(path)
+        with open(os.path.join(path, "cpu.stat"), "w") as f:
+            f.write(f"usage_usec {1000000 + i}\nuser_usec 1\nsystem_usec 1\n")
+        with open(os.path.join(path, "memory.current"), "w") as f:
+            f.write(f"{(i + 1) * MB}\n")
+        with open(os.path.join(path, "memory.max"), "w") as f:
+            f.write("max\n")
+        open(os.path.join(path, "cgroup.procs"), "w").close()
+        container_ids.append(container_id)
+    return container_ids
+
+async def bench_cgroup_collect(work_dir: str, scale: float) -> Tuple[float, float]:
+    root = os.path.join(work_dir, "cgroup")
+    os.makedirs(root)
+    container_ids = _fake_cgroup_tree(root, max(int(200 * scale), 1))
+    collector = CgroupCollector(root, proc_root=work_dir, version=2, cpu_count=4, host_memory=8192 * MB)
+    # The first sweep resolves and caches cgroup paths
+    collector.collect(container_ids)
+    sweeps = 20
+    start = time.perf_counter()
+    for _ in range(sweeps):
+        collector.collect(container_ids)
+    return sweeps * len(container_ids), time.perf_counter() - start
+
+async def _chunk_file(work_dir: str, scale: float, chunking: str) -> Tuple[float, float]:
+    size = max(int(64 * MB * scale), MB)
+    path = os.path.join(work_dir, "pages-1.img")
+    with open(path, "wb") as f:
+        for _ in range(size // MB):
+            f.write(os.urandom(MB))
+    store = ChunkStore(os.path.join(work_dir, "chunks"), chunking=chunking)
+    start = time.perf_counter()
+    entry = store.add_file(path, store=False)
+    return entry["size"], time.perf_counter() - start
+
+async def bench_chunk_hash(work_dir: str, scale: float) -> Tuple[float, float]:
+    return await _chunk_file(work_dir, scale, CHUNKING_FIXED)
+
+async def bench_chunk_hash_cdc(work_dir: str, scale: float) -> Tuple[float, float]:
+    return await _chunk_file(work_dir, scale, CHUNKING_CDC)
+
+async def bench_loopback_transfer(work_dir: str, scale: float) -> Tuple[float, float]:
+    image_dir = os.path.join(work_dir, "images")
+    write_synthetic_images(image_dir, max(int(64 * MB * scale), MB))
+    port = _free_port()
+    agents = await start_local_agents(os.path.join(work_dir, "agents"), [port])
+    network_manager = NetworkManager("127.0.0.1", port)
+    network_manager.register_device("bench_target", "127.0.0.1", port)
+    try:
+        start = time.perf_counter()
+        result = await network_manager.transfer_checkpoint(
+            "bench_source",
+            "bench_target",
+            {
+                "migration_id": f"bench_{os.getpid()}_{time.monotonic_ns()}",
+                "container_id": "bench",
+                "checkpoint_path": image_dir
+            }
+        )
+        elapsed = time.perf_counter() - start
+    finally:
+        await network_manager.close()
+        for agent in agents:
+            await agent.stop()
+    if result is None:
+        raise RuntimeError("Loopback transfer failed")
+    return result["transfer"]["logical_bytes"], elapsed
+
+class _InstantNetwork:
+    """Answers every heartbeat at once, so only LIMOCE's side is timed."""
+
+    async def send_heartbeat(self, source_id, target_id, data, timeout=None):
+        return {"status": "ok", "device": target_id}
+
+async def bench_heartbeat_fanout(work_dir: str, scale: float) -> Tuple[float, float]:
+    detector = PhiAccrualDetector()
+    scheduler = HeartbeatScheduler(_InstantNetwork(), detector, "bench", max_concurrency=256)
+    scheduler.add_devices(f"node_{i}" for i in range(max(int(5000 * scale), 1)))
+    rounds = 3
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await scheduler.run_round()
+    return rounds * len(scheduler.devices), time.perf_counter() - start
+
+async def bench_coordinator_overhead(work_dir: str, scale: float) -> Tuple[float, float]:
+    # Tiny images and instant restores leave the coordinator's own work
+    container_manager = FakeContainerManager(memory_bytes=64 * 1024, dirty_rate=0, restore_delay=0)
+    migrations = max(int(20 * scale), 1)
+    async with LocalTestbed(work_dir, container_manager) as testbed:
+        start = time.perf_counter()
+        for i in range(migrations):
+            migration_id = await testbed.migrate(f"bench_{i}")
+            if testbed.coordinator.migrations[migration_id].status != "completed":
+                raise RuntimeError(f"Migration {migration_id} failed")
+        return migrations, time.perf_counter() - start
+
+# Most a placement query may take on an unmeasured cluster, in seconds
+PLACEMENT_QUERY_LIMIT = 1e-3
+
+async def bench_placement_select(work_dir: str, scale: float) -> Tuple[float, float]:
+    # No link measured yet: every node has the default bandwidth, so only
+    # latency separates them
+    rng = random.Random(0)
+    engine = PlacementEngine()
+    for i in range(max(int(5000 * scale), 1)):
+        engine.update_node(
+            f"node_{i}",
+            cpu_free=rng.uniform(0, 8),
+            memory_free=rng.uniform(0, 8192) * MB,
+            latency=rng.uniform(0.0005, 0.05)
+        )
+    queries = 1000
+    evaluated = 0
+    start = time.perf_counter()
+    for i in range(queries):
+        decision = engine.select(
+            f"bench_{i % 50}", 256 * MB, memory=(i % 64) * 64 * MB, cpu=(i % 4) * 0.5,
+            exclude=["node_0"]
+        )
+        if decision is not None:
+            evaluated += decision.evaluated
+    elapsed = time.perf_counter() - start
+    if elapsed / queries > PLACEMENT_QUERY_LIMIT:
+        raise RuntimeError(
+            f"Placement query took {elapsed / queries * 1e3:.2f} ms on {len(engine)} "
+            f"equal-bandwidth nodes ({evaluated / queries:.0f} evaluated)"
+        )
+    return queries, elapsed
+
+BENCHMARKS = [
+    Microbenchmark("parse_stats", "samples/s", bench_parse_stats),
+    Microbenchmark("cgroup_collect", "containers/s", bench_cgroup_collect),
+    Microbenchmark("chunk_hash", "bytes/s", bench_chunk_hash),
+    Microbenchmark("chunk_hash_cdc", "bytes/s", bench_chunk_hash_cdc),
+    Microbenchmark("loopback_transfer", "bytes/s", bench_loopback_transfer),
+    Microbenchmark("heartbeat_fanout", "heartbeats/s", bench_heartbeat_fanout),
+    Microbenchmark("coordinator_overhead", "migrations/s", bench_coordinator_overhead),
+    Microbenchmark("placement_select", "queries/s", bench_placement_select),
+]
+
+async def run_suite(names: Optional[List[str]] = None,
+                    repeat: int = 5,
+                    scale: float = 1.0) -> Dict:
+    """
+    Run the microbenchmarks, each repeat times on fresh synthetic data.
+    Every result is a rate, higher is better; the median run is reported.
+    """
+    selected = [b for b in BENCHMARKS if names is None or b.name in names]
+    unknown = set(names or ()) - {b.name for b in BENCHMARKS}
+    if unknown:
+        raise ValueError(f"Unknown microbenchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for benchmark in selected:
+        rates = []
+        for _ in range(repeat):
+            work_dir = tempfile.mkdtemp(prefix=f"limoce-{benchmark.name}-")
+            try:
+                items, elapsed = await benchmark.run(work_dir, scale)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            rates.append(items / elapsed if elapsed > 0 else float("inf"))
+        results[benchmark.name] = {
+            "unit": benchmark.unit,
+            "value": statistics.median(rates),
+            "min": min(rates),
+            "max": max(rates),
+            "runs": rates
+        }
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "scale": scale,
+        "repeat": repeat,
+        "results": results
+    }
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.15) -> List[Dict]:
+    """
+    Benchmarks more than tolerance slower than in the baseline report.
+    Benchmarks missing from either side are skipped.
+    """
+    regressions = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None or not reference["value"]:
+            continue
+        change = result["value"] / reference["value"] - 1.0
+        if change < -tolerance:
+            regressions.append({
+                "name": name,
+                "unit": result["unit"],
+                "baseline": reference["value"],
+                "current": result["value"],
+                "change": change
+            })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="LIMOCE hot path microbenchmarks")
+    parser.add_argument("--only", nargs="+", help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="data size factor")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="slowdown allowed before failing, as a fraction")
+    args = parser.parse_args(argv)
+
+    # Per-transfer and per-migration INFO lines would swamp the report
+    logging.getLogger("limoce").setLevel(logging.WARNING)
+    report = asyncio.run(run_suite(args.only, args.repeat, args.scale))
+    for name, result in report["results"].items():
+        print(f"{name:24} {result['value']:>16,.1f} {result['unit']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("scale") != report["scale"]:
+            print(f"Baseline ran at scale {baseline.get('scale')}, not {report['scale']}")
+        report["regressions"] = compare(report, baseline, args.tolerance)
+        for regression in report["regressions"]:
+            print(
+                f"REGRESSION {regression['name']}: {regression['current']:,.1f} vs "
+                f"{regression['baseline']:,.1f} {regression['unit']} "
+                f"({regression['change']:+.1%})"
+            )
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        if report["regressions"]:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+# src/benchmark/migration_harness.py
+import asyncio
+import itertools
+import logging
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from .dyn_ycsb import DynYCSB, read_workload_properties
+from .metrics import BenchmarkMetrics, StatusSample
+
+_P99_SUFFIX = '_latency_99th'
+# Numbers each run's status samples in the metrics collector
+_run_ids = itertools.count()
+
+def _interval_p99(sample: StatusSample) -> float:
+    """Worst p99 (us) among the successful operation types of an interval."""
+    values = [
+        latencies['99'] for operation, latencies in sample.latencies.items()
+        if '99' in latencies and not operation.endswith('-FAILED') and operation != 'CLEANUP'
+    ]
+    return max(values) if values else 0.0
+
+def _timeline_from_status(status: pd.DataFrame) -> List[StatusSample]:
+    """
+    Status samples of one run, as collected in a MetricsCollector's status
+    table: clients' rows of each elapsed second are added up, keeping the
+    worst p99 of each operation type.
+    """
+    if status.empty:
+        return []
+    p99_columns = [c for c in status.columns if c.endswith(_P99_SUFFIX)]
+    merged = status.groupby('elapsed', sort=True).agg({
+        'timestamp': 'max',
+        'operations': 'sum',
+        'throughput': 'sum',
+        **{column: 'max' for column in p99_columns}
+    })
+    timeline = []
+    for elapsed, row in merged.iterrows():
+        latencies = {}
+        for column in p99_columns:
+            if pd.notna(row[column]):
+                # Column prefixes are lowercased YCSB operation names
+                operation = column[:-len(_P99_SUFFIX)].upper().replace('_', '-')
+                latencies[operation] = {'99': float(row[column])}
+        timeline.append(StatusSample(
+            timestamp=row['timestamp'].to_pydatetime(),
+            elapsed=int(elapsed),
+            operations=int(row['operations']),
+            throughput=float(row['throughput']),
+            latencies=latencies
+        ))
+    return timeline
+
+@dataclass
+class MigrationImpact:
+    migration_id: str
+    status: str
+    strategy: str
+    # Seconds the container was frozen (until ready, with a probe)
+    downtime: Optional[float]
+    # Per-phase start/end/duration, as MigrationCoordinator.timing_breakdown
+    phases: Dict[str, Dict] = field(default_factory=dict)
+    overlap: float = 0.0
+    bytes_transferred: int = 0
+    # Median ops/sec of the intervals before the migration
+    baseline_throughput: float = 0.0
+    min_throughput: float = 0.0
+    # Seconds from the migration start with throughput below the dip threshold
+    dip_duration: float = 0.0
+    # Seconds from the migration start until throughput stayed recovered
+    recovery_time: Optional[float] = None
+    baseline_p99: float = 0.0
+    peak_p99: float = 0.0
+    p99_inflation: float = 0.0
+    workload: Optional[BenchmarkMetrics] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            'migration_id': self.migration_id,
+            'status': self.status,
+            'strategy': self.strategy,
+            'downtime': self.downtime,
+            'phases': {phase: t['duration'] for phase, t in self.phases.items()},
+            'overlap': self.overlap,
+            'bytes_transferred': self.bytes_transferred,
+            'baseline_throughput': self.baseline_throughput,
+            'min_throughput': self.min_throughput,
+            'dip_duration': self.dip_duration,
+            'recovery_time': self.recovery_time,
+            'baseline_p99': self.baseline_p99,
+            'peak_p99': self.peak_p99,
+            'p99_inflation': self.p99_inflation
+        }
+
+def measure_impact(timeline: List[StatusSample],
+                   migration_start: datetime,
+                   interval: float = 1.0,
+                   dip_threshold: float = 0.2) -> Dict:
+    """
+    Service impact of a migration from a workload's status timeline.
+
+    Intervals ending before the migration started are the baseline. An
+    interval after it dips when its throughput is more than dip_threshold
+    below the baseline median; p99 inflation is the worst interval p99
+    after the start over the baseline median p99.
+    """
+    before = [s for s in timeline if s.timestamp <= migration_start]
+    after = [s for s in timeline if s.timestamp > migration_start]
+    result = {
+        'baseline_throughput': 0.0,
+        'min_throughput': 0.0,
+        'dip_duration': 0.0,
+        'recovery_time': None,
+        'baseline_p99': 0.0,
+        'peak_p99': 0.0,
+        'p99_inflation': 0.0
+    }
+    if not before or not after:
+        return result
+
+    baseline = statistics.median(s.throughput for s in before)
+    floor = baseline * (1.0 - dip_threshold)
+    dipped = [s for s in after if s.throughput < floor]
+    result['baseline_throughput'] = baseline
+    result['min_throughput'] = min(s.throughput for s in after)
+    result['dip_duration'] = len(dipped) * interval
+    if dipped:
+        last_dip = max(s.timestamp for s in dipped)
+        if any(s.timestamp > last_dip for s in after):
+            result['recovery_time'] = (last_dip - migration_start).total_seconds()
+    else:
+        result['recovery_time'] = 0.0
+
+    baseline_p99 = statistics.median(_interval_p99(s) for s in before)
+    peak_p99 = max(_interval_p99(s) for s in after)
+    result['baseline_p99'] = baseline_p99
+    result['peak_p99'] = peak_p99
+    result['p99_inflation'] = peak_p99 / baseline_p99 if baseline_p99 else 0.0
+    return result
+
+class MigrationUnderLoad:
+    def __init__(self,
+                 benchmark: DynYCSB,
+                 coordinator,
+                 status_interval: int = 1,
+                 dip_threshold: float = 0.2):
+        """
+        Run a YCSB workload and migrate the container serving it partway
+        through, reporting the migration's cost to the workload.
+
+        Args:
+            benchmark: Runs the workload
+            coordinator: MigrationCoordinator (or a LocalTestbed's)
+            status_interval: Seconds per workload status sample
+            dip_threshold: Share below baseline throughput counted as a dip
+        """
+        self.benchmark = benchmark
+        self.coordinator = coordinator
+        self.status_interval = status_interval
+        self.dip_threshold = dip_threshold
+        self.logger = logging.getLogger("limoce.benchmark")
+
+    def _sharded_totals(self,
+                        workload_file: str,
+                        target_throughput: int,
+                        operation_count: int,
+                        additional_props: Optional[Dict]) -> Tuple[int, int]:
+        """
+        Totals to split across sharded clients, taking those not given from
+        additional_props or else the workload file, as YCSB would.
+        """
+        properties = read_workload_properties(workload_file)
+        properties.update({k: str(v) for k, v in (additional_props or {}).items()})
+        if not operation_count:
+            operation_count = int(properties.get('operationcount', 0))
+            if not operation_count:
+                # Each client would get operationcount=0 and never finish
+                raise ValueError(
+                    "A sharded workload needs operation_count or operationcount "
+                    "in its workload file"
+                )
+        if not target_throughput:
+            target_throughput = int(float(properties.get('target', 0)))
+        return target_throughput, operation_count
+
+    async def run(self,
+                  database: str,
+                  workload_file: str,
+                  source_id: str,
+                  target_id: Optional[str],
+                  container_id: str,
+                  migrate_after: float,
+                  clients: int = 1,
+                  target_throughput: int = 0,
+                  operation_count: int = 0,
+                  additional_props: Optional[Dict] = None,
+                  **migration_options) -> MigrationImpact:
+        """
+        Start the workload, wait migrate_after seconds, migrate, then wait
+        for the workload to finish.
+
+        Args:
+            clients: YCSB clients; above 1 the workload is sharded and
+                target_throughput and operation_count are its totals,
+                taken from the workload file when 0
+            migration_options: Passed to start_migration (strategy,
+                pipelined, readiness, deadline)
+
+        Status samples are streamed to the benchmark's metrics collector
+        under workload type 'migration-<n>' and the impact is measured
+        from there, so it covers the whole run however long it is.
+        """
+        collector = self.benchmark.metrics_collector
+        workload_type = f"migration-{next(_run_ids)}"
+        if clients > 1:
+            target_throughput, operation_count = self._sharded_totals(
+                workload_file, target_throughput, operation_count, additional_props
+            )
+            workload = asyncio.ensure_future(self.benchmark.execute_sharded(
+                database, workload_file, clients, target_throughput, operation_count,
+                additional_props=additional_props,
+                status_interval=self.status_interval,
+                on_status=lambda client, sample: collector.add_status(
+                    workload_type, sample, client
+                )
+            ))
+        else:
+            workload = asyncio.ensure_future(self.benchmark.execute_workload(
+                database, workload_file,
+                additional_props=additional_props,
+                status_interval=self.status_interval,
+                on_status=lambda sample: collector.add_status(workload_type, sample)
+            ))
+
+        await asyncio.sleep(migrate_after)
+        if workload.done():
+            workload.result()
+            raise ValueError("Workload ended before the migration started")
+
+        migration_start = datetime.now()
+        migration_id = await self.coordinator.start_migration(
+            source_id, target_id, container_id, **migration_options
+        )
+        migration = self.coordinator.migrations[migration_id]
+        if migration.status != "completed":
+            self.logger.error(f"Migration under load failed: {migration.error}")
+
+        metrics = await workload
+        collector.add_metrics(datetime.now(), workload_type, metrics)
+        timing = self.coordinator.timing_breakdown(migration_id)
+        timeline = _timeline_from_status(collector.get_status_dataframe(workload_type))
+        impact = measure_impact(
+            timeline, migration_start, self.status_interval, self.dip_threshold
+        )
+        result = MigrationImpact(
+            migration_id=migration_id,
+            status=migration.status,
+            strategy=migration.strategy,
+            downtime=migration.downtime,
+            phases=timing["phases"],
+            overlap=timing["overlap"],
+            bytes_transferred=migration.bytes_transferred,
+            workload=metrics,
+            **impact
+        )
+        self.logger.info(
+            f"Migration {migration_id} under load: downtime {result.downtime}, "
+            f"dip {result.dip_duration:.0f}s, p99 x{result.p99_inflation:.1f}"
+        )
+        return result
@@ -0,0 +1,248 @@
+# src/cgroup_collector.py
+import logging
+import os
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Where Docker puts container cgroups, relative to the hierarchy root,
+# for the systemd and cgroupfs drivers
+_TEMPLATES = ("system.slice/docker-{id}.scope", "docker/{id}")
+
+# cgroup v1 reports "no limit" as a page-rounded LONG_MAX
+_V1_UNLIMITED = 1 << 62
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    if value == "max":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+def _read_keyed(path: str) -> Dict[str, int]:
+    """Parse 'key value' lines such as cpu.stat."""
+    values = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 2 and parts[1].isdigit():
+                    values[parts[0]] = int(parts[1])
+    except OSError:
+        pass
+    return values
+
+def _read_net_dev(path: str) -> Tuple[int, int]:
+    """Sum rx/tx bytes over all interfaces but loopback."""
+    rx = tx = 0
+    try:
+        with open(path) as f:
+            lines = f.readlines()[2:]
+    except OSError:
+        return 0, 0
+    for line in lines:
+        name, _, counters = line.partition(":")
+        if name.strip() == "lo":
+            continue
+        fields = counters.split()
+        if len(fields) >= 9:
+            rx += int(fields[0])
+            tx += int(fields[8])
+    return rx, tx
+
+@dataclass
+class StatsSnapshot:
+    """Stats of many containers from one sweep, one array per field."""
+    timestamp: float
+    container_ids: List[str] = field(default_factory=list)
+    cpu_percent: array = field(default_factory=lambda: array('d'))
+    memory_usage: array = field(default_factory=lambda: array('q'))
+    memory_percent: array = field(default_factory=lambda: array('d'))
+    network_rx_bytes: array = field(default_factory=lambda: array('q'))
+    network_tx_bytes: array = field(default_factory=lambda: array('q'))
+    _index: Dict[str, int] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.container_ids)
+
+    def append(self, container_id: str, cpu_percent: float, memory_usage: int,
+               memory_percent: float, rx_bytes: int, tx_bytes: int):
+        self._index[container_id] = len(self.container_ids)
+        self.container_ids.append(container_id)
+        self.cpu_percent.append(cpu_percent)
+        self.memory_usage.append(memory_usage)
+        self.memory_percent.append(memory_percent)
+        self.network_rx_bytes.append(rx_bytes)
+        self.network_tx_bytes.append(tx_bytes)
+
+    def get(self, container_id: str) -> Dict:
+        """One container's stats, shaped like get_container_stats()."""
+        i = self._index.get(container_id)
+        if i is None:
+            return {}
+        return {
+            'cpu_percent': self.cpu_percent[i],
+            'memory_usage': self.memory_usage[i],
+            'memory_percent': self.memory_percent[i],
+            'network_rx_bytes': self.network_rx_bytes[i],
+            'network_tx_bytes': self.network_tx_bytes[i],
+            'timestamp': self.timestamp
+        }
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {container_id: self.get(container_id) for container_id in self.container_ids}
+
+class CgroupCollector:
+    def __init__(self,
+                 cgroup_root: str = "/sys/fs/cgroup",
+                 proc_root: str = "/proc",
+                 version: Optional[int] = None,
+                 cpu_count: Optional[int] = None,
+                 host_memory: Optional[int] = None):
+        """
+        Read CPU, memory and network usage of many containers straight
+        from cgroup accounting files, without going through the Docker API.
+
+        Args:
+            cgroup_root: cgroup filesystem mount
+            proc_root: procfs mount, for per-container net/dev
+            version: 1 or 2; detected from cgroup_root when None
+            cpu_count: CPUs CPU percentages are relative to, as in
+                'docker stats'; defaults to this host's
+            host_memory: Memory limit used for containers without one;
+                read from /proc/meminfo when None
+        """
+        self.cgroup_root = cgroup_root
+        self.proc_root = proc_root
+        if version is None:
+            version = 2 if os.path.exists(os.path.join(cgroup_root, "cgroup.controllers")) else 1
+        self.version = version
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.host_memory = host_memory if host_memory is not None else self._read_host_memory()
+        self.logger = logging.getLogger("limoce.cgroup")
+
+        self._paths: Dict[str, Optional[Dict[str, str]]] = {}
+        # container id -> (cpu usage ns, wall time) of the previous sweep
+        self._previous: Dict[str, Tuple[int, float]] = {}
+
+    def _read_host_memory(self) -> int:
+        try:
+            with open(os.path.join(self.proc_root, "meminfo")) as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        return 0
+
+    def _resolve(self, container_id: str) -> Optional[Dict[str, str]]:
+        """Find (and cache) the cgroup directories of a container."""
+        if container_id in self._paths:
+            return self._paths[container_id]
+
+        paths = None
+        if self.version == 2:
+            for template in _TEMPLATES:
+                path = os.path.join(self.cgroup_root, template.format(id=container_id))
+                if os.path.isdir(path):
+                    paths = {"cpu": path, "memory": path, "procs": path}
+                    break
+        else:
+            for template in _TEMPLATES:
+                relative = template.format(id=container_id)
+                cpu = os.path.join(self.cgroup_root, "cpu,cpuacct", relative)
+                if not os.path.isdir(cpu):
+                    cpu = os.path.join(self.cgroup_root, "cpuacct", relative)
+                memory = os.path.join(self.cgroup_root, "memory", relative)
+                if os.path.isdir(cpu) and os.path.isdir(memory):
+                    paths = {"cpu": cpu, "memory": memory, "procs": memory}
+                    break
+        if paths is not None:
+            self._paths[container_id] = paths
+        return paths
+
+    def _cpu_usage_ns(self, paths: Dict[str, str]) -> Optional[int]:
+        if self.version == 2:
+            usage = _read_keyed(os.path.join(paths["cpu"], "cpu.stat")).get("usage_usec")
+            return usage * 1000 if usage is not None else None
+        return _read_int(os.path.join(paths["cpu"], "cpuacct.usage"))
+
+    def _memory(self, paths: Dict[str, str]) -> Tuple[int, int]:
+        if self.version == 2:
+            usage = _read_int(os.path.join(paths["memory"], "memory.current")) or 0
+            limit = _read_int(os.path.join(paths["memory"], "memory.max"))
+        else:
+            usage = _read_int(os.path.join(paths["memory"], "memory.usage_in_bytes")) or 0
+            limit = _read_int(os.path.join(paths["memory"], "memory.limit_in_bytes"))
+            if limit is not None and limit >= _V1_UNLIMITED:
+                limit = None
+        return usage, limit or self.host_memory
+
+    def _network(self, paths: Dict[str, str]) -> Tuple[int, int]:
+        try:
+            with open(os.path.join(paths["procs"], "cgroup.procs")) as f:
+                pid = f.readline().strip()
+        except OSError:
+            return 0, 0
+        if not pid:
+            return 0, 0
+        return _read_net_dev(os.path.join(self.proc_root, pid, "net", "dev"))
+
+    def pids(self, container_id: str) -> List[int]:
+        """Host PIDs of the processes in a container's cgroup."""
+        paths = self._resolve(container_id)
+        if paths is None:
+            return []
+        try:
+            with open(os.path.join(paths["procs"], "cgroup.procs")) as f:
+                return [int(line) for line in f if line.strip()]
+        except OSError:
+            return []
+
+    def collect(self,
+                container_ids: Iterable[str],
+                now: Optional[float] = None) -> StatsSnapshot:
+        """
+        Sweep the given containers once. CPU percentages are averaged since
+        the previous sweep, so the first one reports 0 for each container.
+        Containers whose cgroup is gone are left out.
+        """
+        now = time.time() if now is None else now
+        snapshot = StatsSnapshot(timestamp=now)
+
+        for container_id in container_ids:
+            paths = self._resolve(container_id)
+            if paths is None:
+                continue
+            usage_ns = self._cpu_usage_ns(paths)
+            if usage_ns is None:
+                # Cgroup removed since it was resolved
+                self._paths.pop(container_id, None)
+                self._previous.pop(container_id, None)
+                continue
+
+            cpu_percent = 0.0
+            previous = self._previous.get(container_id)
+            if previous is not None and now > previous[1]:
+                elapsed_ns = (now - previous[1]) * 1e9 * self.cpu_count
+                cpu_percent = max(usage_ns - previous[0], 0) / elapsed_ns * 100.0
+            self._previous[container_id] = (usage_ns, now)
+
+            memory_usage, memory_limit = self._memory(paths)
+            rx_bytes, tx_bytes = self._network(paths)
+            snapshot.append(
+                container_id,
+                cpu_percent,
+                memory_usage,
+                memory_usage / memory_limit * 100.0 if memory_limit else 0.0,
+                rx_bytes,
+                tx_bytes
+            )
+        return snapshot
@@ -0,0 +1,141 @@
+# src/checkpoint_watcher.py
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+class CheckpointWatcher:
+    def __init__(self, checkpoint_dir: str, image: str):
+        """
+        Report CRIU image files as soon as they are closed for writing.
+
+        Uses inotify where available; elsewhere nothing is reported until
+        finish(), which degrades to a plain sequential transfer.
+
+        Args:
+            checkpoint_dir: Directory the dump is written under
+            image: Name of the images directory inside checkpoint_dir
+        """
+        self.checkpoint_dir = checkpoint_dir
+        self.image_dir = os.path.join(checkpoint_dir, image)
+        self.image = image
+        self.logger = logging.getLogger("limoce.watcher")
+
+        self._libc = _load_libc()
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        self._closed: List[str] = []
+        self._available = asyncio.Event()
+        self._reported: Dict[str, Tuple[int, int]] = {}
+
+    def start(self):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        if self._libc is None:
+            return
+        fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            self.logger.warning("inotify unavailable, pipelining disabled")
+            return
+        self._fd = fd
+        self._add_watch(self.checkpoint_dir)
+        if os.path.isdir(self.image_dir):
+            self._add_watch(self.image_dir)
+        asyncio.get_event_loop().add_reader(fd, self._read_events)
+
+    def stop(self):
+        if self._fd is not None:
+            asyncio.get_event_loop().remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(
+            self._fd,
+            os.fsencode(path),
+            IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        )
+        if wd >= 0:
+            self._watches[wd] = path
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & IN_CREATE and path.startswith(self.image_dir):
+                    self._add_watch(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO) and path.startswith(self.image_dir + os.sep):
+                self._closed.append(os.path.relpath(path, self.image_dir))
+                self._available.set()
+
+    async def wait(self):
+        """Wait until at least one closed file is pending."""
+        await self._available.wait()
+
+    def drain(self) -> List[str]:
+        """Take the files closed since the last call (relative paths)."""
+        closed, self._closed = self._closed, []
+        self._available.clear()
+        files = []
+        for rel_path in dict.fromkeys(closed):
+            path = os.path.join(self.image_dir, rel_path)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            self._reported[rel_path] = (st.st_size, st.st_mtime_ns)
+            files.append(rel_path)
+        return files
+
+    def finish(self) -> List[str]:
+        """
+        After the dump has exited: every file not yet reported, or
+        changed since it was, so nothing missed by the watch is lost.
+        """
+        self.stop()
+        files = self.drain()
+        for root, _, names in os.walk(self.image_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if os.path.islink(path):
+                    continue
+                rel_path = os.path.relpath(path, self.image_dir)
+                st = os.stat(path)
+                if rel_path in files:
+                    continue
+                if self._reported.get(rel_path) != (st.st_size, st.st_mtime_ns):
+                    self._reported[rel_path] = (st.st_size, st.st_mtime_ns)
+                    files.append(rel_path)
+        return files
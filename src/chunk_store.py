@@ -0,0 +1,290 @@
+# src/chunk_store.py
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+CHUNKING_FIXED = "fixed"
+CHUNKING_CDC = "cdc"
+
+# Gear table for content-defined chunking
+_GEAR = [
+    int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], 'little')
+    for i in range(256)
+]
+_MASK64 = (1 << 64) - 1
+
+def _cdc_cut(data: bytes, min_size: int, mask: int, max_size: int) -> int:
+    """Find the next content-defined cut point in data (gear rolling hash)."""
+    end = min(len(data), max_size)
+    if end <= min_size:
+        return end
+    fingerprint = 0
+    gear = _GEAR
+    for i in range(min_size, end):
+        fingerprint = ((fingerprint << 1) + gear[data[i]]) & _MASK64
+        if not fingerprint & mask:
+            return i + 1
+    return end
+
+class ChunkStore:
+    def __init__(self,
+                 base_dir: str,
+                 max_bytes: int = 10 * 1024 ** 3,
+                 chunk_size: int = 1024 * 1024,
+                 chunking: str = CHUNKING_FIXED):
+        """
+        Content-addressed store of checkpoint image chunks.
+
+        Args:
+            base_dir: Directory chunks are kept in, e.g. <checkpoint_dir>/chunks
+            max_bytes: Size the store is evicted down to (least recently used first)
+            chunk_size: Fixed chunk size, or average chunk size for 'cdc'
+            chunking: 'fixed' or 'cdc' (content-defined, survives shifted
+                data but is much slower to compute in pure Python)
+        """
+        if chunking not in (CHUNKING_FIXED, CHUNKING_CDC):
+            raise ValueError(f"Unknown chunking mode: {chunking}")
+
+        self.base_dir = base_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.chunking = chunking
+        self.logger = logging.getLogger("limoce.chunks")
+
+        # CDC parameters: cut where the low bits of the gear hash are zero
+        self._cdc_min = chunk_size // 4
+        self._cdc_max = chunk_size * 4
+        self._cdc_mask = (1 << max(chunk_size.bit_length() - 1, 1)) - 1
+
+        self._lock = threading.Lock()
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._pinned: Dict[str, Set[str]] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_saved = 0
+
+        os.makedirs(base_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU index from disk, oldest first."""
+        entries = []
+        for root, _, names in os.walk(self.base_dir):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                st = os.stat(os.path.join(root, name))
+                entries.append((st.st_mtime, name, st.st_size))
+        for _, digest, size in sorted(entries):
+            self._index[digest] = size
+            self._size += size
+
+    def _chunk_path(self, digest: str) -> str:
+        return os.path.join(self.base_dir, digest[:2], digest)
+
+    def iter_chunks(self, path: str) -> Iterator[Tuple[str, bytes]]:
+        """Split a file into (sha256, data) chunks without reading it whole."""
+        with open(path, 'rb') as f:
+            if self.chunking == CHUNKING_FIXED:
+                while True:
+                    data = f.read(self.chunk_size)
+                    if not data:
+                        break
+                    yield hashlib.sha256(data).hexdigest(), data
+                return
+
+            buffer = b""
+            eof = False
+            while buffer or not eof:
+                if not eof and len(buffer) < self._cdc_max:
+                    data = f.read(self._cdc_max)
+                    eof = not data
+                    buffer += data
+                    continue
+                cut = _cdc_cut(buffer, self._cdc_min, self._cdc_mask, self._cdc_max)
+                data, buffer = buffer[:cut], buffer[cut:]
+                yield hashlib.sha256(data).hexdigest(), data
+
+    def add_directory(self,
+                      image_dir: str,
+                      store: bool = True,
+                      pin: Optional[str] = None) -> Dict:
+        """
+        Chunk every file of a checkpoint image directory.
+
+        Args:
+            image_dir: CRIU images directory
+            store: Also keep the chunks here, so a later migration back to
+                this node only needs what changed
+            pin: Optional key; stored chunks are protected from eviction
+                until unpin(key), e.g. until they have been sent
+
+        Returns:
+            Manifest with per-file size, sha256 and ordered (digest, length)
+            chunk list, plus symlinks.
+        """
+        files = {}
+        symlinks = {}
+        for root, dirs, names in os.walk(image_dir):
+            for name in dirs + names:
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, image_dir)
+                if os.path.islink(path):
+                    symlinks[rel_path] = os.readlink(path)
+                    continue
+                if name not in names:
+                    continue
+                files[rel_path] = self.add_file(path, store, pin)
+        return {"files": files, "symlinks": symlinks}
+
+    def add_file(self, path: str, store: bool = True, pin: Optional[str] = None) -> Dict:
+        """
+        Chunk one file; returns its size, sha256 and (digest, length) list.
+        Chunks stored under a pin key are kept until unpin(key).
+        """
+        file_hash = hashlib.sha256()
+        chunks = []
+        size = 0
+        for digest, data in self.iter_chunks(path):
+            file_hash.update(data)
+            chunks.append([digest, len(data)])
+            size += len(data)
+            if store:
+                self.put(digest, data, verify=False, pin=pin)
+        return {
+            "size": size,
+            "sha256": file_hash.hexdigest(),
+            "chunks": chunks
+        }
+
+    def has(self, digest: str) -> bool:
+        with self._lock:
+            return digest in self._index
+
+    def missing(self, digests: Iterable[str], pin: Optional[str] = None) -> List[str]:
+        """
+        Return the digests not in the store, counting hits and misses.
+
+        Args:
+            digests: Chunk digests a sender wants to transfer
+            pin: Optional key; present and incoming chunks are protected
+                from eviction until unpin(key)
+        """
+        missing = []
+        with self._lock:
+            wanted = set()
+            for digest in digests:
+                if digest in wanted:
+                    continue
+                wanted.add(digest)
+                if digest in self._index:
+                    self._index.move_to_end(digest)
+                    self._hits += 1
+                    self._bytes_saved += self._index[digest]
+                else:
+                    self._misses += 1
+                    missing.append(digest)
+            if pin is not None:
+                self._pinned.setdefault(pin, set()).update(wanted)
+        return missing
+
+    def unpin(self, key: str):
+        """Release chunks pinned under key and evict if over budget."""
+        with self._lock:
+            self._pinned.pop(key, None)
+            self._evict()
+
+    def put(self, digest: str, data: bytes, verify: bool = True, pin: Optional[str] = None):
+        """Store a chunk under its sha256 digest, pinned under pin if given."""
+        if verify and hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"Chunk {digest} does not match its content")
+
+        with self._lock:
+            if pin is not None:
+                self._pinned.setdefault(pin, set()).add(digest)
+            if digest in self._index:
+                self._index.move_to_end(digest)
+                return
+
+        path = self._chunk_path(digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if digest not in self._index:
+                self._index[digest] = len(data)
+                self._size += len(data)
+            self._evict()
+
+    def get(self, digest: str) -> bytes:
+        with open(self._chunk_path(digest), 'rb') as f:
+            data = f.read()
+        with self._lock:
+            if digest in self._index:
+                self._index.move_to_end(digest)
+        return data
+
+    def assemble(self, files: Dict[str, Dict], image_dir: str) -> List[str]:
+        """
+        Rebuild image files from their chunk lists.
+
+        Returns a list of errors (missing chunks, checksum mismatches).
+        """
+        errors = []
+        for rel_path, entry in files.items():
+            path = os.path.join(image_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            file_hash = hashlib.sha256()
+            try:
+                with open(path, 'wb') as f:
+                    for digest, _ in entry["chunks"]:
+                        data = self.get(digest)
+                        file_hash.update(data)
+                        f.write(data)
+            except FileNotFoundError:
+                errors.append(f"{rel_path}: missing chunk")
+                continue
+            if file_hash.hexdigest() != entry["sha256"]:
+                errors.append(f"{rel_path}: checksum mismatch")
+        return errors
+
+    def _evict(self):
+        """Drop least recently used, unpinned chunks until under max_bytes."""
+        if self._size <= self.max_bytes:
+            return
+        pinned = set().union(*self._pinned.values()) if self._pinned else set()
+        for digest in list(self._index):
+            if self._size <= self.max_bytes:
+                break
+            if digest in pinned:
+                continue
+            size = self._index.pop(digest)
+            self._size -= size
+            self._evictions += 1
+            try:
+                os.remove(self._chunk_path(digest))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict:
+        """Hit/miss and occupancy statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": self._hits / lookups if lookups else 0.0,
+                "bytes_saved": self._bytes_saved,
+                "chunks": len(self._index),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions
+            }
@@ -0,0 +1,234 @@
+# src/compression.py
+import logging
+import os
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+import psutil
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class _NoCompressor:
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def flush(self) -> bytes:
+        return b""
+
+class _NoDecompressor(_NoCompressor):
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+class _ZlibDecompressor:
+    def __init__(self):
+        self._obj = zlib.decompressobj()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+class _LZ4Compressor:
+    def __init__(self, level: int):
+        self._obj = lz4_frame.LZ4FrameCompressor(compression_level=level)
+        self._header = self._obj.begin()
+
+    def compress(self, data: bytes) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        header, self._header = self._header, b""
+        return header + self._obj.flush()
+
+class _LZ4Decompressor:
+    def __init__(self):
+        self._obj = lz4_frame.LZ4FrameDecompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._obj.decompress(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+@dataclass
+class CodecProfile:
+    codec: str
+    level: int
+    # Single-core compression speed (bytes/sec) and compressed/raw ratio
+    # on checkpoint images; starting points, refined by observe()
+    speed: float
+    ratio: float
+
+DEFAULT_LEVELS = {"none": 0, "zlib": 1, "lz4": 0, "zstd": 1}
+
+def available_codecs() -> List[str]:
+    """Codecs usable on this node, cheapest first."""
+    codecs = ["none", "zlib"]
+    if lz4_frame is not None:
+        codecs.append("lz4")
+    if zstandard is not None:
+        codecs.append("zstd")
+    return codecs
+
+def get_compressor(codec: str, level: Optional[int] = None):
+    """Streaming compressor with compress()/flush()."""
+    if level is None:
+        level = DEFAULT_LEVELS.get(codec, 0)
+    if codec == "none":
+        return _NoCompressor()
+    if codec == "zlib":
+        return zlib.compressobj(level)
+    if codec == "lz4" and lz4_frame is not None:
+        return _LZ4Compressor(level)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    raise ValueError(f"Codec not available: {codec}")
+
+def get_decompressor(codec: str):
+    """Streaming decompressor with decompress()/flush()."""
+    if codec == "none":
+        return _NoDecompressor()
+    if codec == "zlib":
+        return _ZlibDecompressor()
+    if codec == "lz4" and lz4_frame is not None:
+        return _LZ4Decompressor()
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Codec not available: {codec}")
+
+def compress_block(codec: str, level: int, data: bytes) -> bytes:
+    compressor = get_compressor(codec, level)
+    return compressor.compress(data) + compressor.flush()
+
+def decompress_block(codec: str, data: bytes) -> bytes:
+    decompressor = get_decompressor(codec)
+    return decompressor.decompress(data) + decompressor.flush()
+
+DEFAULT_PROFILES = [
+    CodecProfile("none", 0, float("inf"), 1.0),
+    CodecProfile("lz4", 0, 500e6, 0.55),
+    CodecProfile("zstd", 1, 300e6, 0.42),
+    CodecProfile("zstd", 3, 150e6, 0.38),
+    CodecProfile("zlib", 1, 60e6, 0.45),
+    CodecProfile("zstd", 9, 40e6, 0.35),
+    CodecProfile("zlib", 6, 20e6, 0.40),
+]
+
+# Shortest window over which a psutil CPU sample is trusted, in seconds
+MIN_CPU_SAMPLE_INTERVAL = 0.1
+
+class CompressionSelector:
+    def __init__(self,
+                 profiles: Optional[List[CodecProfile]] = None,
+                 smoothing: float = 0.3):
+        """
+        Pick a codec and level from link bandwidth and spare CPU.
+
+        Compression runs alongside the send, so a transfer moves at the
+        slower of the compressor and the link carrying the compressed
+        stream. The profile that maximises raw bytes/sec wins; measured
+        transfers refine each profile's speed and ratio.
+
+        Args:
+            profiles: Candidate codec/level profiles
+            smoothing: EWMA weight given to each new observation
+        """
+        self.profiles = [
+            CodecProfile(p.codec, p.level, p.speed, p.ratio)
+            for p in (profiles or DEFAULT_PROFILES)
+        ]
+        self.smoothing = smoothing
+        self.logger = logging.getLogger("limoce.compression")
+        # The first non-blocking sample only sets psutil's baseline and
+        # always reads 0.0, so take it here rather than in select()
+        psutil.cpu_percent(interval=None)
+        self._cpu_primed = time.monotonic()
+
+    def cpu_available(self) -> float:
+        """Idle CPU, in cores."""
+        cores = os.cpu_count() or 1
+        if time.monotonic() - self._cpu_primed < MIN_CPU_SAMPLE_INTERVAL:
+            # Too soon after priming for a meaningful sample; fall back
+            # to the 1-minute load average
+            try:
+                return max(cores - os.getloadavg()[0], 0.0)
+            except OSError:
+                pass
+        idle = 1.0 - psutil.cpu_percent(interval=None) / 100.0
+        return max(idle, 0.0) * cores
+
+    def effective_throughput(self,
+                             profile: CodecProfile,
+                             bandwidth: float,
+                             cpu_available: float,
+                             streams: int = 1) -> float:
+        """Raw bytes/sec a transfer would reach with this profile."""
+        if profile.codec == "none":
+            return bandwidth
+        # Each stream compresses on its own, using at most one core
+        cores = min(cpu_available, streams, psutil.cpu_count() or 1)
+        compress_speed = profile.speed * cores
+        return min(compress_speed, bandwidth / profile.ratio)
+
+    def select(self,
+               bandwidth: float,
+               codecs: Optional[List[str]] = None,
+               cpu_available: Optional[float] = None,
+               streams: int = 1) -> Tuple[str, int]:
+        """
+        Choose (codec, level).
+
+        Args:
+            bandwidth: Measured link bandwidth in bytes/sec
+            codecs: Codecs both ends support
+            cpu_available: Idle cores; measured when not given
+            streams: Parallel streams the transfer will use
+        """
+        codecs = codecs or available_codecs()
+        if cpu_available is None:
+            cpu_available = self.cpu_available()
+
+        candidates = [p for p in self.profiles if p.codec in codecs]
+        best = max(
+            candidates,
+            key=lambda p: self.effective_throughput(p, bandwidth, cpu_available, streams)
+        )
+        self.logger.debug(
+            f"Selected {best.codec}:{best.level} for {bandwidth / 1e6:.1f} MB/s "
+            f"with {cpu_available:.1f} idle cores and {streams} streams"
+        )
+        return best.codec, best.level
+
+    def observe(self,
+                codec: str,
+                level: int,
+                raw_bytes: int,
+                compressed_bytes: int,
+                compress_time: float):
+        """Fold a measured transfer into the matching profile."""
+        if codec == "none" or raw_bytes == 0:
+            return
+        for profile in self.profiles:
+            if profile.codec == codec and profile.level == level:
+                alpha = self.smoothing
+                profile.ratio += alpha * (compressed_bytes / raw_bytes - profile.ratio)
+                if compress_time > 0:
+                    profile.speed += alpha * (raw_bytes / compress_time - profile.speed)
+                return
+
+    def stats(self) -> Dict:
+        return {
+            f"{p.codec}:{p.level}": {"speed": p.speed, "ratio": p.ratio}
+            for p in self.profiles
+        }
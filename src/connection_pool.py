@@ -0,0 +1,162 @@
+# src/connection_pool.py
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+import aiohttp
+
+@dataclass
+class _PooledSession:
+    session: aiohttp.ClientSession
+    created: float
+    last_used: float
+    requests: int = 0
+    active: int = 0
+
+class ConnectionPool:
+    def __init__(self,
+                 limit: int = 256,
+                 limit_per_host: int = 16,
+                 keepalive_timeout: float = 30.0,
+                 dns_cache_ttl: int = 300,
+                 idle_timeout: float = 300.0):
+        """
+        HTTP sessions keyed by target endpoint ("host:port"), created on
+        first use and sharing one keep-alive TCPConnector.
+
+        Args:
+            limit: Connections open at once across all endpoints
+            limit_per_host: Connections open at once to one endpoint
+            keepalive_timeout: Seconds an unused connection is kept open
+            dns_cache_ttl: Seconds resolved addresses are cached
+            idle_timeout: Seconds without requests before an endpoint's
+                session is evicted
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.idle_timeout = idle_timeout
+        self.logger = logging.getLogger("limoce.pool")
+
+        self._connector: Optional[aiohttp.TCPConnector] = None
+        self._sessions: Dict[str, _PooledSession] = {}
+        self._by_session: Dict[int, _PooledSession] = {}
+        self._last_eviction = time.monotonic()
+        self._connections_created = 0
+        self._connections_reused = 0
+        self._sessions_created = 0
+        self._sessions_evicted = 0
+
+        self._trace = aiohttp.TraceConfig()
+        self._trace.on_request_start.append(self._on_request_start)
+        self._trace.on_request_end.append(self._on_request_done)
+        self._trace.on_request_exception.append(self._on_request_done)
+        self._trace.on_connection_create_end.append(self._on_connection_created)
+        self._trace.on_connection_reuseconn.append(self._on_connection_reused)
+
+    def _get_connector(self) -> aiohttp.TCPConnector:
+        # Created lazily: a connector binds to the running event loop
+        if self._connector is None or self._connector.closed:
+            self._connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_cache_ttl
+            )
+        return self._connector
+
+    async def session(self, endpoint: str) -> aiohttp.ClientSession:
+        """Session for an endpoint, created on first use."""
+        now = time.monotonic()
+        if now - self._last_eviction >= self.idle_timeout / 2:
+            await self.evict_idle()
+
+        entry = self._sessions.get(endpoint)
+        if entry is None or entry.session.closed:
+            session = aiohttp.ClientSession(
+                connector=self._get_connector(),
+                connector_owner=False,
+                trace_configs=[self._trace]
+            )
+            entry = _PooledSession(session=session, created=now, last_used=now)
+            self._sessions[endpoint] = entry
+            self._by_session[id(session)] = entry
+            self._sessions_created += 1
+        entry.last_used = now
+        return entry.session
+
+    async def evict_idle(self) -> int:
+        """Close sessions idle for longer than idle_timeout; returns how many."""
+        now = time.monotonic()
+        self._last_eviction = now
+        idle = [
+            endpoint for endpoint, entry in self._sessions.items()
+            if entry.active == 0 and now - entry.last_used > self.idle_timeout
+        ]
+        for endpoint in idle:
+            await self.close_endpoint(endpoint)
+            self._sessions_evicted += 1
+        if idle:
+            self.logger.debug(f"Evicted {len(idle)} idle sessions")
+        return len(idle)
+
+    async def close_endpoint(self, endpoint: str):
+        """Close the session of one endpoint."""
+        entry = self._sessions.pop(endpoint, None)
+        if entry is not None:
+            self._by_session.pop(id(entry.session), None)
+            await entry.session.close()
+
+    async def close(self):
+        """Close every session and the shared connector."""
+        for endpoint in list(self._sessions):
+            await self.close_endpoint(endpoint)
+        if self._connector is not None:
+            await self._connector.close()
+            self._connector = None
+
+    async def _on_request_start(self, session, context, params):
+        entry = self._by_session.get(id(session))
+        if entry is not None:
+            entry.requests += 1
+            entry.active += 1
+            entry.last_used = time.monotonic()
+
+    async def _on_request_done(self, session, context, params):
+        entry = self._by_session.get(id(session))
+        if entry is not None:
+            entry.active -= 1
+            entry.last_used = time.monotonic()
+
+    async def _on_connection_created(self, session, context, params):
+        self._connections_created += 1
+
+    async def _on_connection_reused(self, session, context, params):
+        self._connections_reused += 1
+
+    def stats(self) -> Dict:
+        """Pool-wide connection reuse and per-endpoint session statistics."""
+        now = time.monotonic()
+        connections = self._connections_created + self._connections_reused
+        return {
+            "sessions": len(self._sessions),
+            "sessions_created": self._sessions_created,
+            "sessions_evicted": self._sessions_evicted,
+            "connections_created": self._connections_created,
+            "connections_reused": self._connections_reused,
+            "reuse_ratio": (self._connections_reused / connections
+                            if connections else 0.0),
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "endpoints": {
+                endpoint: {
+                    "requests": entry.requests,
+                    "active": entry.active,
+                    "age": now - entry.created,
+                    "idle": now - entry.last_used
+                }
+                for endpoint, entry in self._sessions.items()
+            }
+        }
@@ -1,26 +1,53 @@
 # src/container_manager.py
+import asyncio
 import docker
 import logging
 import json
+import os
+import select
 import time
 from typing import Dict, Optional, List
 import subprocess
-from prometheus_client import Gauge, Counter
+from .cgroup_collector import CgroupCollector, StatsSnapshot
+from .container_stats import ContainerStatsStream, parse_stats
+from .dirty_page_profiler import DirtyPageProfiler
+from .docker_driver import AsyncDockerDriver
+from .prometheus_metrics import MigrationMetrics
+
+# Label marking containers LIMOCE created and collects stats for
+MANAGED_LABEL = "limoce.managed"
 
 class ContainerManager:
-    def __init__(self, docker_host: str = "unix://var/run/docker.sock"):
+    def __init__(self, 
+                 docker_host: str = "unix://var/run/docker.sock",
+                 runc_root: str = "/run/docker/runtime-runc/moby",
+                 bundle_root: str = "/run/containerd/io.containerd.runtime.v2.task/moby",
+                 stats_window: int = 120,
+                 cgroup_collector: Optional[CgroupCollector] = None,
+                 metrics: Optional[MigrationMetrics] = None,
+                 driver: Optional[AsyncDockerDriver] = None):
         self.client = docker.DockerClient(base_url=docker_host)
+        # Async Engine API client used on the migration path
+        self.driver = driver or AsyncDockerDriver(docker_host)
+        self.runc_root = runc_root
+        self.bundle_root = bundle_root
+        self.stats_window = stats_window
+        self._stats_streams: Dict[str, ContainerStatsStream] = {}
+        self._dirty_profilers: Dict[str, DirtyPageProfiler] = {}
+        # Container id -> interval of profilers paused during pre-copy
+        self._paused_dirty_profilers: Dict[str, float] = {}
+        self.cgroup_collector = cgroup_collector or CgroupCollector()
         self.logger = logging.getLogger("limoce.container")
         
         # Prometheus metrics
-        self.container_cpu_usage = Gauge('container_cpu_percent', 
-                                       'Container CPU usage percentage')
-        self.container_memory_usage = Gauge('container_memory_usage_bytes', 
-                                          'Container memory usage in bytes')
-        self.migration_duration = Gauge('container_migration_duration_seconds', 
-                                      'Container migration duration')
-        self.migration_counter = Counter('container_migrations_total', 
-                                       'Total number of container migrations')
+        self.metrics = metrics or MigrationMetrics()
+
+    async def run_blocking(self, func, *args):
+        """
+        Run a blocking Docker SDK, CRIU or filesystem call on the driver's
+        bounded executor, away from the loop's default one.
+        """
+        return await self.driver.run_blocking(func, *args)
 
     def create_container(self, 
                         image: str, 
@@ -36,7 +63,8 @@ class ContainerManager:
                 mem_limit=kwargs.get('mem_limit', '512m'),
                 network_mode=kwargs.get('network_mode', 'bridge'),
                 environment=kwargs.get('environment', {}),
-                volumes=kwargs.get('volumes', {})
+                volumes=kwargs.get('volumes', {}),
+                labels={**kwargs.get('labels', {}), MANAGED_LABEL: "true"}
             )
             self.logger.info(f"Container {name} created successfully")
             return container
@@ -44,53 +72,374 @@ class ContainerManager:
             self.logger.error(f"Failed to create container: {e}")
             raise
 
-    def get_container_stats(self, container_id: str) -> Dict:
-        """Get container resource usage statistics."""
+    def subscribe_stats(self, container_id: str) -> Optional[ContainerStatsStream]:
+        """Follow a container's stats stream; returns the running subscription."""
+        stream = self._stats_streams.get(container_id)
+        if stream is not None and stream.active:
+            return stream
         try:
             container = self.client.containers.get(container_id)
-            stats = container.stats(stream=False)
-            
-            # Calculate CPU percentage
-            cpu_delta = stats['cpu_stats']['cpu_usage']['total_usage'] - \
-                       stats['precpu_stats']['cpu_usage']['total_usage']
-            system_delta = stats['cpu_stats']['system_cpu_usage'] - \
-                          stats['precpu_stats']['system_cpu_usage']
-            cpu_percent = (cpu_delta / system_delta) * 100.0
-            
-            # Calculate memory usage
-            memory_usage = stats['memory_stats']['usage']
-            memory_limit = stats['memory_stats']['limit']
-            memory_percent = (memory_usage / memory_limit) * 100.0
-            
+        except Exception as e:
+            self.logger.error(f"Failed to subscribe to container stats: {e}")
+            return None
+        stream = ContainerStatsStream(container, self.stats_window)
+        stream.start()
+        self._stats_streams[container_id] = stream
+        return stream
+
+    def unsubscribe_stats(self, container_id: str):
+        stream = self._stats_streams.pop(container_id, None)
+        if stream is not None:
+            stream.stop()
+
+    def get_container_stats(self, container_id: str) -> Dict:
+        """
+        Get container resource usage statistics.
+
+        Served from the container's stats subscription, started on first
+        use; only that first call waits for Docker to take a sample.
+        """
+        try:
+            stream = self.subscribe_stats(container_id)
+            if stream is not None and stream.wait_for_sample(timeout=5.0):
+                stats = stream.latest()
+            else:
+                container = self.client.containers.get(container_id)
+                stats = parse_stats(container.stats(stream=False))
+            if stats is None:
+                return {}
+
             # Update Prometheus metrics
-            self.container_cpu_usage.set(cpu_percent)
-            self.container_memory_usage.set(memory_usage)
-            
-            return {
-                'cpu_percent': cpu_percent,
-                'memory_usage': memory_usage,
-                'memory_percent': memory_percent,
-                'network_rx_bytes': stats['networks']['eth0']['rx_bytes'],
-                'network_tx_bytes': stats['networks']['eth0']['tx_bytes']
-            }
+            self.metrics.observe_container(container_id, stats)
+
+            return stats
         except Exception as e:
             self.logger.error(f"Failed to get container stats: {e}")
             return {}
 
+    def collect_managed_stats(self) -> StatsSnapshot:
+        """
+        Stats of every LIMOCE-managed container on this node in one sweep:
+        a single container listing, then cgroup files instead of one
+        Docker stats call per container.
+        """
+        try:
+            containers = self.client.containers.list(
+                filters={"label": MANAGED_LABEL}, sparse=True
+            )
+            container_ids = [container.id for container in containers]
+        except Exception as e:
+            self.logger.error(f"Failed to list managed containers: {e}")
+            container_ids = []
+        return self.cgroup_collector.collect(container_ids)
+
+    def get_stats_window(self,
+                         container_id: str,
+                         seconds: Optional[float] = None) -> Dict:
+        """Rolling CPU mean/p95 and memory slope from the stats subscription."""
+        stream = self.subscribe_stats(container_id)
+        if stream is None:
+            return {}
+        return stream.window(seconds)
+
+    def subscribe_dirty_pages(self,
+                              container_id: str,
+                              interval: float = 1.0) -> Optional[DirtyPageProfiler]:
+        """
+        Start sampling a container's memory write rate from soft-dirty
+        page bits; returns the running profiler.
+        """
+        profiler = self._dirty_profilers.get(container_id)
+        if profiler is not None and (profiler.active
+                                     or container_id in self._paused_dirty_profilers):
+            return profiler
+        try:
+            full_id = self.client.containers.get(container_id).id
+        except Exception as e:
+            self.logger.error(f"Failed to profile container dirty pages: {e}")
+            return None
+
+        def pids() -> List[int]:
+            # Every process of the container, or its init process alone
+            # when the cgroup cannot be found
+            found = self.cgroup_collector.pids(full_id)
+            if not found:
+                pid = self.get_container_pid(full_id)
+                found = [pid] if pid else []
+            return found
+
+        profiler = DirtyPageProfiler(full_id, pids, interval, self.stats_window)
+        profiler.start()
+        self._dirty_profilers[container_id] = profiler
+        return profiler
+
+    def unsubscribe_dirty_pages(self, container_id: str):
+        self._paused_dirty_profilers.pop(container_id, None)
+        profiler = self._dirty_profilers.pop(container_id, None)
+        if profiler is not None:
+            profiler.stop()
+
+    def pause_dirty_pages(self, container_id: str) -> bool:
+        """
+        Stop profiling a container until resume_dirty_pages, waiting for
+        any scan in progress. CRIU pre-dumps track the pages written since
+        the previous round in the same soft-dirty bits the profiler clears.
+        Its last samples stay readable meanwhile.
+
+        Returns:
+            Whether a profiler was running
+        """
+        profiler = self._dirty_profilers.get(container_id)
+        if profiler is None or not profiler.active:
+            return False
+        profiler.stop()
+        self._paused_dirty_profilers[container_id] = profiler.interval
+        return True
+
+    def resume_dirty_pages(self, container_id: str) -> Optional[DirtyPageProfiler]:
+        """Restart profiling paused by pause_dirty_pages."""
+        interval = self._paused_dirty_profilers.pop(container_id, None)
+        if interval is None:
+            return None
+        return self.subscribe_dirty_pages(container_id, interval)
+
+    def get_dirty_page_window(self,
+                              container_id: str,
+                              seconds: Optional[float] = None) -> Dict:
+        """
+        Dirty rate and writable working set of a profiled container; empty
+        unless subscribe_dirty_pages was called, as profiling costs the
+        container a page fault per first write to each page per interval.
+        """
+        profiler = self._dirty_profilers.get(container_id)
+        if profiler is None:
+            return {}
+        return profiler.window(seconds)
+
+    async def wait_until_running(self, container_id: str, timeout: float = 30.0) -> bool:
+        """
+        Wait for a container to be running, from its state or, if not yet,
+        its start/restore event; False if it dies or the wait times out.
+        """
+        since = time.time()
+        info = await self.driver.inspect(container_id)
+        if info is not None and info.get("State", {}).get("Running"):
+            return True
+
+        async def watch() -> bool:
+            # Events since just before the inspect, so none is missed
+            async for event in self.driver.events(
+                filters={"type": ["container"], "container": [container_id]},
+                since=since
+            ):
+                action = event.get("Action") or event.get("status", "")
+                if action in ("start", "restore"):
+                    return True
+                if action in ("die", "oom", "destroy"):
+                    return False
+            return False
+
+        try:
+            return await asyncio.wait_for(watch(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Container {container_id} not running after {timeout}s")
+            return False
+        except Exception as e:
+            self.logger.error(f"Failed to watch container {container_id}: {e}")
+            return False
+
+    async def wait_until_running_runc(self,
+                                      container_id: str,
+                                      timeout: float = 30.0,
+                                      poll_interval: float = 0.2) -> bool:
+        """
+        Wait for a container restored directly through runc (post-copy
+        restores bypass dockerd, which never reports them) to be running,
+        polling runc state; False if it stops or the wait times out.
+        """
+        info = await self.driver.inspect(container_id)
+        runc_id = info.get("Id", container_id) if info else container_id
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                returncode, stdout, _ = await self.driver.command_output(
+                    ["runc", "--root", self.runc_root, "state", runc_id]
+                )
+            except OSError as e:
+                self.logger.error(f"Failed to run runc state: {e}")
+                return False
+            if returncode == 0:
+                try:
+                    status = json.loads(stdout).get("status")
+                except ValueError:
+                    status = None
+                if status == "running":
+                    return True
+                if status == "stopped":
+                    self.logger.error(f"Container {container_id} stopped after restore")
+                    return False
+            # Not created yet, or paused while restoring
+            if time.monotonic() >= deadline:
+                self.logger.error(f"Container {container_id} not running after {timeout}s")
+                return False
+            await asyncio.sleep(poll_interval)
+
+    async def get_container_address(self, container_id: str) -> Optional[str]:
+        """IP address of a container on its first network."""
+        info = await self.driver.inspect(container_id)
+        if info is None:
+            return None
+        settings = info.get("NetworkSettings", {})
+        if settings.get("IPAddress"):
+            return settings["IPAddress"]
+        for network in (settings.get("Networks") or {}).values():
+            if network.get("IPAddress"):
+                return network["IPAddress"]
+        return None
+
+    async def get_container_cpu_request(self, container_id: str) -> float:
+        """
+        CPUs the container is limited to (NanoCpus, or CpuQuota over
+        CpuPeriod); 0.0 when it has no limit or cannot be inspected.
+        """
+        info = await self.driver.inspect(container_id)
+        if info is None:
+            return 0.0
+        host_config = info.get("HostConfig") or {}
+        if host_config.get("NanoCpus"):
+            return host_config["NanoCpus"] / 1e9
+        quota = host_config.get("CpuQuota") or 0
+        if quota > 0:
+            return quota / (host_config.get("CpuPeriod") or 100000)
+        return 0.0
+
+    def get_container_pid(self, container_id: str) -> Optional[int]:
+        """Get the host PID of the container's init process."""
+        try:
+            container = self.client.containers.get(container_id)
+            pid = container.attrs['State']['Pid']
+            return pid or None
+        except Exception as e:
+            self.logger.error(f"Failed to get container pid: {e}")
+            return None
+
+    def pre_dump_container(self,
+                           container_id: str,
+                           image_dir: str,
+                           parent_dir: Optional[str] = None) -> bool:
+        """
+        Pre-dump container memory while it keeps running.
+
+        The docker CLI has no pre-dump support, so this drives runc (the
+        runtime docker uses underneath) directly. Only pages dirtied since
+        the pre-dump in parent_dir are written.
+
+        Args:
+            container_id: Container to pre-dump
+            image_dir: Directory for this round's images
+            parent_dir: Images directory of the previous round, if any
+        """
+        try:
+            container = self.client.containers.get(container_id)
+            os.makedirs(image_dir, exist_ok=True)
+
+            result = subprocess.run(
+                self._pre_dump_cmd(container.id, image_dir, parent_dir),
+                capture_output=True,
+                text=True
+            )
+
+            if result.returncode == 0:
+                self.logger.info(f"Container {container_id} pre-dumped to {image_dir}")
+                return True
+            else:
+                self.logger.error(f"Pre-dump failed: {result.stderr}")
+                return False
+        except Exception as e:
+            self.logger.error(f"Pre-dump error: {e}")
+            return False
+
+    async def pre_dump_container_async(self,
+                                       container_id: str,
+                                       image_dir: str,
+                                       parent_dir: Optional[str] = None) -> bool:
+        """pre_dump_container without blocking the event loop."""
+        try:
+            info = await self.driver.inspect(container_id)
+            if info is None:
+                return False
+            os.makedirs(image_dir, exist_ok=True)
+            returncode, stderr = await self.driver.run_command(
+                self._pre_dump_cmd(info["Id"], image_dir, parent_dir)
+            )
+            if returncode == 0:
+                self.logger.info(f"Container {container_id} pre-dumped to {image_dir}")
+                return True
+            self.logger.error(f"Pre-dump failed: {stderr}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Pre-dump error: {e}")
+            return False
+
+    def _pre_dump_cmd(self,
+                      full_id: str,
+                      image_dir: str,
+                      parent_dir: Optional[str]) -> List[str]:
+        cmd = [
+            "runc", "--root", self.runc_root, "checkpoint",
+            "--pre-dump",
+            "--image-path", image_dir,
+        ]
+        if parent_dir:
+            cmd.extend(["--parent-path", os.path.relpath(parent_dir, image_dir)])
+        cmd.append(full_id)
+        return cmd
+
+    def _incremental_checkpoint_cmd(self,
+                                    full_id: str,
+                                    image_dir: str,
+                                    parent_dir: str) -> List[str]:
+        # Docker cannot chain checkpoints, so runc writes the image
+        # directly in the layout `docker start --checkpoint` expects
+        return [
+            "runc", "--root", self.runc_root, "checkpoint",
+            "--image-path", image_dir,
+            "--parent-path", os.path.relpath(parent_dir, image_dir),
+            full_id
+        ]
+
     def checkpoint_container(self, 
                            container_id: str, 
-                           checkpoint_dir: str) -> bool:
-        """Create a checkpoint of the running container."""
+                           checkpoint_dir: str,
+                           checkpoint_name: Optional[str] = None,
+                           parent_dir: Optional[str] = None) -> bool:
+        """
+        Create a checkpoint of the running container.
+
+        Args:
+            container_id: Container to checkpoint
+            checkpoint_dir: Directory holding the checkpoint
+            checkpoint_name: Checkpoint name, defaults to checkpoint_<container_id>
+            parent_dir: Pre-dump images to build on (pre-copy final round)
+        """
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
         try:
             container = self.client.containers.get(container_id)
             
-            # Ensure checkpoint directory exists
-            checkpoint_cmd = (
-                f"docker checkpoint create --checkpoint-dir={checkpoint_dir} "
-                f"{container_id} checkpoint_{int(time.time())}"
-            )
+            if parent_dir:
+                # Incremental dump on top of pre-dump rounds
+                image_dir = os.path.join(checkpoint_dir, checkpoint_name)
+                os.makedirs(image_dir, exist_ok=True)
+                checkpoint_cmd = self._incremental_checkpoint_cmd(
+                    container.id, image_dir, parent_dir
+                )
+            else:
+                checkpoint_cmd = (
+                    f"docker checkpoint create --checkpoint-dir={checkpoint_dir} "
+                    f"{container_id} {checkpoint_name}"
+                ).split()
             result = subprocess.run(
-                checkpoint_cmd.split(), 
+                checkpoint_cmd, 
                 capture_output=True, 
                 text=True
             )
@@ -105,14 +454,173 @@ class ContainerManager:
             self.logger.error(f"Checkpoint error: {e}")
             return False
 
+    async def checkpoint_container_async(self,
+                                         container_id: str,
+                                         checkpoint_dir: str,
+                                         checkpoint_name: Optional[str] = None,
+                                         parent_dir: Optional[str] = None) -> bool:
+        """
+        checkpoint_container over the Engine API, without a docker CLI
+        process or an executor thread; only incremental dumps still run runc.
+        """
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
+        try:
+            if parent_dir:
+                info = await self.driver.inspect(container_id)
+                if info is None:
+                    return False
+                image_dir = os.path.join(checkpoint_dir, checkpoint_name)
+                os.makedirs(image_dir, exist_ok=True)
+                returncode, stderr = await self.driver.run_command(
+                    self._incremental_checkpoint_cmd(info["Id"], image_dir, parent_dir)
+                )
+                if returncode != 0:
+                    self.logger.error(f"Checkpoint failed: {stderr}")
+                    return False
+            elif not await self.driver.checkpoint_create(
+                container_id, checkpoint_name, checkpoint_dir
+            ):
+                return False
+
+            self.logger.info(f"Container {container_id} checkpointed successfully")
+            return True
+        except Exception as e:
+            self.logger.error(f"Checkpoint error: {e}")
+            return False
+
+    def checkpoint_container_lazy(self,
+                                  container_id: str,
+                                  checkpoint_dir: str,
+                                  page_server_address: str,
+                                  page_server_port: int,
+                                  checkpoint_name: Optional[str] = None,
+                                  timeout: float = 300) -> Optional[subprocess.Popen]:
+        """
+        Checkpoint a container for post-copy migration.
+
+        Everything except memory pages is written to the checkpoint
+        directory; CRIU then keeps running as a page server on
+        page_server_address:page_server_port until the target has pulled
+        every page. Returns the running dump process once the images are
+        ready to transfer, or None on failure.
+        """
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
+        status_r, status_w = os.pipe()
+        try:
+            container = self.client.containers.get(container_id)
+            image_dir = os.path.join(checkpoint_dir, checkpoint_name)
+            os.makedirs(image_dir, exist_ok=True)
+
+            checkpoint_cmd = [
+                "runc", "--root", self.runc_root, "checkpoint",
+                "--lazy-pages",
+                "--page-server", f"{page_server_address}:{page_server_port}",
+                "--status-fd", str(status_w),
+                "--image-path", image_dir,
+                container.id
+            ]
+            process = subprocess.Popen(
+                checkpoint_cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                pass_fds=(status_w,)
+            )
+            os.close(status_w)
+            status_w = None
+
+            # runc writes a byte to the status fd once the lazy dump is
+            # done and pages are being served; EOF means it exited early.
+            ready, _, _ = select.select([status_r], [], [], timeout)
+            if not ready or not os.read(status_r, 1):
+                process.kill()
+                _, stderr = process.communicate()
+                self.logger.error(f"Lazy checkpoint failed: {stderr.decode()}")
+                return None
+
+            self.logger.info(
+                f"Container {container_id} checkpointed, serving pages on "
+                f"{page_server_address}:{page_server_port}"
+            )
+            return process
+        except Exception as e:
+            self.logger.error(f"Lazy checkpoint error: {e}")
+            return None
+        finally:
+            os.close(status_r)
+            if status_w is not None:
+                os.close(status_w)
+
+    def restore_container_lazy(self,
+                               container_id: str,
+                               checkpoint_dir: str,
+                               page_server_address: str,
+                               page_server_port: int,
+                               checkpoint_name: Optional[str] = None,
+                               bundle_dir: Optional[str] = None) -> Optional[subprocess.Popen]:
+        """
+        Restore a container before its memory has arrived.
+
+        Starts a CRIU lazy-pages daemon that pulls pages from the source
+        page server on demand (and prefetches the rest in the background),
+        then restores the container through runc with userfaultfd-backed
+        memory. Returns the lazy-pages daemon, which exits once every page
+        has been fetched, or None on failure.
+        """
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
+        image_dir = os.path.join(checkpoint_dir, checkpoint_name)
+        daemon = None
+        try:
+            container = self.client.containers.get(container_id)
+            bundle_dir = bundle_dir or os.path.join(self.bundle_root, container.id)
+
+            daemon = subprocess.Popen(
+                [
+                    "criu", "lazy-pages",
+                    "--page-server",
+                    "--address", page_server_address,
+                    "--port", str(page_server_port),
+                    "--images-dir", image_dir
+                ],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
+
+            result = subprocess.run(
+                [
+                    "runc", "--root", self.runc_root, "restore",
+                    "--lazy-pages",
+                    "--detach",
+                    "--image-path", image_dir,
+                    "--bundle", bundle_dir,
+                    container.id
+                ],
+                capture_output=True,
+                text=True
+            )
+
+            if result.returncode == 0:
+                self.logger.info(f"Container {container_id} restored, memory pending")
+                return daemon
+            else:
+                self.logger.error(f"Lazy restore failed: {result.stderr}")
+                daemon.kill()
+                return None
+        except Exception as e:
+            self.logger.error(f"Lazy restore error: {e}")
+            if daemon is not None:
+                daemon.kill()
+            return None
+
     def restore_container(self, 
                          container_id: str, 
-                         checkpoint_dir: str) -> bool:
+                         checkpoint_dir: str,
+                         checkpoint_name: Optional[str] = None) -> bool:
         """Restore a container from checkpoint."""
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
         try:
             restore_cmd = (
                 f"docker start --checkpoint-dir={checkpoint_dir} "
-                f"--checkpoint=checkpoint_{container_id} {container_id}"
+                f"--checkpoint={checkpoint_name} {container_id}"
             )
             result = subprocess.run(
                 restore_cmd.split(), 
@@ -128,4 +636,15 @@ class ContainerManager:
                 return False
         except Exception as e:
             self.logger.error(f"Restore error: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def restore_container_async(self,
+                                      container_id: str,
+                                      checkpoint_dir: str,
+                                      checkpoint_name: Optional[str] = None) -> bool:
+        """restore_container over the Engine API."""
+        checkpoint_name = checkpoint_name or f"checkpoint_{container_id}"
+        if not await self.driver.start(container_id, checkpoint_name, checkpoint_dir):
+            return False
+        self.logger.info(f"Container {container_id} restored successfully")
+        return True
\ No newline at end of file
@@ -0,0 +1,154 @@
+# src/container_stats.py
+import logging
+import threading
+import time
+from typing import Dict, Optional
+from .utils.ring_buffer import RingBuffer
+
+def parse_stats(stats: Dict) -> Optional[Dict]:
+    """
+    Turn a raw Docker stats sample into usage figures.
+
+    Tolerates the fields Docker leaves out: precpu_stats on the first
+    sample of a stream, memory stats on some cgroup setups and eth0 (or
+    any network) for containers with other or no interfaces.
+    """
+    cpu_stats = stats.get('cpu_stats') or {}
+    precpu_stats = stats.get('precpu_stats') or {}
+    memory_stats = stats.get('memory_stats') or {}
+    if not cpu_stats.get('cpu_usage'):
+        # Container not running
+        return None
+
+    cpu_percent = 0.0
+    if precpu_stats.get('cpu_usage') and 'system_cpu_usage' in precpu_stats:
+        cpu_delta = (cpu_stats['cpu_usage'].get('total_usage', 0)
+                     - precpu_stats['cpu_usage'].get('total_usage', 0))
+        system_delta = (cpu_stats.get('system_cpu_usage', 0)
+                        - precpu_stats['system_cpu_usage'])
+        if system_delta > 0 and cpu_delta >= 0:
+            cpu_percent = (cpu_delta / system_delta) * 100.0
+
+    memory_usage = memory_stats.get('usage', 0)
+    memory_limit = memory_stats.get('limit', 0)
+    networks = stats.get('networks') or {}
+
+    return {
+        'cpu_percent': cpu_percent,
+        'memory_usage': memory_usage,
+        'memory_percent': (memory_usage / memory_limit) * 100.0 if memory_limit else 0.0,
+        'network_rx_bytes': sum(n.get('rx_bytes', 0) for n in networks.values()),
+        'network_tx_bytes': sum(n.get('tx_bytes', 0) for n in networks.values()),
+        'timestamp': time.time()
+    }
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+def _slope(times, values) -> float:
+    """Least-squares slope of values over times, per second."""
+    n = len(times)
+    if n < 2:
+        return 0.0
+    mean_t = sum(times) / n
+    mean_v = sum(values) / n
+    denominator = sum((t - mean_t) ** 2 for t in times)
+    if denominator == 0:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / denominator
+
+class ContainerStatsStream:
+    def __init__(self, container, capacity: int = 120):
+        """
+        Follow a container's Docker stats stream (about one sample a
+        second) in a background thread, keeping the last capacity samples.
+
+        Args:
+            container: docker Container
+            capacity: Samples kept per metric
+        """
+        self.container_id = container.id
+        self.capacity = capacity
+        self.logger = logging.getLogger("limoce.container")
+
+        self._container = container
+        self._lock = threading.Lock()
+        self._times = RingBuffer(capacity)
+        self._cpu = RingBuffer(capacity)
+        self._memory = RingBuffer(capacity)
+        self._latest: Optional[Dict] = None
+        self._first_sample = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._follow,
+            name=f"stats-{self.container_id[:12]}",
+            daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """Stop following; takes effect at the next sample."""
+        self._stopped.set()
+
+    @property
+    def active(self) -> bool:
+        return self._thread.is_alive() and not self._stopped.is_set()
+
+    def _follow(self):
+        try:
+            for raw in self._container.stats(stream=True, decode=True):
+                if self._stopped.is_set():
+                    break
+                sample = parse_stats(raw)
+                if sample is None:
+                    continue
+                with self._lock:
+                    self._latest = sample
+                    self._times.append(sample['timestamp'])
+                    self._cpu.append(sample['cpu_percent'])
+                    self._memory.append(sample['memory_usage'])
+                self._first_sample.set()
+        except Exception as e:
+            self.logger.warning(f"Stats stream of {self.container_id[:12]} ended: {e}")
+        finally:
+            # Stream ends when the container stops
+            self._stopped.set()
+            self._first_sample.set()
+
+    def wait_for_sample(self, timeout: Optional[float] = None) -> bool:
+        return self._first_sample.wait(timeout) and self._latest is not None
+
+    def latest(self) -> Optional[Dict]:
+        with self._lock:
+            return dict(self._latest) if self._latest is not None else None
+
+    def window(self, seconds: Optional[float] = None) -> Dict:
+        """
+        Rolling statistics over the samples of the last seconds (all kept
+        samples when None).
+        """
+        with self._lock:
+            times = self._times.values()
+            cpu = self._cpu.values()
+            memory = self._memory.values()
+            if seconds is not None and times:
+                since = times[-1] - seconds
+                start = next(i for i, t in enumerate(times) if t >= since)
+                times, cpu, memory = times[start:], cpu[start:], memory[start:]
+
+        return {
+            'samples': len(times),
+            'span': times[-1] - times[0] if times else 0.0,
+            'cpu_mean': sum(cpu) / len(cpu) if cpu else 0.0,
+            'cpu_p95': _percentile(cpu, 0.95),
+            'cpu_max': max(cpu) if cpu else 0.0,
+            'memory_latest': memory[-1] if memory else 0.0,
+            'memory_max': max(memory) if memory else 0.0,
+            # Bytes/sec; positive while the working set grows
+            'memory_slope': _slope(times, memory)
+        }
@@ -0,0 +1,232 @@
+# src/cost_model.py
+import logging
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional
+
+STRATEGY_STOP_AND_COPY = "stop_and_copy"
+STRATEGY_PRE_COPY = "pre_copy"
+STRATEGY_POST_COPY = "post_copy"
+STRATEGIES = (STRATEGY_STOP_AND_COPY, STRATEGY_PRE_COPY, STRATEGY_POST_COPY)
+
+@dataclass
+class ContainerProfile:
+    container_id: str
+    # Resident memory the dump has to write
+    memory_bytes: float
+    # Bytes of memory dirtied per second while running; None if unmeasured
+    dirty_rate: Optional[float] = None
+    # Non-memory image bytes (metadata, file descriptors, ...)
+    overhead_bytes: float = 1024 * 1024
+
+@dataclass
+class MigrationEstimate:
+    strategy: str
+    total_time: float
+    downtime: float
+    bytes: float
+    rounds: int = 0
+    # Post-copy: seconds the container runs with remote memory
+    degraded_time: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+def _ewma(previous: Optional[float], value: float, alpha: float) -> float:
+    return value if previous is None else previous + alpha * (value - previous)
+
+def _image_bytes(migration) -> Optional[float]:
+    """
+    Size of a container's whole checkpoint image from a migration's
+    transfers; None when they do not show it.
+    """
+    transfers = [t.get("logical_bytes", 0) for t in migration.transfers]
+    if not transfers:
+        return None
+    if migration.strategy == STRATEGY_PRE_COPY:
+        # The first pre-dump holds all memory; the final dump adds the
+        # metadata and the last dirty pages. Rounds in between resend
+        # pages already counted.
+        return transfers[0] + transfers[-1] if len(transfers) > 1 else transfers[0]
+    if migration.strategy == STRATEGY_POST_COPY:
+        # Only non-memory images were transferred; pages went lazily
+        return None
+    return sum(transfers)
+
+class MigrationCostModel:
+    def __init__(self,
+                 dump_rate: float = 500e6,
+                 restore_time: float = 0.5,
+                 dirty_fraction: float = 0.02,
+                 max_rounds: int = 5,
+                 post_copy_weight: float = 0.25,
+                 smoothing: float = 0.3):
+        """
+        Predict migration time and downtime per strategy, refined by
+        completed migrations.
+
+        Args:
+            dump_rate: Bytes/sec CRIU writes images at
+            restore_time: Seconds a restore takes apart from reading images
+            dirty_fraction: Share of memory assumed dirtied per second when
+                a container's dirty rate was never measured
+            max_rounds: Most pre-copy rounds considered
+            post_copy_weight: How much a second of degraded (remote memory)
+                running counts against post-copy, relative to downtime
+            smoothing: EWMA weight of each new observation
+        """
+        self.dump_rate = dump_rate
+        self.restore_time = restore_time
+        self.dirty_fraction = dirty_fraction
+        self.max_rounds = max_rounds
+        self.post_copy_weight = post_copy_weight
+        self.smoothing = smoothing
+        self.logger = logging.getLogger("limoce.cost")
+
+        # Measured actual/predicted downtime per strategy
+        self.corrections: Dict[str, float] = {}
+        # Per container: dirty_rate and image_bytes seen in past migrations
+        self.history: Dict[str, Dict[str, float]] = {}
+        self._learned: set = set()
+
+    def profile(self,
+                container_id: str,
+                memory_bytes: Optional[float] = None,
+                dirty_rate: Optional[float] = None) -> ContainerProfile:
+        """Profile from live figures, filled in from past migrations."""
+        history = self.history.get(container_id, {})
+        if memory_bytes is None:
+            memory_bytes = history.get("image_bytes", 0.0)
+        if dirty_rate is None:
+            dirty_rate = history.get("dirty_rate")
+        return ContainerProfile(container_id, memory_bytes, dirty_rate)
+
+    def _dirty_rate(self, profile: ContainerProfile) -> float:
+        if profile.dirty_rate is not None:
+            return profile.dirty_rate
+        return profile.memory_bytes * self.dirty_fraction
+
+    def _correct(self, estimate: MigrationEstimate) -> MigrationEstimate:
+        factor = self.corrections.get(estimate.strategy, 1.0)
+        extra = estimate.downtime * (factor - 1.0)
+        estimate.downtime += extra
+        estimate.total_time += extra
+        return estimate
+
+    def estimate_stop_and_copy(self, profile: ContainerProfile, bandwidth: float) -> MigrationEstimate:
+        size = profile.memory_bytes + profile.overhead_bytes
+        downtime = size / self.dump_rate + size / bandwidth + self.restore_time
+        return self._correct(MigrationEstimate(
+            STRATEGY_STOP_AND_COPY, downtime, downtime, size
+        ))
+
+    def estimate_pre_copy(self,
+                          profile: ContainerProfile,
+                          bandwidth: float,
+                          rounds: int) -> MigrationEstimate:
+        """
+        Each round sends what the previous one left dirty, starting with
+        all memory; the container freezes for the last dirty set.
+        """
+        dirty_rate = self._dirty_rate(profile)
+        to_send = profile.memory_bytes
+        running_time = 0.0
+        sent = 0.0
+        for _ in range(rounds):
+            round_time = to_send / self.dump_rate + to_send / bandwidth
+            running_time += round_time
+            sent += to_send
+            to_send = min(profile.memory_bytes, dirty_rate * round_time)
+
+        final = to_send + profile.overhead_bytes
+        downtime = final / self.dump_rate + final / bandwidth + self.restore_time
+        return self._correct(MigrationEstimate(
+            STRATEGY_PRE_COPY, running_time + downtime, downtime, sent + final, rounds
+        ))
+
+    def estimate_post_copy(self, profile: ContainerProfile, bandwidth: float) -> MigrationEstimate:
+        size = profile.overhead_bytes
+        downtime = size / self.dump_rate + size / bandwidth + self.restore_time
+        degraded = profile.memory_bytes / bandwidth
+        return self._correct(MigrationEstimate(
+            STRATEGY_POST_COPY,
+            downtime + degraded,
+            downtime,
+            size + profile.memory_bytes,
+            degraded_time=degraded
+        ))
+
+    def estimates(self, profile: ContainerProfile, bandwidth: float) -> List[MigrationEstimate]:
+        """Every strategy, with pre-copy at each round count."""
+        candidates = [self.estimate_stop_and_copy(profile, bandwidth)]
+        candidates.extend(
+            self.estimate_pre_copy(profile, bandwidth, rounds)
+            for rounds in range(1, self.max_rounds + 1)
+        )
+        candidates.append(self.estimate_post_copy(profile, bandwidth))
+        return candidates
+
+    def choose(self,
+               profile: ContainerProfile,
+               bandwidth: float,
+               deadline: Optional[float] = None,
+               strategies: Optional[List[str]] = None) -> Optional[MigrationEstimate]:
+        """
+        Strategy with the least downtime (post-copy's degraded period
+        weighted in) that finishes within deadline seconds; None if none can.
+        """
+        candidates = [
+            estimate for estimate in self.estimates(profile, bandwidth)
+            if strategies is None or estimate.strategy in strategies
+        ]
+        if deadline is not None:
+            candidates = [e for e in candidates if e.total_time <= deadline]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda e: (e.downtime + self.post_copy_weight * e.degraded_time, e.total_time)
+        )
+
+    def observe(self, migration_id: str, migration):
+        """Learn from a completed MigrationState."""
+        if migration_id in self._learned or migration.status != "completed":
+            return
+        self._learned.add(migration_id)
+        alpha = self.smoothing
+        history = self.history.setdefault(migration.container_id, {})
+
+        # Round i+1 carries what was dirtied while round i ran
+        rounds = migration.precopy_rounds
+        for previous, current in zip(rounds, rounds[1:]):
+            if previous["duration"] > 0:
+                history["dirty_rate"] = _ewma(
+                    history.get("dirty_rate"), current["bytes"] / previous["duration"], alpha
+                )
+
+        image_bytes = _image_bytes(migration)
+        if image_bytes:
+            history["image_bytes"] = image_bytes
+
+        phases = migration.phase_timings
+        restore = phases.get("restore")
+        if restore and restore.get("end") is not None:
+            self.restore_time = _ewma(self.restore_time, restore["end"] - restore["start"], alpha)
+        checkpoint = phases.get("checkpoint")
+        if (checkpoint and checkpoint.get("end") is not None and not migration.pipelined
+                and migration.transfers and migration.strategy == STRATEGY_STOP_AND_COPY):
+            duration = checkpoint["end"] - checkpoint["start"]
+            image_bytes = migration.transfers[-1].get("logical_bytes", 0)
+            if duration > 0 and image_bytes >= 1024 * 1024:
+                self.dump_rate = _ewma(self.dump_rate, image_bytes / duration, alpha)
+
+        predicted = (migration.estimate or {}).get("downtime")
+        if predicted and migration.downtime is not None:
+            factor = self.corrections.get(migration.strategy, 1.0)
+            # The prediction already included the old correction
+            ratio = factor * migration.downtime / predicted
+            self.corrections[migration.strategy] = _ewma(factor, ratio, alpha)
+
+    def learn(self, migrations: Dict):
+        """Learn from every completed migration not seen yet."""
+        for migration_id, migration in migrations.items():
+            self.observe(migration_id, migration)
@@ -0,0 +1,218 @@
+# src/dirty_page_profiler.py
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .utils.ring_buffer import RingBuffer
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# Writing 4 to clear_refs clears the soft-dirty bits of every page
+_CLEAR_SOFT_DIRTY = b"4"
+# pagemap entries are little-endian u64s: bit 55 (soft-dirty) is the top
+# bit of byte 6 and bit 63 (present) the top bit of byte 7
+_HIGH_BYTES = bytes(range(0x80, 0x100))
+_READ_PAGES = 32768
+
+def _count_high(data: bytes) -> int:
+    """Bytes with the top bit set, without a Python-level loop."""
+    return len(data) - len(data.translate(None, _HIGH_BYTES))
+
+def _writable_mappings(maps_path: str) -> List[Tuple[int, int]]:
+    """(start, end) of the writable mappings in a /proc/<pid>/maps file."""
+    ranges = []
+    with open(maps_path) as f:
+        for line in f:
+            fields = line.split(None, 5)
+            if len(fields) < 2 or fields[1][1] != "w":
+                continue
+            start, _, end = fields[0].partition("-")
+            ranges.append((int(start, 16), int(end, 16)))
+    return ranges
+
+def scan_process(pid: int,
+                 proc_root: str = "/proc",
+                 page_size: int = PAGE_SIZE,
+                 clear: bool = True) -> Tuple[int, int]:
+    """
+    Count a process's soft-dirty and resident pages in writable mappings,
+    then clear the soft-dirty bits so the next scan sees only new writes.
+
+    Returns:
+        (dirty pages, resident pages)
+    """
+    base = os.path.join(proc_root, str(pid))
+    dirty = resident = 0
+    with open(os.path.join(base, "pagemap"), "rb", buffering=0) as pagemap:
+        for start, end in _writable_mappings(os.path.join(base, "maps")):
+            first = start // page_size
+            last = end // page_size
+            while first < last:
+                count = min(last - first, _READ_PAGES)
+                pagemap.seek(first * 8)
+                data = pagemap.read(count * 8)
+                if not data:
+                    break
+                dirty += _count_high(data[6::8])
+                resident += _count_high(data[7::8])
+                first += count
+    if clear:
+        with open(os.path.join(base, "clear_refs"), "wb", buffering=0) as f:
+            f.write(_CLEAR_SOFT_DIRTY)
+    return dirty, resident
+
+class DirtyPageProfiler:
+    def __init__(self,
+                 container_id: str,
+                 pids: Callable[[], Iterable[int]],
+                 interval: float = 1.0,
+                 capacity: int = 300,
+                 proc_root: str = "/proc",
+                 page_size: int = PAGE_SIZE):
+        """
+        Sample how fast a container writes memory from the kernel's
+        soft-dirty page bits, in a background thread.
+
+        Each sample clears the bits of the container's processes, waits
+        interval seconds and counts the pages written meanwhile, reading
+        8 bytes of /proc/<pid>/pagemap per page of writable memory. Needs
+        root and a kernel with CONFIG_MEM_SOFT_DIRTY. Clearing the bits
+        breaks CRIU's incremental (pre-dump) tracking, so the profiler must
+        be stopped while a pre-copy migration of the container runs.
+
+        Args:
+            container_id: Container profiled
+            pids: Returns the container's current host PIDs
+            interval: Seconds between samples
+            capacity: Samples kept
+        """
+        self.container_id = container_id
+        self.interval = interval
+        self.capacity = capacity
+        self.proc_root = proc_root
+        self.page_size = page_size
+        self.logger = logging.getLogger("limoce.container")
+
+        self._pids = pids
+        self._lock = threading.Lock()
+        self._times = RingBuffer(capacity)
+        self._dirty_rate = RingBuffer(capacity)
+        self._dirty_bytes = RingBuffer(capacity)
+        self._resident = RingBuffer(capacity)
+        # CPU seconds spent scanning, to keep an eye on the overhead
+        self.scan_time = 0.0
+        self.scans = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._follow,
+            name=f"dirty-{container_id[:12]}",
+            daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop sampling and wait for a scan in progress, so no further
+        clear_refs write lands once this returns.
+        """
+        self._stopped.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    @property
+    def active(self) -> bool:
+        return self._thread.is_alive() and not self._stopped.is_set()
+
+    def _scan(self) -> Optional[Tuple[int, int]]:
+        """Dirty and resident pages over all processes; None if none is left."""
+        dirty = resident = 0
+        scanned = False
+        cpu_start = time.process_time()
+        for pid in self._pids():
+            try:
+                pid_dirty, pid_resident = scan_process(pid, self.proc_root, self.page_size)
+            except FileNotFoundError:
+                # Process exited between listing and scanning
+                continue
+            dirty += pid_dirty
+            resident += pid_resident
+            scanned = True
+        self.scan_time += time.process_time() - cpu_start
+        self.scans += 1
+        return (dirty, resident) if scanned else None
+
+    def _follow(self):
+        try:
+            # Every page is soft-dirty until first cleared, so the first
+            # scan only sets the baseline
+            baseline = self._scan()
+            if baseline is None:
+                return
+            if baseline[0] == 0 and baseline[1] > 0:
+                self.logger.warning(
+                    f"No soft-dirty pages in {self.container_id[:12]}: kernel "
+                    f"built without CONFIG_MEM_SOFT_DIRTY?"
+                )
+                return
+            previous = time.monotonic()
+            while not self._stopped.wait(self.interval):
+                result = self._scan()
+                if result is None:
+                    break
+                now = time.monotonic()
+                dirty_bytes = result[0] * self.page_size
+                with self._lock:
+                    self._times.append(time.time())
+                    self._dirty_bytes.append(dirty_bytes)
+                    self._dirty_rate.append(dirty_bytes / (now - previous))
+                    self._resident.append(result[1] * self.page_size)
+                previous = now
+        except Exception as e:
+            self.logger.warning(f"Dirty page profiling of {self.container_id[:12]} ended: {e}")
+        finally:
+            self._stopped.set()
+
+    def series(self) -> List[Dict]:
+        """Every kept sample, oldest first."""
+        with self._lock:
+            samples = zip(
+                self._times.values(), self._dirty_rate.values(),
+                self._dirty_bytes.values(), self._resident.values()
+            )
+            return [
+                {
+                    'timestamp': timestamp,
+                    'dirty_rate': rate,
+                    'dirty_pages_per_second': rate / self.page_size,
+                    'dirty_bytes': dirty,
+                    'resident_bytes': resident
+                }
+                for timestamp, rate, dirty, resident in samples
+            ]
+
+    def window(self, seconds: Optional[float] = None) -> Dict:
+        """
+        Dirty rate (bytes/sec) and writable working set over the samples of
+        the last seconds (all kept samples when None). The writable working
+        set is the most memory written within one interval: roughly what a
+        pre-copy round of that length leaves to resend.
+        """
+        series = self.series()
+        if seconds is not None and series:
+            since = series[-1]['timestamp'] - seconds
+            series = [sample for sample in series if sample['timestamp'] >= since]
+        rates = sorted(sample['dirty_rate'] for sample in series)
+
+        return {
+            'samples': len(series),
+            'interval': self.interval,
+            'dirty_rate_mean': sum(rates) / len(rates) if rates else 0.0,
+            'dirty_rate_p95': rates[min(int(0.95 * len(rates)), len(rates) - 1)] if rates else 0.0,
+            'dirty_rate_max': rates[-1] if rates else 0.0,
+            'writable_working_set': max((s['dirty_bytes'] for s in series), default=0),
+            'resident_bytes': series[-1]['resident_bytes'] if series else 0,
+            'scan_cpu_seconds': self.scan_time / self.scans if self.scans else 0.0
+        }
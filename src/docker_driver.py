@@ -0,0 +1,189 @@
+# src/docker_driver.py
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import aiohttp
+
+class DockerAPIError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(f"Docker API error {status}: {message}")
+        self.status = status
+        self.message = message
+
+class AsyncDockerDriver:
+    def __init__(self,
+                 docker_host: str = "unix:///var/run/docker.sock",
+                 api_version: str = "1.41",
+                 connection_limit: int = 16,
+                 max_workers: int = 4):
+        """
+        Docker Engine API client on the event loop, with pooled keep-alive
+        connections over the unix socket (or TCP).
+
+        Args:
+            docker_host: unix:// socket path or tcp://host:port
+            api_version: Engine API version used in request paths
+            connection_limit: Connections kept to the daemon at once
+            max_workers: Threads for work that has to block (run_blocking)
+        """
+        self.docker_host = docker_host
+        self.api_version = api_version
+        self.connection_limit = connection_limit
+        self.logger = logging.getLogger("limoce.docker")
+
+        parsed = urlparse(docker_host)
+        if parsed.scheme == "unix":
+            # unix://var/run/docker.sock is commonly written for /var/run/...
+            self._socket_path = "/" + (parsed.netloc + parsed.path).lstrip("/")
+            self._base_url = f"http://docker/v{api_version}"
+        else:
+            self._socket_path = None
+            self._base_url = f"http://{parsed.netloc}/v{api_version}"
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="docker")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily: a session binds to the running event loop
+        if self._session is None or self._session.closed:
+            if self._socket_path is not None:
+                connector = aiohttp.UnixConnector(
+                    path=self._socket_path, limit=self.connection_limit
+                )
+            else:
+                connector = aiohttp.TCPConnector(limit=self.connection_limit)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=10)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._executor.shutdown(wait=False)
+
+    async def _request(self,
+                       method: str,
+                       path: str,
+                       params: Optional[Dict] = None,
+                       body: Optional[Dict] = None) -> Tuple[int, bytes]:
+        async with self._get_session().request(
+            method,
+            f"{self._base_url}{path}",
+            params=params,
+            json=body
+        ) as response:
+            data = await response.read()
+            if response.status >= 400:
+                try:
+                    message = json.loads(data).get("message", "")
+                except ValueError:
+                    message = data.decode(errors="replace")
+                raise DockerAPIError(response.status, message)
+            return response.status, data
+
+    async def run_blocking(self, func, *args):
+        """Run a blocking call on the driver's bounded executor."""
+        return await asyncio.get_event_loop().run_in_executor(self._executor, func, *args)
+
+    async def inspect(self, container_id: str) -> Optional[Dict]:
+        try:
+            _, data = await self._request("GET", f"/containers/{container_id}/json")
+            return json.loads(data)
+        except Exception as e:
+            self.logger.error(f"Failed to inspect container {container_id}: {e}")
+            return None
+
+    async def get_pid(self, container_id: str) -> Optional[int]:
+        info = await self.inspect(container_id)
+        if info is None:
+            return None
+        return info.get("State", {}).get("Pid") or None
+
+    async def checkpoint_create(self,
+                                container_id: str,
+                                checkpoint_name: str,
+                                checkpoint_dir: Optional[str] = None,
+                                exit: bool = True) -> bool:
+        """Checkpoint a container (POST /containers/{id}/checkpoints)."""
+        body = {"CheckpointID": checkpoint_name, "Exit": exit}
+        if checkpoint_dir:
+            body["CheckpointDir"] = checkpoint_dir
+        try:
+            await self._request("POST", f"/containers/{container_id}/checkpoints", body=body)
+            return True
+        except Exception as e:
+            self.logger.error(f"Checkpoint of {container_id} failed: {e}")
+            return False
+
+    async def start(self,
+                    container_id: str,
+                    checkpoint: Optional[str] = None,
+                    checkpoint_dir: Optional[str] = None) -> bool:
+        """Start a container, restoring it from a checkpoint if one is given."""
+        params = {}
+        if checkpoint:
+            params["checkpoint"] = checkpoint
+        if checkpoint_dir:
+            params["checkpoint-dir"] = checkpoint_dir
+        try:
+            # 304 means the container was already running
+            await self._request("POST", f"/containers/{container_id}/start", params=params)
+            return True
+        except Exception as e:
+            self.logger.error(f"Start of {container_id} failed: {e}")
+            return False
+
+    async def events(self,
+                     filters: Optional[Dict[str, List[str]]] = None,
+                     since: Optional[float] = None,
+                     until: Optional[float] = None) -> AsyncIterator[Dict]:
+        """Stream daemon events (GET /events) as they happen."""
+        params = {}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        if since is not None:
+            params["since"] = str(since)
+        if until is not None:
+            params["until"] = str(until)
+        async with self._get_session().get(
+            f"{self._base_url}/events", params=params
+        ) as response:
+            if response.status >= 400:
+                raise DockerAPIError(response.status, await response.text())
+            async for line in response.content:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    async def run_command(self, cmd: List[str]) -> Tuple[int, str]:
+        """
+        Run a command without blocking the loop, for what the Engine API
+        cannot do (runc pre-dumps). Returns (returncode, stderr).
+        """
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+        return process.returncode, stderr.decode(errors="replace")
+
+    async def command_output(self, cmd: List[str]) -> Tuple[int, str, str]:
+        """Like run_command, also returning stdout: (returncode, stdout, stderr)."""
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        return (
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace")
+        )
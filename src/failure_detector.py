@@ -0,0 +1,285 @@
+# src/failure_detector.py
+import asyncio
+import logging
+import math
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from .utils.ring_buffer import RingBuffer
+
+def _phi(elapsed: float, mean: float, std: float) -> float:
+    """
+    Suspicion that a heartbeat overdue by elapsed seconds will not come,
+    -log10(P(interval > elapsed)) under a normal interval distribution
+    (logistic approximation of its CDF).
+    """
+    y = (elapsed - mean) / std
+    z = y * (1.5976 + 0.070566 * y * y)
+    # p_later = 1 / (1 + e^z), arranged so the exponent never overflows
+    if z > 0:
+        e = math.exp(-z)
+        p_later = e / (1.0 + e)
+    else:
+        p_later = 1.0 / (1.0 + math.exp(z))
+    return -math.log10(max(p_later, 1e-300))
+
+class PhiAccrualDetector:
+    def __init__(self,
+                 threshold: float = 8.0,
+                 window_size: int = 200,
+                 min_std_deviation: float = 0.1,
+                 acceptable_pause: float = 0.0,
+                 first_interval: float = 5.0):
+        """
+        Phi-accrual failure detector over heartbeat arrival intervals.
+
+        Rather than a fixed timeout, each device's suspicion level (phi)
+        grows with how unlikely its current silence is given its own
+        interval history, so jittery links get more slack than steady ones.
+
+        Args:
+            threshold: Phi above which a device is suspected (8 is roughly a
+                1e-8 chance that the heartbeat is merely late)
+            window_size: Arrival intervals kept per device
+            min_std_deviation: Floor on the interval deviation, seconds
+            acceptable_pause: Extra silence tolerated, e.g. for GC pauses
+            first_interval: Interval assumed before a device has history,
+                unless watch() is given the expected interval
+        """
+        self.threshold = threshold
+        self.window_size = window_size
+        self.min_std_deviation = min_std_deviation
+        self.acceptable_pause = acceptable_pause
+        self.first_interval = first_interval
+        self.logger = logging.getLogger("limoce.failure")
+
+        self._intervals: Dict[str, RingBuffer] = {}
+        self._last_arrival: Dict[str, float] = {}
+        # Watched devices whose first heartbeat has not arrived yet
+        self._awaiting_first: Set[str] = set()
+        self._suspected: Set[str] = set()
+        self._listeners: List[Callable[[str, float, bool], None]] = []
+
+    def add_listener(self, listener: Callable[[str, float, bool], None]):
+        """Call listener(device_id, phi, suspected) when a device changes state."""
+        self._listeners.append(listener)
+
+    def watch(self,
+              device_id: str,
+              now: Optional[float] = None,
+              interval: Optional[float] = None):
+        """
+        Start the clock on a device that has not replied yet, so one that
+        never does is still suspected.
+
+        Args:
+            interval: Seconds between heartbeats expected from the device,
+                e.g. HeartbeatScheduler.interval; first_interval if None
+        """
+        if device_id in self._last_arrival:
+            return
+        expected = interval or self.first_interval
+        intervals = RingBuffer(self.window_size)
+        # Seed with a wide guess around the expected interval so phi is
+        # defined, but forgiving, before any history exists
+        intervals.append(expected * 0.75)
+        intervals.append(expected * 1.25)
+        self._intervals[device_id] = intervals
+        self._last_arrival[device_id] = time.monotonic() if now is None else now
+        self._awaiting_first.add(device_id)
+
+    def heartbeat(self, device_id: str, now: Optional[float] = None):
+        """Record a heartbeat arrival."""
+        now = time.monotonic() if now is None else now
+        last = self._last_arrival.get(device_id)
+        if last is None:
+            self.watch(device_id, now)
+            self._awaiting_first.discard(device_id)
+            return
+        if device_id in self._awaiting_first:
+            # Watch to first reply is a round trip, not an interval
+            # between heartbeats; intervals start from the second arrival
+            self._awaiting_first.discard(device_id)
+        else:
+            self._intervals[device_id].append(now - last)
+        self._last_arrival[device_id] = now
+
+    def remove(self, device_id: str):
+        self._intervals.pop(device_id, None)
+        self._last_arrival.pop(device_id, None)
+        self._awaiting_first.discard(device_id)
+        self._suspected.discard(device_id)
+
+    def phi(self, device_id: str, now: Optional[float] = None) -> float:
+        """Current suspicion level; 0 for devices not being watched."""
+        last = self._last_arrival.get(device_id)
+        if last is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        intervals = self._intervals[device_id]
+        mean = intervals.mean() + self.acceptable_pause
+        std = max(intervals.std(), self.min_std_deviation)
+        return _phi(now - last, mean, std)
+
+    def is_available(self, device_id: str, now: Optional[float] = None) -> bool:
+        return self.phi(device_id, now) < self.threshold
+
+    def is_suspected(self, device_id: str) -> bool:
+        """Whether the last check() suspected the device."""
+        return device_id in self._suspected
+
+    def check(self, now: Optional[float] = None) -> List[str]:
+        """
+        Re-evaluate every device, notifying listeners of changes.
+
+        Returns:
+            Currently suspected devices
+        """
+        now = time.monotonic() if now is None else now
+        for device_id in list(self._last_arrival):
+            phi = self.phi(device_id, now)
+            suspected = phi >= self.threshold
+            if suspected == (device_id in self._suspected):
+                continue
+            if suspected:
+                self._suspected.add(device_id)
+                self.logger.warning(f"Device {device_id} suspected (phi={phi:.1f})")
+            else:
+                self._suspected.discard(device_id)
+                self.logger.warning(f"Device {device_id} recovered (phi={phi:.1f})")
+            for listener in self._listeners:
+                try:
+                    listener(device_id, phi, suspected)
+                except Exception as e:
+                    self.logger.error(f"Failure listener error: {e}")
+        return sorted(self._suspected)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Dict]:
+        now = time.monotonic() if now is None else now
+        return {
+            device_id: {
+                "phi": self.phi(device_id, now),
+                "suspected": device_id in self._suspected,
+                "mean_interval": self._intervals[device_id].mean(),
+                "std_interval": self._intervals[device_id].std(),
+                "samples": len(self._intervals[device_id])
+            }
+            for device_id in self._last_arrival
+        }
+
+class HeartbeatScheduler:
+    def __init__(self,
+                 network_manager,
+                 detector: PhiAccrualDetector,
+                 source_id: str,
+                 interval: float = 5.0,
+                 max_concurrency: int = 64,
+                 timeout: Optional[float] = None):
+        """
+        Send heartbeats to many devices every interval with bounded
+        concurrency, feeding replies into a failure detector.
+
+        Args:
+            network_manager: NetworkManager used to reach devices
+            detector: Detector fed with every successful heartbeat
+            source_id: Device id heartbeats are sent from
+            interval: Seconds between rounds, e.g.
+                migration_config['heartbeat_interval']
+            max_concurrency: Heartbeats in flight at once
+            timeout: Per-heartbeat timeout; defaults to interval
+        """
+        self.network_manager = network_manager
+        self.detector = detector
+        self.source_id = source_id
+        self.interval = interval
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout or interval
+        self.logger = logging.getLogger("limoce.heartbeat")
+
+        self.devices: Set[str] = set()
+        self._listeners: List[Callable[[str, Dict, float], None]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._rounds = 0
+        self._sent = 0
+        self._failed = 0
+        self._late_rounds = 0
+
+    def add_listener(self, listener: Callable[[str, Dict, float], None]):
+        """Call listener(device_id, reply, rtt) for every heartbeat reply."""
+        self._listeners.append(listener)
+
+    def add_devices(self, device_ids: Iterable[str]):
+        for device_id in device_ids:
+            self.devices.add(device_id)
+            self.detector.watch(device_id, interval=self.interval)
+
+    def remove_device(self, device_id: str):
+        self.devices.discard(device_id)
+        self.detector.remove(device_id)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_event_loop()
+        next_round = loop.time()
+        while True:
+            await self.run_round()
+
+            next_round += self.interval
+            delay = next_round - loop.time()
+            if delay < 0:
+                # A round overran the interval; skip ahead instead of
+                # bunching heartbeats up
+                self._late_rounds += 1
+                next_round = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def run_round(self):
+        """Heartbeat every device once, then re-evaluate the detector."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def beat(device_id: str):
+            async with semaphore:
+                sent = time.monotonic()
+                reply = await self.network_manager.send_heartbeat(
+                    self.source_id,
+                    device_id,
+                    {"timestamp": time.time()},
+                    timeout=self.timeout
+                )
+                rtt = time.monotonic() - sent
+            if reply is not None:
+                self.detector.heartbeat(device_id)
+                self._sent += 1
+                for listener in self._listeners:
+                    try:
+                        listener(device_id, reply, rtt)
+                    except Exception as e:
+                        self.logger.error(f"Heartbeat listener failed: {e}")
+            else:
+                self._failed += 1
+
+        await asyncio.gather(*(beat(device_id) for device_id in list(self.devices)))
+        self._rounds += 1
+        self.detector.check()
+
+    def stats(self) -> Dict:
+        return {
+            "devices": len(self.devices),
+            "rounds": self._rounds,
+            "sent": self._sent,
+            "failed": self._failed,
+            "late_rounds": self._late_rounds,
+            "suspected": sorted(d for d in self.devices if self.detector.is_suspected(d))
+        }
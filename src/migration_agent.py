@@ -0,0 +1,478 @@
+# src/migration_agent.py
+import asyncio
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from aiohttp import web
+from .chunk_store import ChunkStore
+from .compression import available_codecs, decompress_block, get_decompressor
+
+# Migration ids and image names become directory names under checkpoint_dir
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]{0,127}$")
+
+@dataclass
+class IncomingCheckpoint:
+    migration_id: str
+    image_dir: str
+    files: Dict[str, Dict] = field(default_factory=dict)
+    created: Dict[str, asyncio.Future] = field(default_factory=dict)
+    started: float = field(default_factory=time.monotonic)
+    # Last request for this checkpoint, for expiring abandoned transfers
+    updated: float = field(default_factory=time.monotonic)
+    metadata_complete: asyncio.Event = field(default_factory=asyncio.Event)
+    prepare_task: Optional[asyncio.Task] = None
+
+def _check_images(image_dir: str) -> List[str]:
+    """Return the CRIU images a restore would need but are missing."""
+    def present(pattern):
+        return bool(glob.glob(os.path.join(image_dir, pattern)))
+
+    if present("core-*.img"):
+        required = ["inventory.img", "pstree.img", "mm-*.img"]
+    else:
+        # Pre-dump rounds only carry memory
+        required = ["pagemap-*.img"]
+    return [pattern for pattern in required if not present(pattern)]
+
+def _create_preallocated(path: str, size: int):
+    """Create (or truncate) a file at its final size."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        if size > 0:
+            try:
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                # Filesystem without fallocate support
+                os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+def _replace_symlink(link_target: str, path: str):
+    """Point path at link_target, replacing whatever is there."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.lexists(path):
+        os.remove(path)
+    os.symlink(link_target, path)
+
+def _write_all(fd: int, offset: int, data: bytes, hasher, decompressor=None) -> int:
+    """Decompress, hash and write data at offset; returns the raw byte count."""
+    if decompressor is not None and data:
+        # zstd refuses further input, even empty, once its frame has ended
+        data = decompressor.decompress(data)
+    hasher.update(data)
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
+    return len(data)
+
+def _node_resources() -> Dict:
+    """Idle CPUs (cores, from the 1-minute load) and available memory."""
+    resources = {}
+    try:
+        resources["cpu_free"] = max((os.cpu_count() or 1) - os.getloadavg()[0], 0.0)
+    except OSError:
+        pass
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    resources["memory_free"] = int(line.split()[1]) * 1024
+                    break
+    except (OSError, ValueError, IndexError):
+        pass
+    return resources
+
+class MigrationAgent:
+    def __init__(self,
+                 host: str = "0.0.0.0",
+                 port: int = 8080,
+                 checkpoint_dir: str = "/tmp/checkpoints",
+                 device_id: Optional[str] = None,
+                 write_buffer_size: int = 8 * 1024 * 1024,
+                 network_setup: Optional[Callable[[str, str], Awaitable]] = None,
+                 chunk_store: Optional[ChunkStore] = None,
+                 max_chunk_bytes: int = 64 * 1024 * 1024,
+                 incoming_ttl: float = 3600.0):
+        """
+        Target-side agent receiving streamed checkpoints.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on
+            checkpoint_dir: Base directory incoming checkpoints are written to
+            device_id: Name reported in heartbeat replies
+            write_buffer_size: Incoming data is coalesced into writes of this size
+            network_setup: Optional coroutine (migration_id, image_dir) run
+                while the checkpoint is still arriving
+            chunk_store: Store for delta transfers; defaults to
+                <checkpoint_dir>/chunks
+            max_chunk_bytes: Largest chunk accepted in a delta transfer
+            incoming_ttl: Seconds without a request after which an
+                uncommitted transfer is dropped and its images deleted
+        """
+        self.host = host
+        self.port = port
+        self.checkpoint_dir = checkpoint_dir
+        self.device_id = device_id or f"{host}:{port}"
+        self.write_buffer_size = write_buffer_size
+        self.network_setup = network_setup
+        self.chunk_store = chunk_store or ChunkStore(
+            os.path.join(checkpoint_dir, "chunks")
+        )
+        self.max_chunk_bytes = max_chunk_bytes
+        self.incoming_ttl = incoming_ttl
+        self.logger = logging.getLogger("limoce.agent")
+
+        self.incoming: Dict[str, IncomingCheckpoint] = {}
+        self.page_server_channels: Dict[str, Dict] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._expiry_task: Optional[asyncio.Task] = None
+
+        self.app = web.Application()
+        self.app.router.add_post('/heartbeat', self.handle_heartbeat)
+        self.app.router.add_get('/capabilities', self.handle_capabilities)
+        self.app.router.add_post(
+            '/transfer_checkpoint/{migration_id}/file', self.handle_file
+        )
+        self.app.router.add_post(
+            '/transfer_checkpoint/{migration_id}/chunks/missing',
+            self.handle_missing_chunks
+        )
+        self.app.router.add_post(
+            '/transfer_checkpoint/{migration_id}/chunks', self.handle_chunks
+        )
+        self.app.router.add_post(
+            '/transfer_checkpoint/{migration_id}/commit', self.handle_commit
+        )
+        self.app.router.add_get('/chunks/stats', self.handle_chunk_stats)
+        self.app.router.add_post('/page_server', self.handle_page_server)
+        self.app.router.add_post('/page_server/close', self.handle_page_server_close)
+
+    async def start(self):
+        """Start serving on host:port."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self._expiry_task = asyncio.ensure_future(self._expire_loop())
+        self.logger.info(f"Migration agent listening on {self.host}:{self.port}")
+
+    async def stop(self):
+        """Stop serving and cancel pending restore preparation."""
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            self._expiry_task = None
+        for incoming in self.incoming.values():
+            if incoming.prepare_task is not None:
+                incoming.prepare_task.cancel()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle_heartbeat(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        return web.json_response({
+            "status": "ok",
+            "device": self.device_id,
+            "source": data.get("source"),
+            "timestamp": time.time(),
+            "resources": _node_resources()
+        })
+
+    async def handle_capabilities(self, request: web.Request) -> web.Response:
+        return web.json_response({"codecs": available_codecs()})
+
+    def _incoming(self, migration_id: str, image: str) -> IncomingCheckpoint:
+        for name in (migration_id, image):
+            if not _NAME_PATTERN.match(name):
+                raise web.HTTPBadRequest(reason=f"Invalid name: {name!r}")
+        key = f"{migration_id}/{image}"
+        if key in self.incoming:
+            self.incoming[key].updated = time.monotonic()
+        else:
+            incoming = IncomingCheckpoint(
+                migration_id=migration_id,
+                image_dir=os.path.join(self.checkpoint_dir, migration_id, image)
+            )
+            # Start restore preparation as soon as the first file arrives
+            incoming.prepare_task = asyncio.ensure_future(
+                self._prepare_restore(incoming)
+            )
+            self.incoming[key] = incoming
+        return self.incoming[key]
+
+    async def _expire_loop(self):
+        while True:
+            await asyncio.sleep(max(self.incoming_ttl / 4, 1.0))
+            await self.expire_incoming()
+
+    async def expire_incoming(self, now: Optional[float] = None) -> List[str]:
+        """Drop transfers idle for longer than incoming_ttl; returns their keys."""
+        now = time.monotonic() if now is None else now
+        expired = [
+            key for key, incoming in self.incoming.items()
+            if now - incoming.updated > self.incoming_ttl
+        ]
+        loop = asyncio.get_event_loop()
+        for key in expired:
+            incoming = self.incoming.pop(key)
+            if incoming.prepare_task is not None:
+                incoming.prepare_task.cancel()
+            self.chunk_store.unpin(key)
+            await loop.run_in_executor(None, shutil.rmtree, incoming.image_dir, True)
+            self.logger.warning(f"{key}: transfer abandoned, images removed")
+        return expired
+
+    def _resolve(self, incoming: IncomingCheckpoint, rel_path: str) -> str:
+        path = os.path.normpath(os.path.join(incoming.image_dir, rel_path))
+        if not path.startswith(incoming.image_dir + os.sep):
+            raise web.HTTPBadRequest(reason=f"Invalid path: {rel_path}")
+        return path
+
+    def _check_link_target(self, incoming: IncomingCheckpoint, path: str, link_target: str):
+        """
+        Only allow relative links staying within the migration's directory,
+        such as a pre-dump's 'parent' link to the previous round.
+        """
+        migration_dir = os.path.join(self.checkpoint_dir, incoming.migration_id)
+        resolved = os.path.normpath(os.path.join(os.path.dirname(path), link_target))
+        if os.path.isabs(link_target) or not resolved.startswith(migration_dir + os.sep):
+            raise web.HTTPBadRequest(reason=f"Invalid link target: {link_target}")
+
+    async def handle_file(self, request: web.Request) -> web.Response:
+        """
+        Receive one image file, or one segment of it, streamed in the
+        request body. Segments of a file may arrive concurrently on
+        different connections; each is written at its own offset.
+        """
+        migration_id = request.match_info['migration_id']
+        image = os.path.basename(request.headers.get("X-Limoce-Image", "checkpoint"))
+        rel_path = request.headers["X-Limoce-Path"]
+        size = int(request.headers.get("X-Limoce-Size", 0))
+        offset = int(request.headers.get("X-Limoce-Offset", 0))
+        length = int(request.headers.get("X-Limoce-Length", size))
+        codec = request.headers.get("X-Limoce-Codec", "none")
+        try:
+            decompressor = get_decompressor(codec)
+        except ValueError as e:
+            raise web.HTTPBadRequest(reason=str(e))
+
+        incoming = self._incoming(migration_id, image)
+        path = self._resolve(incoming, rel_path)
+        if request.headers.get("X-Limoce-Metadata-Complete") == "1":
+            # Sender has delivered every metadata image; only pages remain
+            incoming.metadata_complete.set()
+
+        loop = asyncio.get_event_loop()
+        known = incoming.files.get(rel_path)
+        if known is None or known["size"] != size:
+            # Whichever segment of a new file (or of a resend at a new size)
+            # arrives first creates and preallocates it; the other segments
+            # wait for it. Segments may arrive in any order.
+            if rel_path in incoming.created:
+                await incoming.created[rel_path]
+                known = incoming.files.get(rel_path)
+            if known is None or known["size"] != size:
+                incoming.created[rel_path] = loop.run_in_executor(
+                    None, _create_preallocated, path, size
+                )
+                incoming.files[rel_path] = {"size": size, "segments": {}}
+        await incoming.created[rel_path]
+
+        hasher = hashlib.sha256()
+        position = offset
+        fd = await loop.run_in_executor(None, os.open, path, os.O_WRONLY)
+        try:
+            buffer = bytearray()
+            async for chunk in request.content.iter_chunked(1024 * 1024):
+                buffer += chunk
+                if len(buffer) >= self.write_buffer_size:
+                    position += await loop.run_in_executor(
+                        None, _write_all, fd, position, bytes(buffer), hasher, decompressor
+                    )
+                    buffer.clear()
+            position += await loop.run_in_executor(
+                None, _write_all, fd, position, bytes(buffer), hasher, decompressor
+            )
+            position += await loop.run_in_executor(
+                None, _write_all, fd, position, decompressor.flush(), hasher
+            )
+        finally:
+            os.close(fd)
+
+        received = position - offset
+        if received != length:
+            raise web.HTTPBadRequest(
+                reason=f"{rel_path}: expected {length} bytes at {offset}, got {received}"
+            )
+        incoming.files[rel_path]["segments"][offset] = [offset, length, hasher.hexdigest()]
+        return web.json_response({"status": "ok", "path": rel_path, "size": received})
+
+    async def handle_missing_chunks(self, request: web.Request) -> web.Response:
+        """Answer which of the sender's chunks this node does not hold."""
+        migration_id = request.match_info['migration_id']
+        data = await request.json()
+        image = os.path.basename(data["image"])
+        self._incoming(migration_id, image)
+
+        missing = await asyncio.get_event_loop().run_in_executor(
+            None,
+            lambda: self.chunk_store.missing(
+                data["chunks"], pin=f"{migration_id}/{image}"
+            )
+        )
+        return web.json_response({"missing": missing})
+
+    async def handle_chunks(self, request: web.Request) -> web.Response:
+        """Receive framed chunks: 64-byte hex digest, 8-byte length, data."""
+        loop = asyncio.get_event_loop()
+        codec = request.headers.get("X-Limoce-Codec", "none")
+        received = 0
+        while True:
+            try:
+                header = await request.content.readexactly(72)
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    raise web.HTTPBadRequest(reason="Truncated chunk header")
+                break
+            digest = header[:64].decode()
+            length = int.from_bytes(header[64:], 'big')
+            if length > self.max_chunk_bytes:
+                raise web.HTTPRequestEntityTooLarge(
+                    max_size=self.max_chunk_bytes, actual_size=length
+                )
+            data = await request.content.readexactly(length)
+            try:
+                await loop.run_in_executor(
+                    None,
+                    lambda: self.chunk_store.put(digest, decompress_block(codec, data))
+                )
+            except ValueError as e:
+                raise web.HTTPBadRequest(reason=str(e))
+            received += 1
+        return web.json_response({"status": "ok", "chunks": received})
+
+    async def handle_chunk_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.chunk_store.stats())
+
+    async def handle_commit(self, request: web.Request) -> web.Response:
+        """Verify a finished transfer against the sender's manifest."""
+        migration_id = request.match_info['migration_id']
+        data = await request.json()
+        image = os.path.basename(
+            data["checkpoint"]["checkpoint_path"].rstrip(os.sep)
+        )
+        incoming = self._incoming(migration_id, image)
+        files = data.get("files", {})
+
+        errors = []
+        chunked = {path: entry for path, entry in files.items() if "chunks" in entry}
+        if chunked:
+            # Delta transfer: rebuild the images from the chunk store
+            errors.extend(await asyncio.get_event_loop().run_in_executor(
+                None, self.chunk_store.assemble, chunked, incoming.image_dir
+            ))
+            self.chunk_store.unpin(f"{migration_id}/{image}")
+        for rel_path, expected in files.items():
+            if rel_path in chunked:
+                continue
+            actual = incoming.files.get(rel_path)
+            if actual is None:
+                errors.append(f"{rel_path}: missing")
+            elif (actual["size"] != expected["size"]
+                  or sorted(actual["segments"].values()) != expected["segments"]):
+                errors.append(f"{rel_path}: checksum mismatch")
+        incoming.metadata_complete.set()
+
+        loop = asyncio.get_event_loop()
+        for rel_path, link_target in data.get("symlinks", {}).items():
+            path = self._resolve(incoming, rel_path)
+            self._check_link_target(incoming, path, link_target)
+            await loop.run_in_executor(None, _replace_symlink, link_target, path)
+
+        preparation = await incoming.prepare_task
+        del self.incoming[f"{migration_id}/{image}"]
+
+        if errors:
+            self.logger.error(f"{migration_id}: transfer verification failed: {errors}")
+            return web.json_response(
+                {"status": "error", "errors": errors}, status=422
+            )
+
+        self.logger.info(
+            f"{migration_id}: received {len(incoming.files)} files into {incoming.image_dir}"
+        )
+        return web.json_response({
+            "status": "ok",
+            "image_dir": incoming.image_dir,
+            "elapsed": time.monotonic() - incoming.started,
+            **preparation
+        })
+
+    async def _prepare_restore(self, incoming: IncomingCheckpoint) -> Dict:
+        """
+        Get ready to restore while page images are still arriving: run
+        network setup straight away, then check the metadata images once
+        they are all in.
+        """
+        start = time.monotonic()
+        try:
+            if self.network_setup is not None:
+                await self.network_setup(incoming.migration_id, incoming.image_dir)
+
+            await incoming.metadata_complete.wait()
+            missing = await asyncio.get_event_loop().run_in_executor(
+                None, _check_images, incoming.image_dir
+            )
+            return {
+                "prepared": not missing,
+                "missing_images": missing,
+                "prepare_time": time.monotonic() - start
+            }
+        except Exception as e:
+            self.logger.error(f"{incoming.migration_id}: restore preparation failed: {e}")
+            return {
+                "prepared": False,
+                "error": str(e),
+                "prepare_time": time.monotonic() - start
+            }
+
+    async def handle_page_server(self, request: web.Request) -> web.Response:
+        """Record where lazy pages for a migration will be pulled from."""
+        data = await request.json()
+        channel = data["channel"]
+        self.page_server_channels[channel["migration_id"]] = channel
+        return web.json_response({"status": "ok"})
+
+    async def handle_page_server_close(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        self.page_server_channels.pop(data["migration_id"], None)
+        return web.json_response({"status": "ok"})
+
+async def start_local_agents(base_dir: str,
+                             ports: List[int],
+                             host: str = "127.0.0.1") -> List[MigrationAgent]:
+    """
+    Start one agent per port on this machine, each with its own checkpoint
+    directory under base_dir, to run two-node migrations on a single box.
+    """
+    agents = []
+    for port in ports:
+        agent = MigrationAgent(
+            host=host,
+            port=port,
+            checkpoint_dir=os.path.join(base_dir, f"agent_{port}"),
+            device_id=f"local_{port}"
+        )
+        await agent.start()
+        agents.append(agent)
+    return agents
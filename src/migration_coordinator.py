@@ -1,9 +1,46 @@
 # src/migration_coordinator.py
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 import asyncio
-from typing import Dict, Optional
+import glob
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from typing import Dict, List, Optional
 import logging
+from .checkpoint_watcher import CheckpointWatcher
+from .cost_model import (
+    STRATEGIES, STRATEGY_POST_COPY, STRATEGY_PRE_COPY, STRATEGY_STOP_AND_COPY,
+    MigrationCostModel, MigrationEstimate
+)
+from .placement import PlacementDecision, PlacementEngine
+from .readiness import ReadinessConfig, wait_until_ready
+
+# Let the cost model pick one of STRATEGIES
+STRATEGY_AUTO = "auto"
+
+@dataclass
+class PreCopyConfig:
+    max_rounds: int = 5
+    # Freeze once a round dirties fewer bytes than this
+    dirty_threshold_bytes: int = 16 * 1024 * 1024
+    # Freeze once a round is not at least this much smaller than the previous one
+    min_shrink_ratio: float = 0.8
+    # Freeze once pre-dump rounds have sent this many bytes in total
+    max_total_bytes: Optional[int] = None
+
+@dataclass
+class PostCopyConfig:
+    # Address the source page server listens on
+    page_server_address: str = "0.0.0.0"
+    # Address the target connects to; defaults to the source device id
+    advertise_address: Optional[str] = None
+    page_server_port: int = 27000
+    port_range: int = 100
+    # Seconds allowed for the target to pull every remaining page
+    completion_timeout: float = 600.0
 
 @dataclass
 class MigrationState:
@@ -14,58 +51,195 @@ class MigrationState:
     end_time: Optional[datetime] = None
     status: str = "pending"
     error: Optional[str] = None
+    strategy: str = STRATEGY_STOP_AND_COPY
+    precopy_rounds: List[Dict] = field(default_factory=list)
+    downtime: Optional[float] = None
+    # Monotonic time the container was frozen
+    freeze_start: Optional[float] = None
+    # When the readiness probe first succeeded on the target
+    ready_time: Optional[datetime] = None
+    probe_attempts: int = 0
+    # Cost model prediction the strategy was chosen by
+    estimate: Optional[Dict] = None
+    # Pre-copy rounds planned by the cost model
+    planned_rounds: Optional[int] = None
+    bytes_transferred: int = 0
+    transfers: List[Dict] = field(default_factory=list)
+    lazy_pages_pending: bool = False
+    lazy_complete_time: Optional[datetime] = None
+    source_released: bool = False
+    pipelined: bool = False
+    # Phase name -> {"start", "end"} monotonic timestamps
+    phase_timings: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+def _pages_size(image_dir: str) -> int:
+    """Total size of the memory page images in a CRIU images directory."""
+    return sum(
+        os.path.getsize(path)
+        for path in glob.glob(os.path.join(image_dir, "pages-*.img"))
+    )
+
+async def _wait_process(process: subprocess.Popen,
+                        deadline: float,
+                        poll_interval: float = 0.5):
+    """
+    Wait for a process to exit by polling from the event loop, rather than
+    parking an executor thread in wait() for the whole lazy phase.
+    """
+    while process.poll() is None:
+        if time.monotonic() >= deadline:
+            raise subprocess.TimeoutExpired(process.args, 0)
+        await asyncio.sleep(poll_interval)
+    return process.returncode
 
 class MigrationCoordinator:
-    def __init__(self, container_manager, network_manager):
+    def __init__(self,
+                 container_manager,
+                 network_manager,
+                 checkpoint_dir: str = "/tmp/checkpoints",
+                 precopy_config: Optional[PreCopyConfig] = None,
+                 postcopy_config: Optional[PostCopyConfig] = None,
+                 failure_detector=None,
+                 readiness_config: Optional[ReadinessConfig] = None,
+                 cost_model: Optional[MigrationCostModel] = None,
+                 placement: Optional[PlacementEngine] = None):
+        """
+        Args:
+            failure_detector: Optional PhiAccrualDetector; suspected devices
+                are refused as migration targets
+            readiness_config: How verify_migration decides the restored
+                service is back; by default only that it is running
+            cost_model: Predicts strategies' time and downtime for 'auto'
+                and deadlines; learns from completed migrations
+            placement: Picks targets for migrations started without one
+        """
         self.container_manager = container_manager
         self.network_manager = network_manager
+        self.checkpoint_dir = checkpoint_dir
+        self.precopy_config = precopy_config or PreCopyConfig()
+        self.postcopy_config = postcopy_config or PostCopyConfig()
+        self.failure_detector = failure_detector
+        self.readiness_config = readiness_config or ReadinessConfig()
+        self._readiness: Dict[str, ReadinessConfig] = {}
+        self.cost_model = cost_model or MigrationCostModel(
+            max_rounds=self.precopy_config.max_rounds
+        )
+        self.placement = placement
         self.migrations: Dict[str, MigrationState] = {}
+        self._lazy_tasks: Dict[str, asyncio.Task] = {}
+        self._page_server_ports: set = set()
         self.logger = logging.getLogger("limoce.migration")
 
-    async def start_migration(self, 
-                            source_id: str, 
-                            target_id: str, 
-                            container_id: str) -> str:
-        """Start container migration process."""
-        migration_id = f"migration_{int(datetime.now().timestamp())}"
-        
+    async def start_migration(self,
+                            source_id: str,
+                            target_id: Optional[str],
+                            container_id: str,
+                            strategy: str = STRATEGY_STOP_AND_COPY,
+                            pipelined: bool = False,
+                            readiness: Optional[ReadinessConfig] = None,
+                            deadline: Optional[float] = None) -> str:
+        """
+        Start container migration process.
+
+        Args:
+            source_id: Source device
+            target_id: Target device; None lets the placement engine choose
+            container_id: Container to migrate
+            strategy: 'stop_and_copy' (freeze, dump, transfer, restore),
+                'pre_copy' (iterative pre-dumps while running, short final freeze)
+                or 'post_copy' (restore first, pull memory pages lazily);
+                'auto' lets the cost model choose
+            pipelined: Send image files while the final dump is still
+                writing the rest (stop_and_copy and pre_copy only)
+            readiness: Readiness probe for this container, overriding the
+                coordinator's readiness_config
+            deadline: Seconds the migration must complete within; it is
+                refused if the cost model predicts no strategy can
+        """
+        if strategy != STRATEGY_AUTO and strategy not in STRATEGIES:
+            raise ValueError(f"Unknown migration strategy: {strategy}")
+        if pipelined and strategy == STRATEGY_POST_COPY:
+            raise ValueError("Pipelining does not apply to post_copy migrations")
+
+        placed: Optional[PlacementDecision] = None
+        reserved_cpu = reserved_memory = 0.0
+        if target_id is None:
+            if self.placement is None:
+                raise ValueError("No target given and no placement engine configured")
+            placed, reserved_cpu, reserved_memory = await self.select_target(
+                source_id, container_id
+            )
+            if placed is None:
+                raise ValueError(f"No node has room for {container_id}")
+            target_id = placed.target_id
+            # Held until the migration ends so concurrent placements see it
+            self.placement.reserve(target_id, reserved_cpu, reserved_memory)
+
+        if self.failure_detector is not None and not self.failure_detector.is_available(target_id):
+            if placed is not None:
+                self.placement.release(target_id, reserved_cpu, reserved_memory)
+            raise ValueError(f"Target device {target_id} is suspected to have failed")
+
+        estimate = None
+        if strategy == STRATEGY_AUTO or deadline is not None:
+            if strategy != STRATEGY_AUTO:
+                allowed = [strategy]
+            elif pipelined:
+                allowed = [STRATEGY_STOP_AND_COPY, STRATEGY_PRE_COPY]
+            else:
+                allowed = list(STRATEGIES)
+            estimate = await self.plan_migration(target_id, container_id, deadline, allowed)
+            if estimate is None:
+                if placed is not None:
+                    self.placement.release(target_id, reserved_cpu, reserved_memory)
+                raise ValueError(
+                    f"No strategy can migrate {container_id} within {deadline}s"
+                )
+            strategy = estimate.strategy
+
+        # The random suffix keeps migrations started in the same second apart
+        migration_id = f"migration_{int(datetime.now().timestamp())}_{uuid.uuid4().hex[:8]}"
+
         self.migrations[migration_id] = MigrationState(
             source_id=source_id,
             target_id=target_id,
             container_id=container_id,
-            start_time=datetime.now()
+            start_time=datetime.now(),
+            strategy=strategy,
+            pipelined=pipelined
         )
+        if estimate is not None:
+            self.migrations[migration_id].estimate = estimate.to_dict()
+            if estimate.strategy == STRATEGY_PRE_COPY:
+                self.migrations[migration_id].planned_rounds = estimate.rounds
+        if readiness is not None:
+            self._readiness[migration_id] = readiness
 
         try:
-            # Create checkpoint
-            checkpoint_success = await self.create_checkpoint(migration_id)
-            if not checkpoint_success:
-                raise Exception("Checkpoint creation failed")
-
-            # Transfer checkpoint
-            transfer_success = await self.transfer_checkpoint(migration_id)
-            if not transfer_success:
-                raise Exception("Checkpoint transfer failed")
-
-            # Restore container
-            restore_success = await self.restore_container(migration_id)
-            if not restore_success:
-                raise Exception("Container restore failed")
+            if strategy == STRATEGY_PRE_COPY:
+                await self._run_pre_copy(migration_id)
+            elif strategy == STRATEGY_POST_COPY:
+                await self._run_post_copy(migration_id)
+            else:
+                await self._run_stop_and_copy(migration_id)
 
             # Verify migration
+            self._phase_start(migration_id, "verify")
             verify_success = await self.verify_migration(migration_id)
+            self._phase_end(migration_id, "verify")
             if not verify_success:
                 raise Exception("Migration verification failed")
 
             # Update migration state
             self.migrations[migration_id].status = "completed"
             self.migrations[migration_id].end_time = datetime.now()
-            
-            # Update metrics
-            duration = (self.migrations[migration_id].end_time - 
-                       self.migrations[migration_id].start_time).total_seconds()
-            self.container_manager.migration_duration.set(duration)
-            self.container_manager.migration_counter.inc()
+
+            # Update metrics and the cost model
+            self.container_manager.metrics.observe_migration(
+                self.migrations[migration_id], self.timing_breakdown(migration_id)
+            )
+            self.cost_model.observe(migration_id, self.migrations[migration_id])
+            self._record_placement(migration_id)
 
             return migration_id
 
@@ -74,53 +248,557 @@ class MigrationCoordinator:
             self.migrations[migration_id].status = "failed"
             self.migrations[migration_id].error = str(e)
             self.migrations[migration_id].end_time = datetime.now()
+            self.container_manager.metrics.observe_migration(
+                self.migrations[migration_id], self.timing_breakdown(migration_id)
+            )
             return migration_id
+        finally:
+            if placed is not None:
+                self.placement.release(target_id, reserved_cpu, reserved_memory)
+
+    async def select_target(self,
+                            source_id: str,
+                            container_id: str):
+        """
+        Ask the placement engine for the target a container's image gets
+        to fastest. Returns the decision (None if no node has room) and the
+        container's CPU request and memory usage it was placed by.
+        """
+        stats = await self.container_manager.run_blocking(
+            self.container_manager.get_container_stats, container_id
+        )
+        cpu = await self.container_manager.get_container_cpu_request(container_id)
+        memory = stats.get('memory_usage', 0)
+        image_bytes = self.cost_model.history.get(container_id, {}).get("image_bytes") or memory
+        decision = self.placement.select(
+            container_id, image_bytes, memory=memory, cpu=cpu, exclude=[source_id]
+        )
+        if decision is not None:
+            self.logger.info(
+                f"Placed {container_id} on {decision.target_id}: "
+                f"{decision.predicted_time:.2f}s predicted transfer, "
+                f"{decision.cached_bytes / 1e6:.0f} MB cached there"
+            )
+        return decision, cpu, memory
+
+    def _record_placement(self, migration_id: str):
+        """The target's chunk store now holds the container's image chunks."""
+        migration = self.migrations[migration_id]
+        if (self.placement is None or self.network_manager.chunk_store is None
+                or not migration.transfers):
+            return
+        # Every pre-copy round left its chunks there, not just the final dump
+        self.placement.record_cached(
+            migration.target_id,
+            migration.container_id,
+            sum(transfer.get("logical_bytes", 0) for transfer in migration.transfers)
+        )
+
+    async def plan_migration(self,
+                             target_id: str,
+                             container_id: str,
+                             deadline: Optional[float] = None,
+                             strategies: Optional[List[str]] = None) -> Optional[MigrationEstimate]:
+        """
+        Predict the best strategy for a container from its memory size,
+        dirty rate (profiled, or from past pre-copy rounds) and image sizes
+        and the measured link bandwidth.
+        """
+        stats = await self.container_manager.run_blocking(
+            self.container_manager.get_container_stats, container_id
+        )
+        dirty = self.container_manager.get_dirty_page_window(container_id)
+        profile = self.cost_model.profile(
+            container_id,
+            stats.get('memory_usage') or None,
+            dirty['dirty_rate_mean'] if dirty.get('samples') else None
+        )
+        bandwidth = self.network_manager.link_bandwidth.get(
+            self.network_manager.endpoint(target_id),
+            self.network_manager.default_bandwidth
+        )
+        estimate = self.cost_model.choose(profile, bandwidth, deadline, strategies)
+        if estimate is not None:
+            self.logger.info(
+                f"Planned {estimate.strategy} for {container_id}: "
+                f"{estimate.total_time:.1f}s total, {estimate.downtime:.2f}s downtime"
+            )
+        return estimate
+
+    async def evacuate(self,
+                       source_id: str,
+                       target_id: Optional[str],
+                       container_ids: List[str],
+                       strategy: str = STRATEGY_PRE_COPY) -> List[str]:
+        """
+        Move containers off a device, e.g. from a failure detector listener
+        once the device starts looking unhealthy but is still reachable.
+        With no target_id each container is placed on its own.
+        """
+        self.logger.warning(
+            f"Evacuating {len(container_ids)} containers from {source_id} "
+            f"to {target_id or 'placed targets'}"
+        )
+        migration_ids = []
+        for container_id in container_ids:
+            migration_ids.append(await self.start_migration(
+                source_id, target_id, container_id, strategy
+            ))
+        return migration_ids
+
+    async def _run_stop_and_copy(self, migration_id: str):
+        """Freeze the container, then checkpoint, transfer and restore it."""
+        freeze_start = time.monotonic()
+        self.migrations[migration_id].freeze_start = freeze_start
+
+        # Create and transfer checkpoint
+        await self._checkpoint_and_transfer(migration_id)
+
+        # Restore container
+        self._phase_start(migration_id, "restore")
+        restore_success = await self.restore_container(migration_id)
+        self._phase_end(migration_id, "restore")
+        if not restore_success:
+            raise Exception("Container restore failed")
+
+        self.migrations[migration_id].downtime = time.monotonic() - freeze_start
+
+    async def _run_pre_copy(self, migration_id: str):
+        """
+        Iteratively pre-dump and transfer dirty pages while the container
+        runs, then freeze once the dirty set converges.
+        """
+        migration = self.migrations[migration_id]
+        config = self.precopy_config
+        parent_dir = None
+        total_bytes = 0
+
+        # The profiler's clear_refs writes would reset the soft-dirty bits
+        # the pre-dumps track; keep it off until the final dump is taken
+        paused = await self.container_manager.run_blocking(
+            self.container_manager.pause_dirty_pages, migration.container_id
+        )
+        try:
+            for round_idx in range(migration.planned_rounds or config.max_rounds):
+                round_dir = os.path.join(
+                    self.checkpoint_path(migration_id), f"round_{round_idx}"
+                )
+                round_start = time.monotonic()
+
+                pre_dump_success = await self.container_manager.pre_dump_container_async(
+                    migration.container_id,
+                    round_dir,
+                    parent_dir
+                )
+                if not pre_dump_success:
+                    raise Exception(f"Pre-dump round {round_idx} failed")
+
+                transfer_success = await self.transfer_checkpoint(
+                    migration_id, round_dir
+                )
+                if not transfer_success:
+                    raise Exception(f"Pre-dump round {round_idx} transfer failed")
+
+                round_bytes = await asyncio.get_event_loop().run_in_executor(
+                    None, _pages_size, round_dir
+                )
+                total_bytes += round_bytes
+                migration.precopy_rounds.append({
+                    "round": round_idx,
+                    "bytes": round_bytes,
+                    "duration": time.monotonic() - round_start
+                })
+                self.logger.info(
+                    f"{migration_id}: pre-copy round {round_idx} sent {round_bytes} bytes"
+                )
+                parent_dir = round_dir
+
+                if self._pre_copy_converged(migration.precopy_rounds, total_bytes):
+                    break
+
+            freeze_start = time.monotonic()
+            migration.freeze_start = freeze_start
+
+            await self._checkpoint_and_transfer(migration_id, parent_dir)
+
+            self._phase_start(migration_id, "restore")
+            restore_success = await self.restore_container(migration_id)
+            self._phase_end(migration_id, "restore")
+            if not restore_success:
+                raise Exception("Container restore failed")
+
+            migration.downtime = time.monotonic() - freeze_start
+        except Exception:
+            if paused:
+                await self.container_manager.run_blocking(
+                    self.container_manager.resume_dirty_pages, migration.container_id
+                )
+            raise
+        if paused:
+            # The container now runs on the target
+            self.container_manager.unsubscribe_dirty_pages(migration.container_id)
+
+    async def _checkpoint_and_transfer(self,
+                                     migration_id: str,
+                                     parent_dir: Optional[str] = None):
+        """Take the final checkpoint and send it, pipelined if requested."""
+        if self.migrations[migration_id].pipelined:
+            await self._pipelined_checkpoint_transfer(migration_id, parent_dir)
+            return
+
+        self._phase_start(migration_id, "checkpoint")
+        checkpoint_success = await self.create_checkpoint(migration_id, parent_dir)
+        self._phase_end(migration_id, "checkpoint")
+        if not checkpoint_success:
+            raise Exception("Checkpoint creation failed")
+
+        self._phase_start(migration_id, "transfer")
+        transfer_success = await self.transfer_checkpoint(migration_id)
+        self._phase_end(migration_id, "transfer")
+        if not transfer_success:
+            raise Exception("Checkpoint transfer failed")
+
+    async def _pipelined_checkpoint_transfer(self,
+                                           migration_id: str,
+                                           parent_dir: Optional[str] = None):
+        """
+        Send each image file as soon as the dump closes it, so most of the
+        transfer overlaps the dump. Files the dump rewrites after they were
+        sent go again in the final sweep.
+        """
+        migration = self.migrations[migration_id]
+        image_dir = self._final_checkpoint_dir(migration_id)
+        watcher = CheckpointWatcher(
+            self.checkpoint_path(migration_id), os.path.basename(image_dir)
+        )
+        watcher.start()
 
-    async def create_checkpoint(self, migration_id: str) -> bool:
+        try:
+            transfer = await self.network_manager.begin_transfer(
+                migration.source_id,
+                migration.target_id,
+                {
+                    "migration_id": migration_id,
+                    "container_id": migration.container_id,
+                    "checkpoint_path": image_dir
+                }
+            )
+            if transfer is None:
+                raise Exception("Checkpoint transfer failed")
+
+            self._phase_start(migration_id, "checkpoint")
+            dump = asyncio.ensure_future(
+                self.create_checkpoint(migration_id, parent_dir)
+            )
+            send_failed = False
+            while not dump.done():
+                closed = asyncio.ensure_future(watcher.wait())
+                await asyncio.wait({dump, closed}, return_when=asyncio.FIRST_COMPLETED)
+                closed.cancel()
+
+                rel_paths = watcher.drain()
+                if not rel_paths or send_failed:
+                    continue
+                self._phase_start(migration_id, "transfer")
+                # The dump keeps running meanwhile; a failed send only
+                # fails the migration once it is done
+                send_failed = not await self.network_manager.send_checkpoint_files(
+                    transfer, rel_paths, final=False
+                )
+            self._phase_end(migration_id, "checkpoint")
+
+            if not dump.result():
+                raise Exception("Checkpoint creation failed")
+            if send_failed:
+                raise Exception("Checkpoint transfer failed")
+
+            self._phase_start(migration_id, "transfer")
+            rel_paths = watcher.finish()
+            if not await self.network_manager.send_checkpoint_files(
+                transfer, rel_paths, final=True
+            ):
+                raise Exception("Checkpoint transfer failed")
+            result = await self.network_manager.commit_transfer(transfer)
+            self._phase_end(migration_id, "transfer")
+            if result is None:
+                raise Exception("Checkpoint transfer failed")
+        finally:
+            watcher.stop()
+
+        self._record_transfer(migration_id, result)
+
+    async def _run_post_copy(self, migration_id: str):
+        """
+        Restore on the target with everything but memory, then let the
+        target pull pages from the source page server on demand.
+        """
+        migration = self.migrations[migration_id]
+        config = self.postcopy_config
+        port = self._allocate_page_server_port()
+        address = config.advertise_address or migration.source_id
+        dump_process = None
+
+        try:
+            freeze_start = time.monotonic()
+            migration.freeze_start = freeze_start
+
+            dump_process = await self.container_manager.run_blocking(
+                self.container_manager.checkpoint_container_lazy,
+                migration.container_id,
+                self.checkpoint_path(migration_id),
+                config.page_server_address,
+                port
+            )
+            if dump_process is None:
+                raise Exception("Checkpoint creation failed")
+
+            # Only non-memory state is transferred up front
+            transfer_success = await self.transfer_checkpoint(migration_id)
+            if not transfer_success:
+                raise Exception("Checkpoint transfer failed")
+
+            channel = await self.network_manager.open_page_server_channel(
+                migration.source_id,
+                migration.target_id,
+                {"migration_id": migration_id, "address": address, "port": port}
+            )
+            if channel is None:
+                raise Exception("Page server channel setup failed")
+
+            lazy_daemon = await self.container_manager.run_blocking(
+                self.container_manager.restore_container_lazy,
+                migration.container_id,
+                self.checkpoint_path(migration_id),
+                address,
+                port
+            )
+            if lazy_daemon is None:
+                raise Exception("Container restore failed")
+
+            migration.downtime = time.monotonic() - freeze_start
+        except Exception:
+            if dump_process is not None:
+                dump_process.kill()
+            self._page_server_ports.discard(port)
+            raise
+
+        migration.lazy_pages_pending = True
+        self._lazy_tasks[migration_id] = asyncio.ensure_future(
+            self._track_lazy_pages(migration_id, dump_process, lazy_daemon, port)
+        )
+
+    async def _track_lazy_pages(self,
+                              migration_id: str,
+                              dump_process: subprocess.Popen,
+                              lazy_daemon: subprocess.Popen,
+                              port: int):
+        """Wait for the lazy phase to drain, then release the source."""
+        migration = self.migrations[migration_id]
+        deadline = time.monotonic() + self.postcopy_config.completion_timeout
+
+        try:
+            # The source page server exits once every page has been
+            # fetched, the target daemon once every page is in place.
+            await _wait_process(dump_process, deadline)
+            await _wait_process(lazy_daemon, deadline)
+
+            migration.lazy_pages_pending = False
+            migration.lazy_complete_time = datetime.now()
+            self.logger.info(f"{migration_id}: all lazy pages transferred")
+
+            await self.network_manager.close_page_server_channel(
+                migration.source_id, migration.target_id, migration_id
+            )
+            await self.release_source(migration_id)
+        except subprocess.TimeoutExpired:
+            dump_process.kill()
+            lazy_daemon.kill()
+            self.logger.error(f"{migration_id}: lazy page transfer timed out")
+            migration.status = "failed"
+            migration.error = "Lazy page transfer timed out"
+        finally:
+            self._page_server_ports.discard(port)
+            self._lazy_tasks.pop(migration_id, None)
+
+    async def wait_for_lazy_pages(self,
+                                migration_id: str,
+                                timeout: Optional[float] = None) -> bool:
+        """Wait until a post-copy migration no longer depends on its source."""
+        task = self._lazy_tasks.get(migration_id)
+        if task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                return False
+        migration = self.migrations[migration_id]
+        return not migration.lazy_pages_pending and migration.status != "failed"
+
+    async def release_source(self, migration_id: str):
+        """Drop source-side checkpoint state once the target is self-sufficient."""
+        migration = self.migrations[migration_id]
+        if migration.lazy_pages_pending:
+            raise RuntimeError(f"{migration_id} still has lazy pages in flight")
+
+        await self.container_manager.run_blocking(
+            shutil.rmtree,
+            self.checkpoint_path(migration_id),
+            True
+        )
+        migration.source_released = True
+        self.logger.info(f"{migration_id}: source released")
+
+    def _allocate_page_server_port(self) -> int:
+        config = self.postcopy_config
+        for offset in range(config.port_range):
+            port = config.page_server_port + offset
+            if port not in self._page_server_ports:
+                self._page_server_ports.add(port)
+                return port
+        raise Exception("No free page server port")
+
+    def _pre_copy_converged(self, rounds: List[Dict], total_bytes: int) -> bool:
+        """Decide whether another pre-dump round is worth it."""
+        config = self.precopy_config
+        last_bytes = rounds[-1]["bytes"]
+
+        if last_bytes <= config.dirty_threshold_bytes:
+            return True
+        if config.max_total_bytes is not None and total_bytes >= config.max_total_bytes:
+            return True
+        if len(rounds) > 1 and last_bytes > rounds[-2]["bytes"] * config.min_shrink_ratio:
+            # Dirty rate is keeping up with the copy rate; more rounds won't help
+            return True
+        return False
+
+    def checkpoint_path(self, migration_id: str) -> str:
+        """Directory holding all checkpoint images of a migration."""
+        return os.path.join(self.checkpoint_dir, migration_id)
+
+    def _final_checkpoint_dir(self, migration_id: str) -> str:
+        migration = self.migrations[migration_id]
+        return os.path.join(
+            self.checkpoint_path(migration_id),
+            f"checkpoint_{migration.container_id}"
+        )
+
+    async def create_checkpoint(self,
+                              migration_id: str,
+                              parent_dir: Optional[str] = None) -> bool:
         """Create container checkpoint."""
         migration = self.migrations[migration_id]
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
-            self.container_manager.checkpoint_container,
+        return await self.container_manager.checkpoint_container_async(
             migration.container_id,
-            f"/tmp/checkpoints/{migration_id}"
+            self.checkpoint_path(migration_id),
+            None,
+            parent_dir
         )
 
-    async def transfer_checkpoint(self, migration_id: str) -> bool:
-        """Transfer checkpoint to target device."""
+    async def transfer_checkpoint(self,
+                                migration_id: str,
+                                image_dir: Optional[str] = None) -> bool:
+        """Transfer checkpoint (or one pre-dump round) to target device."""
         migration = self.migrations[migration_id]
         checkpoint_data = {
             "migration_id": migration_id,
             "container_id": migration.container_id,
-            "checkpoint_path": f"/tmp/checkpoints/{migration_id}"
+            "checkpoint_path": image_dir or self._final_checkpoint_dir(migration_id)
         }
-        
+
         result = await self.network_manager.transfer_checkpoint(
             migration.source_id,
             migration.target_id,
             checkpoint_data
         )
-        return result is not None
+        if result is None:
+            return False
+
+        self._record_transfer(migration_id, result)
+        return True
+
+    def _record_transfer(self, migration_id: str, result: Dict):
+        migration = self.migrations[migration_id]
+        transfer = result.get("transfer", {})
+        migration.transfers.append(transfer)
+        migration.bytes_transferred += transfer.get("bytes", 0)
+
+    def _phase_start(self, migration_id: str, phase: str):
+        """Mark a phase started; later calls keep the first start."""
+        timings = self.migrations[migration_id].phase_timings
+        timings.setdefault(phase, {"start": time.monotonic(), "end": None})
+
+    def _phase_end(self, migration_id: str, phase: str):
+        self.migrations[migration_id].phase_timings[phase]["end"] = time.monotonic()
+
+    def timing_breakdown(self, migration_id: str) -> Dict:
+        """
+        Per-phase durations and offsets from the first phase, plus how long
+        the checkpoint and transfer phases overlapped (pipelined mode).
+        """
+        timings = self.migrations[migration_id].phase_timings
+        if not timings:
+            return {"phases": {}, "overlap": 0.0}
+
+        origin = min(t["start"] for t in timings.values())
+        phases = {}
+        for phase, t in timings.items():
+            end = t["end"] if t["end"] is not None else time.monotonic()
+            phases[phase] = {
+                "start": t["start"] - origin,
+                "end": end - origin,
+                "duration": end - t["start"]
+            }
+
+        overlap = 0.0
+        if "checkpoint" in phases and "transfer" in phases:
+            checkpoint, transfer = phases["checkpoint"], phases["transfer"]
+            overlap = max(
+                0.0,
+                min(checkpoint["end"], transfer["end"])
+                - max(checkpoint["start"], transfer["start"])
+            )
+        return {"phases": phases, "overlap": overlap}
 
     async def restore_container(self, migration_id: str) -> bool:
         """Restore container on target device."""
         migration = self.migrations[migration_id]
-        return await asyncio.get_event_loop().run_in_executor(
-            None,
-            self.container_manager.restore_container,
+        return await self.container_manager.restore_container_async(
             migration.container_id,
-            f"/tmp/checkpoints/{migration_id}"
+            self.checkpoint_path(migration_id)
         )
 
     async def verify_migration(self, migration_id: str) -> bool:
-        """Verify migration success."""
+        """
+        Verify migration success: the restored container is running (per
+        Docker, or per runc for post-copy restores) and, with a readiness
+        probe configured, its service answers again. The first successful
+        probe ends the measured downtime.
+        """
         migration = self.migrations[migration_id]
-        
-        # Get container stats from target device
-        stats = await asyncio.get_event_loop().run_in_executor(
-            None,
-            self.container_manager.get_container_stats,
+        config = self._readiness.pop(migration_id, self.readiness_config)
+
+        if migration.strategy == STRATEGY_POST_COPY:
+            # Restored through runc directly; dockerd does not track it
+            running = await self.container_manager.wait_until_running_runc(
+                migration.container_id, config.timeout
+            )
+        else:
+            running = await self.container_manager.wait_until_running(
+                migration.container_id, config.timeout
+            )
+        if not running or config.probe is None:
+            return running
+
+        host = config.host or await self.container_manager.get_container_address(
             migration.container_id
         )
-        
-        return bool(stats)
\ No newline at end of file
+        if host is None:
+            self.logger.error(f"{migration_id}: no address to probe")
+            return False
+
+        ready_at, migration.probe_attempts = await wait_until_ready(config, host)
+        if ready_at is None:
+            return False
+        migration.ready_time = datetime.now()
+        if migration.freeze_start is not None:
+            migration.downtime = ready_at - migration.freeze_start
+        return True
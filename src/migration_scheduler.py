@@ -0,0 +1,268 @@
+# src/migration_scheduler.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from .migration_coordinator import STRATEGY_PRE_COPY, STRATEGY_STOP_AND_COPY
+
+@dataclass(order=True)
+class MigrationRequest:
+    # Heap order: higher priority, then earlier deadline (start or
+    # completion, whichever comes first), then FIFO
+    sort_key: tuple = field(init=False, repr=False)
+    source_id: str = field(compare=False)
+    target_id: str = field(compare=False)
+    container_id: str = field(compare=False)
+    strategy: str = field(compare=False)
+    priority: int = field(default=0, compare=False)
+    # Monotonic time the migration must have started by
+    start_by: Optional[float] = field(default=None, compare=False)
+    # Monotonic time the migration must have completed by
+    complete_by: Optional[float] = field(default=None, compare=False)
+    # Uplink bandwidth reserved while it runs, bytes/sec
+    bandwidth: float = field(default=0.0, compare=False)
+    pipelined: bool = field(default=False, compare=False)
+    seq: int = field(default=0, compare=False)
+    submitted: float = field(default_factory=time.monotonic, compare=False)
+    future: Optional[asyncio.Future] = field(default=None, compare=False, repr=False)
+
+    def __post_init__(self):
+        deadlines = [d for d in (self.start_by, self.complete_by) if d is not None]
+        self.sort_key = (
+            -self.priority,
+            min(deadlines) if deadlines else float("inf"),
+            self.seq
+        )
+
+class MigrationScheduler:
+    def __init__(self,
+                 coordinator,
+                 max_concurrent: int = 8,
+                 max_per_source: int = 2,
+                 max_per_target: int = 2,
+                 uplink_budgets: Optional[Dict[str, float]] = None,
+                 default_uplink_budget: Optional[float] = None,
+                 default_bandwidth: float = 12.5e6):
+        """
+        Queue migration requests and run them concurrently within per-node
+        and per-uplink limits.
+
+        Requests are started highest priority first, then earliest deadline.
+        A request blocked on a busy node or uplink does not hold back
+        requests that only need idle ones.
+
+        Args:
+            coordinator: MigrationCoordinator running the migrations
+            max_concurrent: Migrations running at once overall
+            max_per_source: Migrations running at once from one node
+            max_per_target: Migrations running at once into one node
+            uplink_budgets: Bytes/sec each source node's uplink may carry
+                for migrations
+            default_uplink_budget: Budget for nodes not in uplink_budgets;
+                None leaves them unlimited
+            default_bandwidth: Bandwidth reserved by requests that do not
+                give one
+        """
+        self.coordinator = coordinator
+        self.max_concurrent = max_concurrent
+        self.max_per_source = max_per_source
+        self.max_per_target = max_per_target
+        self.uplink_budgets = dict(uplink_budgets or {})
+        self.default_uplink_budget = default_uplink_budget
+        self.default_bandwidth = default_bandwidth
+        self.logger = logging.getLogger("limoce.scheduler")
+
+        self._queue: List[MigrationRequest] = []
+        self._seq = itertools.count()
+        self._running: Dict[int, MigrationRequest] = {}
+        self._per_source: Dict[str, int] = defaultdict(int)
+        self._per_target: Dict[str, int] = defaultdict(int)
+        self._reserved: Dict[str, float] = defaultdict(float)
+        self._completed = 0
+        self._failed = 0
+        self._expired = 0
+        self._total_wait = 0.0
+
+    def submit(self,
+               source_id: str,
+               target_id: str,
+               container_id: str,
+               strategy: str = STRATEGY_STOP_AND_COPY,
+               priority: int = 0,
+               start_within: Optional[float] = None,
+               deadline: Optional[float] = None,
+               bandwidth: Optional[float] = None,
+               pipelined: bool = False) -> asyncio.Future:
+        """
+        Queue a migration.
+
+        Args:
+            priority: Higher runs first
+            start_within: Seconds from now the migration must start within;
+                it fails with a TimeoutError if it cannot
+            deadline: Seconds from now the migration must complete within;
+                the time left when it starts is passed to the coordinator
+                so the cost model can choose (or refuse) a strategy
+            bandwidth: Uplink bytes/sec to reserve while it runs
+
+        Returns:
+            Future resolving to the migration id
+        """
+        now = time.monotonic()
+        request = MigrationRequest(
+            source_id=source_id,
+            target_id=target_id,
+            container_id=container_id,
+            strategy=strategy,
+            priority=priority,
+            start_by=now + start_within if start_within is not None else None,
+            complete_by=now + deadline if deadline is not None else None,
+            bandwidth=self.default_bandwidth if bandwidth is None else bandwidth,
+            pipelined=pipelined,
+            seq=next(self._seq),
+            future=asyncio.get_event_loop().create_future()
+        )
+        heapq.heappush(self._queue, request)
+        expires = [d for d in (start_within, deadline) if d is not None]
+        if expires:
+            # Fail it on time even if nothing else triggers a dispatch
+            asyncio.get_event_loop().call_later(min(expires), self._dispatch)
+        self._dispatch()
+        return request.future
+
+    def drain(self,
+              source_id: str,
+              container_ids: List[str],
+              target_ids: List[str],
+              strategy: str = STRATEGY_PRE_COPY,
+              priority: int = 10,
+              start_within: Optional[float] = None,
+              deadline: Optional[float] = None) -> List[asyncio.Future]:
+        """
+        Evacuate containers from a node, spreading them over targets so no
+        single target (and the per-source limits) becomes the bottleneck.
+
+        start_within and deadline apply to each migration as in submit.
+        """
+        if not target_ids:
+            raise ValueError("Draining a node needs at least one target")
+        load = {
+            target_id: self._per_target[target_id] + sum(
+                1 for r in self._queue if r.target_id == target_id
+            )
+            for target_id in target_ids
+        }
+        futures = []
+        for container_id in container_ids:
+            target_id = min(target_ids, key=lambda t: load[t])
+            load[target_id] += 1
+            futures.append(self.submit(
+                source_id, target_id, container_id, strategy, priority,
+                start_within=start_within, deadline=deadline
+            ))
+        self.logger.info(
+            f"Draining {len(container_ids)} containers from {source_id} "
+            f"over {len(target_ids)} targets"
+        )
+        return futures
+
+    def _uplink_budget(self, source_id: str) -> Optional[float]:
+        return self.uplink_budgets.get(source_id, self.default_uplink_budget)
+
+    def _admissible(self, request: MigrationRequest) -> bool:
+        if self._per_source[request.source_id] >= self.max_per_source:
+            return False
+        if self._per_target[request.target_id] >= self.max_per_target:
+            return False
+        budget = self._uplink_budget(request.source_id)
+        reserved = self._reserved[request.source_id]
+        # A request larger than the whole budget still runs on an idle uplink
+        if budget is not None and reserved > 0 and reserved + request.bandwidth > budget:
+            return False
+        return True
+
+    def _dispatch(self):
+        """Start every queued request that fits, in priority order."""
+        now = time.monotonic()
+        waiting = []
+        while self._queue:
+            request = heapq.heappop(self._queue)
+            if request.future.done():
+                # Cancelled by the submitter
+                continue
+            if request.start_by is not None and now > request.start_by:
+                self._expired += 1
+                request.future.set_exception(TimeoutError(
+                    f"Migration of {request.container_id} missed its start deadline"
+                ))
+                continue
+            if request.complete_by is not None and now >= request.complete_by:
+                self._expired += 1
+                request.future.set_exception(TimeoutError(
+                    f"Migration of {request.container_id} missed its completion "
+                    f"deadline while queued"
+                ))
+                continue
+            if len(self._running) < self.max_concurrent and self._admissible(request):
+                self._start(request)
+            else:
+                waiting.append(request)
+        for request in waiting:
+            heapq.heappush(self._queue, request)
+
+    def _start(self, request: MigrationRequest):
+        self._running[request.seq] = request
+        self._per_source[request.source_id] += 1
+        self._per_target[request.target_id] += 1
+        self._reserved[request.source_id] += request.bandwidth
+        self._total_wait += time.monotonic() - request.submitted
+        asyncio.ensure_future(self._run(request))
+
+    async def _run(self, request: MigrationRequest):
+        try:
+            remaining = None
+            if request.complete_by is not None:
+                # Queueing time counts against the completion deadline
+                remaining = max(request.complete_by - time.monotonic(), 0.0)
+            migration_id = await self.coordinator.start_migration(
+                request.source_id,
+                request.target_id,
+                request.container_id,
+                request.strategy,
+                request.pipelined,
+                deadline=remaining
+            )
+            if self.coordinator.migrations[migration_id].status == "failed":
+                self._failed += 1
+            else:
+                self._completed += 1
+            if not request.future.done():
+                request.future.set_result(migration_id)
+        except Exception as e:
+            self._failed += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        finally:
+            del self._running[request.seq]
+            self._per_source[request.source_id] -= 1
+            self._per_target[request.target_id] -= 1
+            self._reserved[request.source_id] -= request.bandwidth
+            self._dispatch()
+
+    def stats(self) -> Dict:
+        started = self._completed + self._failed + len(self._running)
+        return {
+            "queued": len(self._queue),
+            "running": len(self._running),
+            "completed": self._completed,
+            "failed": self._failed,
+            "expired": self._expired,
+            "mean_wait": self._total_wait / started if started else 0.0,
+            "per_source": {k: v for k, v in self._per_source.items() if v},
+            "per_target": {k: v for k, v in self._per_target.items() if v},
+            "reserved_bandwidth": {k: v for k, v in self._reserved.items() if v > 0}
+        }
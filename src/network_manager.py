@@ -1,57 +1,726 @@
 # src/network_manager.py
 import asyncio
 import aiohttp
+import hashlib
 import logging
-from typing import Dict, Optional
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .chunk_store import ChunkStore
+from .connection_pool import ConnectionPool
+from .compression import (
+    DEFAULT_LEVELS, CompressionSelector, available_codecs, compress_block, get_compressor
+)
+
+def _list_checkpoint_files(image_dir: str,
+                           rel_paths: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+    """
+    List regular files (relative path, size) under a checkpoint directory,
+    or just rel_paths. Page images are ordered last so the target can
+    start preparing the restore while they are still in flight.
+    """
+    if rel_paths is None:
+        rel_paths = []
+        for root, _, names in os.walk(image_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                if not os.path.islink(path):
+                    rel_paths.append(os.path.relpath(path, image_dir))
+
+    files = [
+        (rel_path, os.path.getsize(os.path.join(image_dir, rel_path)))
+        for rel_path in rel_paths
+    ]
+    files.sort(key=lambda item: (os.path.basename(item[0]).startswith("pages-"), item[0]))
+    return files
+
+def _list_checkpoint_symlinks(image_dir: str) -> Dict[str, str]:
+    """Symlinks under a checkpoint directory, e.g. the pre-dump 'parent' link."""
+    symlinks = {}
+    for root, dirs, names in os.walk(image_dir):
+        for name in dirs + names:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                symlinks[os.path.relpath(path, image_dir)] = os.readlink(path)
+    return symlinks
+
+def _read_chunk(f, size: int, hasher, compressor, stats: Dict) -> Tuple[bool, bytes]:
+    """Read, hash and compress the next chunk; returns (eof, wire bytes)."""
+    data = f.read(size)
+    hasher.update(data)
+    start = time.perf_counter()
+    out = compressor.compress(data) if data else compressor.flush()
+    stats["compress_time"] += time.perf_counter() - start
+    stats["raw_bytes"] += len(data)
+    stats["wire_bytes"] += len(out)
+    return not data, out
+
+def _read_store_chunk(chunk_store: ChunkStore, digest: str, codec: str, level: int, stats: Dict) -> bytes:
+    data = chunk_store.get(digest)
+    start = time.perf_counter()
+    out = compress_block(codec, level, data)
+    stats["compress_time"] += time.perf_counter() - start
+    stats["raw_bytes"] += len(data)
+    stats["wire_bytes"] += len(out)
+    return out
+
+def _new_stats() -> Dict:
+    return {"raw_bytes": 0, "wire_bytes": 0, "compress_time": 0.0}
+
+def _merge_stats(total: Dict, part: Dict) -> int:
+    """Add one stream's counters to the transfer totals; returns its wire bytes."""
+    for key, value in part.items():
+        total[key] += value
+    return part["wire_bytes"]
+
+def _split_segments(files: List[Tuple[str, int]], segment_size: int) -> List[Tuple[str, int, int, int]]:
+    """Split files into (path, offset, length, file size) segments."""
+    segments = []
+    for rel_path, size in files:
+        offset = 0
+        while True:
+            length = min(segment_size, size - offset)
+            segments.append((rel_path, offset, length, size))
+            offset += length
+            if offset >= size:
+                break
+    return segments
+
+class StreamController:
+    def __init__(self,
+                 streams: int,
+                 max_streams: int,
+                 window: float = 0.5,
+                 gain_threshold: float = 0.1):
+        """
+        Adapt the number of concurrent transfer streams.
+
+        Every window the aggregate throughput is compared with the previous
+        window: while an extra stream still raises it by more than
+        gain_threshold another is added, otherwise the last one is dropped.
+
+        Args:
+            streams: Starting number of streams
+            max_streams: Upper bound on streams
+            window: Seconds between adjustments
+            gain_threshold: Relative gain an extra stream has to bring
+        """
+        self.streams = max(1, min(streams, max_streams))
+        self.max_streams = max_streams
+        self.window = window
+        self.gain_threshold = gain_threshold
+        self.max_used = self.streams
+        self.per_stream_throughput = 0.0
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._last_aggregate: Optional[float] = None
+        self._last_change = 0
+
+    def record(self, nbytes: int) -> int:
+        """Account a finished segment; returns the stream count to use next."""
+        self._window_bytes += nbytes
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed < self.window:
+            return self.streams
+
+        aggregate = self._window_bytes / elapsed
+        self.per_stream_throughput = aggregate / self.streams
+        if (self._last_aggregate is not None and self._last_change > 0
+                and aggregate < self._last_aggregate * (1 + self.gain_threshold)):
+            # The last extra stream did not pay off
+            self.streams = max(self.streams - 1, 1)
+            self._last_change = -1
+        elif self._last_change >= 0 and self.streams < self.max_streams:
+            self.streams += 1
+            self._last_change = 1
+        else:
+            self._last_change = 0
+
+        self.max_used = max(self.max_used, self.streams)
+        self._last_aggregate = aggregate
+        self._window_start = now
+        self._window_bytes = 0
+        return self.streams
+
+@dataclass
+class CheckpointTransfer:
+    source_id: str
+    target_id: str
+    checkpoint_data: Dict
+    image_dir: str
+    image: str
+    endpoint: str
+    base_url: str
+    session: aiohttp.ClientSession
+    codec: str
+    level: int
+    controller: StreamController
+    stats: Dict = field(default_factory=_new_stats)
+    manifest: Dict[str, Dict] = field(default_factory=dict)
+    chunk_stats: Dict = field(default_factory=lambda: {"total": 0, "sent": 0})
+    start: float = field(default_factory=time.monotonic)
+    # Seconds spent sending and committing; excludes gaps between
+    # send_checkpoint_files() calls, such as waiting on a pipelined dump
+    active_time: float = 0.0
+
+def _pin_key(transfer: CheckpointTransfer) -> str:
+    """Chunk store pin held by a transfer's chunks until it is committed."""
+    return f"send/{transfer.checkpoint_data['migration_id']}/{transfer.image}"
 
 class NetworkManager:
-    def __init__(self, host: str, port: int):
+    def __init__(self, 
+                 host: str, 
+                 port: int,
+                 chunk_size: int = 1024 * 1024,
+                 max_inflight_chunks: int = 4,
+                 chunk_store: Optional[ChunkStore] = None,
+                 compression: str = "auto",
+                 compression_selector: Optional[CompressionSelector] = None,
+                 default_bandwidth: float = 12.5e6,
+                 streams: int = 1,
+                 max_streams: int = 8,
+                 segment_size: int = 32 * 1024 * 1024,
+                 pool: Optional[ConnectionPool] = None):
+        """
+        Args:
+            host: Agent host of devices without a registered endpoint
+            port: Agent port of devices without a registered endpoint
+            chunk_size: Read size for streamed image files
+            max_inflight_chunks: Chunks read ahead of the socket per file
+            chunk_store: Enables deduplicated delta transfers
+            compression: 'auto' to pick per transfer from link bandwidth and
+                idle CPU, a codec name to force one, or 'none'
+            compression_selector: Codec model used by 'auto'
+            default_bandwidth: Bytes/sec assumed before a link is measured
+            streams: Concurrent connections a transfer starts with
+            max_streams: Upper bound when adapting the stream count
+            segment_size: Large page images are split into segments of this
+                size so they can travel over several streams
+            pool: Connection pool shared by all requests
+        """
         self.host = host
         self.port = port
+        self.chunk_size = chunk_size
+        self.max_inflight_chunks = max_inflight_chunks
+        self.chunk_store = chunk_store
+        self.compression = compression
+        self.compression_selector = compression_selector or CompressionSelector()
+        self.default_bandwidth = default_bandwidth
+        self.streams = streams
+        self.max_streams = max_streams
+        self.segment_size = segment_size
+        self.link_bandwidth: Dict[str, float] = {}
+        self.link_streams: Dict[str, int] = {}
+        self._peer_codecs: Dict[str, List[str]] = {}
+        self.transfer_timeout = aiohttp.ClientTimeout(total=None, sock_read=60)
         self.logger = logging.getLogger("limoce.network")
-        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.pool = pool or ConnectionPool()
+        self.endpoints: Dict[str, str] = {}
+
+    def register_device(self, device_id: str, host: str, port: int):
+        """Record the agent endpoint requests for a device are sent to."""
+        self.endpoints[device_id] = f"{host}:{port}"
+
+    def endpoint(self, device_id: str) -> str:
+        return self.endpoints.get(device_id, f"{self.host}:{self.port}")
 
     async def create_session(self, device_id: str):
-        """Create a new HTTP session for a device."""
-        if device_id not in self.sessions:
-            self.sessions[device_id] = aiohttp.ClientSession()
+        """Open the pooled session for a device ahead of its first request."""
+        await self.pool.session(self.endpoint(device_id))
 
     async def close_session(self, device_id: str):
-        """Close an HTTP session."""
-        if device_id in self.sessions:
-            await self.sessions[device_id].close()
-            del self.sessions[device_id]
+        """Close the pooled session for a device."""
+        await self.pool.close_endpoint(self.endpoint(device_id))
+
+    async def close(self):
+        """Close every pooled session and connection."""
+        await self.pool.close()
+
+    def pool_stats(self) -> Dict:
+        return self.pool.stats()
 
     async def send_heartbeat(self, 
                            source_id: str, 
                            target_id: str, 
-                           data: Dict) -> Optional[Dict]:
+                           data: Dict,
+                           timeout: Optional[float] = None) -> Optional[Dict]:
         """Send heartbeat message to target device."""
+        endpoint = self.endpoint(target_id)
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
         try:
-            async with self.sessions[source_id].post(
-                f"http://{self.host}:{self.port}/heartbeat",
-                json={"source": source_id, "target": target_id, "data": data}
+            session = await self.pool.session(endpoint)
+            async with session.post(
+                f"http://{endpoint}/heartbeat",
+                json={"source": source_id, "target": target_id, "data": data},
+                **kwargs
             ) as response:
                 return await response.json()
         except Exception as e:
-            self.logger.error(f"Failed to send heartbeat: {e}")
+            # Routine for unreachable devices; the failure detector logs
+            # the resulting state changes
+            self.logger.debug(f"Failed to send heartbeat to {target_id}: {e}")
             return None
 
     async def transfer_checkpoint(self, 
                                 source_id: str, 
                                 target_id: str, 
                                 checkpoint_data: Dict) -> Optional[Dict]:
-        """Transfer container checkpoint to target device."""
+        """
+        Stream a container checkpoint image directory to the target device.
+
+        Files, and segment_size pieces of large page images, are posted
+        over several concurrent streams; the stream count adapts to the
+        measured throughput. Each segment is sent in chunk_size pieces with
+        at most max_inflight_chunks read ahead of the socket, so page
+        images are never loaded whole. Metadata images go first and
+        pages-*.img last. With a chunk_store, only chunks the target is
+        missing are sent. A final commit carries per-segment SHA-256
+        checksums for the target to verify.
+
+        Args:
+            checkpoint_data: migration_id, container_id and checkpoint_path
+                (the CRIU images directory to send)
+
+        Returns:
+            The target's commit response with a 'transfer' entry holding
+            bytes sent, logical_bytes, files, duration (seconds spent
+            sending), elapsed (wall time since begin_transfer) and
+            throughput (bytes/sec), or None.
+        """
+        transfer = await self.begin_transfer(source_id, target_id, checkpoint_data)
+        if transfer is None:
+            return None
+        if not await self.send_checkpoint_files(transfer):
+            return None
+        return await self.commit_transfer(transfer)
+
+    async def begin_transfer(self,
+                           source_id: str,
+                           target_id: str,
+                           checkpoint_data: Dict) -> Optional[CheckpointTransfer]:
+        """
+        Set up a checkpoint transfer whose files are sent in one or more
+        send_checkpoint_files() calls and finished by commit_transfer().
+        """
+        image_dir = checkpoint_data["checkpoint_path"]
+        endpoint = self.endpoint(target_id)
+
         try:
-            async with self.sessions[source_id].post(
-                f"http://{self.host}:{self.port}/transfer_checkpoint",
+            session = await self.pool.session(endpoint)
+            codec, level = await self._negotiate_codec(session, endpoint)
+        except Exception as e:
+            self.logger.error(f"Failed to start checkpoint transfer: {e}")
+            return None
+
+        return CheckpointTransfer(
+            source_id=source_id,
+            target_id=target_id,
+            checkpoint_data=checkpoint_data,
+            image_dir=image_dir,
+            image=os.path.basename(image_dir.rstrip(os.sep)),
+            endpoint=endpoint,
+            base_url=(
+                f"http://{endpoint}/transfer_checkpoint/"
+                f"{checkpoint_data['migration_id']}"
+            ),
+            session=session,
+            codec=codec,
+            level=level,
+            controller=StreamController(
+                self.link_streams.get(endpoint, self.streams), self.max_streams
+            )
+        )
+
+    async def send_checkpoint_files(self,
+                                  transfer: CheckpointTransfer,
+                                  rel_paths: Optional[List[str]] = None,
+                                  final: bool = True) -> bool:
+        """
+        Send image files of a transfer; all of them when rel_paths is None.
+        Files sent again (e.g. rewritten after being reported closed)
+        replace the earlier copy.
+
+        Args:
+            rel_paths: Files to send, relative to the images directory
+            final: No files other than these remain to be sent
+        """
+        start = time.monotonic()
+        try:
+            files = await asyncio.get_event_loop().run_in_executor(
+                None, _list_checkpoint_files, transfer.image_dir, rel_paths
+            )
+            if self.chunk_store is not None:
+                await self._send_chunks(transfer, files)
+            else:
+                await self._send_files(transfer, files, final)
+            self.link_streams[transfer.endpoint] = transfer.controller.streams
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to transfer checkpoint files: {e}")
+            # No commit follows a failed send
+            self._unpin_chunks(transfer)
+            return False
+        finally:
+            transfer.active_time += time.monotonic() - start
+
+    async def commit_transfer(self, transfer: CheckpointTransfer) -> Optional[Dict]:
+        """Have the target verify everything sent; returns its response and stats."""
+        migration_id = transfer.checkpoint_data["migration_id"]
+        start = time.monotonic()
+        try:
+            symlinks = await asyncio.get_event_loop().run_in_executor(
+                None, _list_checkpoint_symlinks, transfer.image_dir
+            )
+            for entry in transfer.manifest.values():
+                if "segments" in entry:
+                    entry["segments"].sort()
+
+            async with transfer.session.post(
+                f"{transfer.base_url}/commit",
                 json={
-                    "source": source_id, 
-                    "target": target_id, 
-                    "checkpoint": checkpoint_data
+                    "source": transfer.source_id,
+                    "target": transfer.target_id,
+                    "checkpoint": transfer.checkpoint_data,
+                    "files": transfer.manifest,
+                    "symlinks": symlinks
                 }
             ) as response:
-                return await response.json()
+                response.raise_for_status()
+                result = await response.json()
         except Exception as e:
             self.logger.error(f"Failed to transfer checkpoint: {e}")
-            return None
\ No newline at end of file
+            return None
+        finally:
+            self._unpin_chunks(transfer)
+
+        stats = transfer.stats
+        controller = transfer.controller
+        transfer.active_time += time.monotonic() - start
+        # Only time spent sending: a pipelined transfer also spans the dump
+        duration = transfer.active_time
+        sent_bytes = stats["wire_bytes"]
+        self._record_transfer(
+            transfer.endpoint, transfer.codec, transfer.level, stats, duration,
+            controller.max_used
+        )
+        result["transfer"] = {
+            "bytes": sent_bytes,
+            "logical_bytes": sum(entry["size"] for entry in transfer.manifest.values()),
+            "files": len(transfer.manifest),
+            "duration": duration,
+            "elapsed": time.monotonic() - transfer.start,
+            "throughput": sent_bytes / duration if duration > 0 else 0.0,
+            "compression": {
+                "codec": transfer.codec,
+                "level": transfer.level,
+                "ratio": (sent_bytes / stats["raw_bytes"]
+                          if stats["raw_bytes"] else 1.0),
+                "compress_time": stats["compress_time"]
+            },
+            "streams": {
+                "final": controller.streams,
+                "max_used": controller.max_used,
+                "per_stream_throughput": controller.per_stream_throughput
+            }
+        }
+        if self.chunk_store is not None:
+            result["transfer"]["chunks"] = transfer.chunk_stats
+        self.logger.info(
+            f"Transferred {sent_bytes} bytes of {migration_id} in "
+            f"{duration:.2f}s ({result['transfer']['throughput'] / 1e6:.1f} MB/s)"
+        )
+        return result
+
+    async def _negotiate_codec(self,
+                             session: aiohttp.ClientSession,
+                             endpoint: str) -> Tuple[str, int]:
+        """Pick a codec both ends support; 'auto' also weighs link and CPU."""
+        if self.compression == "none":
+            return "none", 0
+
+        if endpoint not in self._peer_codecs:
+            try:
+                async with session.get(f"http://{endpoint}/capabilities") as response:
+                    response.raise_for_status()
+                    self._peer_codecs[endpoint] = (await response.json())["codecs"]
+            except Exception as e:
+                self.logger.warning(f"Codec negotiation with {endpoint} failed: {e}")
+                return "none", 0
+
+        codecs = [c for c in available_codecs() if c in self._peer_codecs[endpoint]]
+        if self.compression != "auto":
+            if self.compression not in codecs:
+                self.logger.warning(f"{self.compression} not supported by {endpoint}")
+                return "none", 0
+            return self.compression, DEFAULT_LEVELS[self.compression]
+
+        bandwidth = self.link_bandwidth.get(endpoint, self.default_bandwidth)
+        streams = self.link_streams.get(endpoint, self.streams)
+        return await asyncio.get_event_loop().run_in_executor(
+            None, self.compression_selector.select, bandwidth, codecs, None, streams
+        )
+
+    def _record_transfer(self,
+                         endpoint: str,
+                         codec: str,
+                         level: int,
+                         stats: Dict,
+                         duration: float,
+                         streams: int = 1):
+        """Update link bandwidth and codec models from a finished transfer."""
+        self.compression_selector.observe(
+            codec, level, stats["raw_bytes"], stats["wire_bytes"], stats["compress_time"]
+        )
+        # Tiny or compressor-bound transfers say little about the link
+        if (duration > 0 and stats["wire_bytes"] >= 1024 * 1024
+                and stats["compress_time"] / streams < 0.8 * duration):
+            measured = stats["wire_bytes"] / duration
+            previous = self.link_bandwidth.get(endpoint)
+            self.link_bandwidth[endpoint] = (
+                measured if previous is None else 0.7 * previous + 0.3 * measured
+            )
+
+    async def _run_streams(self, items: List, send, controller: StreamController):
+        """
+        Run send(item) -> bytes for every item, at most controller.streams
+        at a time, feeding each result back into the controller.
+        """
+        pending = list(reversed(items))
+        active = set()
+        try:
+            while pending or active:
+                while pending and len(active) < controller.streams:
+                    active.add(asyncio.ensure_future(send(pending.pop())))
+                done, active = await asyncio.wait(
+                    active, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    controller.record(task.result())
+        finally:
+            for task in active:
+                task.cancel()
+
+    async def _send_files(self,
+                        transfer: CheckpointTransfer,
+                        files: List[Tuple[str, int]],
+                        final: bool = True):
+        """Stream image files in segments, recording them in the manifest."""
+        for rel_path, size in files:
+            transfer.manifest[rel_path] = {"size": size, "segments": []}
+
+        async def send(segment) -> int:
+            rel_path, offset, length, size = segment
+            hasher = hashlib.sha256()
+            segment_stats = _new_stats()
+            headers = {
+                "X-Limoce-Image": transfer.image,
+                "X-Limoce-Path": rel_path,
+                "X-Limoce-Size": str(size),
+                "X-Limoce-Offset": str(offset),
+                "X-Limoce-Length": str(length),
+                "X-Limoce-Codec": transfer.codec
+            }
+            if metadata_sent:
+                headers["X-Limoce-Metadata-Complete"] = "1"
+            async with transfer.session.post(
+                f"{transfer.base_url}/file",
+                data=self._read_chunks(
+                    os.path.join(transfer.image_dir, rel_path),
+                    hasher,
+                    get_compressor(transfer.codec, transfer.level),
+                    segment_stats,
+                    offset,
+                    length
+                ),
+                headers=headers,
+                timeout=self.transfer_timeout
+            ) as response:
+                response.raise_for_status()
+            transfer.manifest[rel_path]["segments"].append(
+                [offset, length, hasher.hexdigest()]
+            )
+            return _merge_stats(transfer.stats, segment_stats)
+
+        # Metadata first; on the final batch page segments then tell the
+        # target it can check the images while pages are still arriving
+        metadata = [f for f in files if not os.path.basename(f[0]).startswith("pages-")]
+        pages = [f for f in files if os.path.basename(f[0]).startswith("pages-")]
+        metadata_sent = False
+        await self._run_streams(
+            _split_segments(metadata, self.segment_size), send, transfer.controller
+        )
+        metadata_sent = final
+        await self._run_streams(
+            _split_segments(pages, self.segment_size), send, transfer.controller
+        )
+
+    async def _send_chunks(self,
+                         transfer: CheckpointTransfer,
+                         files: List[Tuple[str, int]]):
+        """
+        Delta transfer through the chunk store: exchange chunk manifests
+        and only send the chunks the target does not already hold, in
+        batches spread over concurrent streams.
+        """
+        loop = asyncio.get_event_loop()
+        sizes = {}
+        pin = _pin_key(transfer)
+        for rel_path, _ in files:
+            # Pinned so eviction cannot drop them before they are read
+            # for sending; released once the transfer is committed
+            entry = await loop.run_in_executor(
+                None,
+                lambda: self.chunk_store.add_file(
+                    os.path.join(transfer.image_dir, rel_path), pin=pin
+                )
+            )
+            transfer.manifest[rel_path] = entry
+            for digest, length in entry["chunks"]:
+                sizes[digest] = length
+
+        async with transfer.session.post(
+            f"{transfer.base_url}/chunks/missing",
+            json={"image": transfer.image, "chunks": list(sizes)}
+        ) as response:
+            response.raise_for_status()
+            missing = (await response.json())["missing"]
+
+        async def send(batch: List[str]) -> int:
+            batch_stats = _new_stats()
+            async with transfer.session.post(
+                f"{transfer.base_url}/chunks",
+                data=self._read_store_chunks(
+                    batch, transfer.codec, transfer.level, batch_stats
+                ),
+                headers={"X-Limoce-Image": transfer.image, "X-Limoce-Codec": transfer.codec},
+                timeout=self.transfer_timeout
+            ) as response:
+                response.raise_for_status()
+            return _merge_stats(transfer.stats, batch_stats)
+
+        batches = []
+        batch, batch_bytes = [], 0
+        for digest in missing:
+            batch.append(digest)
+            batch_bytes += sizes[digest]
+            if batch_bytes >= self.segment_size:
+                batches.append(batch)
+                batch, batch_bytes = [], 0
+        if batch:
+            batches.append(batch)
+        await self._run_streams(batches, send, transfer.controller)
+
+        transfer.chunk_stats["total"] += len(sizes)
+        transfer.chunk_stats["sent"] += len(missing)
+
+    def _unpin_chunks(self, transfer: CheckpointTransfer):
+        if self.chunk_store is not None:
+            self.chunk_store.unpin(_pin_key(transfer))
+
+    async def _read_store_chunks(self,
+                               digests: List[str],
+                               codec: str,
+                               level: int,
+                               stats: Dict):
+        """
+        Yield framed chunks from the chunk store: 64-byte hex digest,
+        8-byte length, then the chunk compressed on its own.
+        """
+        loop = asyncio.get_event_loop()
+        for digest in digests:
+            data = await loop.run_in_executor(
+                None, _read_store_chunk, self.chunk_store, digest, codec, level, stats
+            )
+            yield digest.encode() + len(data).to_bytes(8, 'big') + data
+
+    async def _read_chunks(self,
+                         path: str,
+                         hasher,
+                         compressor,
+                         stats: Dict,
+                         offset: int = 0,
+                         length: Optional[int] = None):
+        """
+        Yield a file (or length bytes of it from offset) in compressed
+        chunks, reading ahead in a worker thread.
+
+        The bounded queue is the backpressure: the reader stalls once
+        max_inflight_chunks are waiting for the socket to drain.
+        """
+        loop = asyncio.get_event_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_inflight_chunks)
+
+        async def reader():
+            try:
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    remaining = length
+                    while True:
+                        size = self.chunk_size if remaining is None else min(self.chunk_size, remaining)
+                        eof, chunk = await loop.run_in_executor(
+                            None, _read_chunk, f, size, hasher, compressor, stats
+                        )
+                        if remaining is not None:
+                            remaining -= size
+                        if chunk:
+                            await queue.put(chunk)
+                        if eof:
+                            break
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
+
+        reader_task = asyncio.ensure_future(reader())
+        try:
+            while True:
+                chunk = await queue.get()
+                if isinstance(chunk, Exception):
+                    raise chunk
+                if chunk is None:
+                    break
+                yield chunk
+        finally:
+            reader_task.cancel()
+
+    async def open_page_server_channel(self,
+                                     source_id: str,
+                                     target_id: str,
+                                     channel: Dict) -> Optional[Dict]:
+        """
+        Tell the target device where to pull lazily migrated memory pages.
+
+        Args:
+            channel: migration_id plus the address/port of the source page server
+        """
+        endpoint = self.endpoint(target_id)
+        try:
+            session = await self.pool.session(endpoint)
+            async with session.post(
+                f"http://{endpoint}/page_server",
+                json={"source": source_id, "target": target_id, "channel": channel}
+            ) as response:
+                return await response.json()
+        except Exception as e:
+            self.logger.error(f"Failed to open page server channel: {e}")
+            return None
+
+    async def close_page_server_channel(self,
+                                      source_id: str,
+                                      target_id: str,
+                                      migration_id: str) -> Optional[Dict]:
+        """Tell the target device that all lazy pages have been served."""
+        endpoint = self.endpoint(target_id)
+        try:
+            session = await self.pool.session(endpoint)
+            async with session.post(
+                f"http://{endpoint}/page_server/close",
+                json={"source": source_id, "target": target_id, "migration_id": migration_id}
+            ) as response:
+                return await response.json()
+        except Exception as e:
+            self.logger.error(f"Failed to close page server channel: {e}")
+            return None
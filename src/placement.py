@@ -0,0 +1,268 @@
+# src/placement.py
+import bisect
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+@dataclass
+class NodeState:
+    device_id: str
+    # Free resources as last reported by the node
+    cpu_free: float = 0.0
+    memory_free: float = 0.0
+    # Link from this node to it, bytes/sec and seconds
+    bandwidth: float = 0.0
+    latency: float = 0.0
+    available: bool = True
+    # Claimed by migrations placed there but not finished yet
+    reserved_cpu: float = 0.0
+    reserved_memory: float = 0.0
+
+    def fits(self, cpu: float, memory: float) -> bool:
+        return (self.cpu_free - self.reserved_cpu >= cpu
+                and self.memory_free - self.reserved_memory >= memory)
+
+@dataclass
+class PlacementDecision:
+    target_id: str
+    # Predicted seconds to move the image there
+    predicted_time: float
+    # Image bytes that still have to be sent
+    transfer_bytes: float
+    cached_bytes: float = 0.0
+    # Nodes evaluated to reach the decision
+    evaluated: int = 0
+
+class _SortedIndex:
+    """Device ids ordered by a key, updated in O(log n) searches."""
+
+    def __init__(self):
+        self._entries: List[Tuple[Any, str]] = []
+        self._keys: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __getitem__(self, i: int) -> Tuple[Any, str]:
+        return self._entries[i]
+
+    def set(self, device_id: str, key: Any):
+        old = self._keys.get(device_id)
+        if old == key:
+            return
+        if old is not None:
+            self.discard(device_id)
+        self._keys[device_id] = key
+        bisect.insort(self._entries, (key, device_id))
+
+    def discard(self, device_id: str):
+        key = self._keys.pop(device_id, None)
+        if key is None:
+            return
+        i = bisect.bisect_left(self._entries, (key, device_id))
+        del self._entries[i]
+
+    def first(self) -> Optional[Any]:
+        return self._entries[0][0] if self._entries else None
+
+    def position(self, key: Any) -> int:
+        """Index of the first entry whose key is not below key."""
+        return bisect.bisect_left(self._entries, (key,))
+
+class PlacementEngine:
+    def __init__(self,
+                 default_bandwidth: float = 12.5e6,
+                 memory_headroom: float = 0.1):
+        """
+        Indexed view of candidate target nodes for picking where a container
+        migrates to.
+
+        Nodes are kept ordered by link bandwidth and, among equal
+        bandwidths, by latency, and nodes holding chunks of a container's
+        earlier checkpoints are indexed by container. A query evaluates
+        those, then walks the fastest links, leaving a bandwidth group as
+        soon as its remaining nodes are too far away and stopping once no
+        remaining node could beat the best one found.
+
+        Args:
+            default_bandwidth: Bytes/sec assumed for links never measured
+            memory_headroom: Share of a container's memory kept free on
+                the target on top of the container itself
+        """
+        self.default_bandwidth = default_bandwidth
+        self.memory_headroom = memory_headroom
+        self.logger = logging.getLogger("limoce.placement")
+
+        self.nodes: Dict[str, NodeState] = {}
+        # Fastest link first, then nearest (keys are (-bandwidth, latency))
+        self._by_bandwidth = _SortedIndex()
+        self._by_latency = _SortedIndex()
+        # container id -> device id -> image bytes cached there
+        self._cached: Dict[str, Dict[str, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def update_node(self,
+                    device_id: str,
+                    cpu_free: Optional[float] = None,
+                    memory_free: Optional[float] = None,
+                    bandwidth: Optional[float] = None,
+                    latency: Optional[float] = None,
+                    available: Optional[bool] = None):
+        """Add a node or update the figures given; the rest keep their values."""
+        node = self.nodes.get(device_id)
+        if node is None:
+            node = self.nodes[device_id] = NodeState(
+                device_id, bandwidth=self.default_bandwidth
+            )
+        if cpu_free is not None:
+            node.cpu_free = cpu_free
+        if memory_free is not None:
+            node.memory_free = memory_free
+        if bandwidth is not None and bandwidth > 0:
+            node.bandwidth = bandwidth
+        if latency is not None:
+            node.latency = latency
+        if available is not None:
+            node.available = available
+
+        if node.available:
+            self._by_bandwidth.set(device_id, (-node.bandwidth, node.latency))
+            self._by_latency.set(device_id, node.latency)
+        else:
+            self._by_bandwidth.discard(device_id)
+            self._by_latency.discard(device_id)
+
+    def remove_node(self, device_id: str):
+        self.nodes.pop(device_id, None)
+        self._by_bandwidth.discard(device_id)
+        self._by_latency.discard(device_id)
+        for cached in self._cached.values():
+            cached.pop(device_id, None)
+
+    def observe_heartbeat(self, device_id: str, reply: Dict, rtt: float):
+        """
+        HeartbeatScheduler listener: the reply carries the node's free
+        resources, the round trip its latency.
+        """
+        resources = reply.get("resources") or {}
+        self.update_node(
+            device_id,
+            cpu_free=resources.get("cpu_free"),
+            memory_free=resources.get("memory_free"),
+            latency=rtt / 2,
+            available=True
+        )
+
+    def observe_failure(self, device_id: str, phi: float, suspected: bool):
+        """PhiAccrualDetector listener: suspected nodes are not placed on."""
+        if device_id in self.nodes:
+            self.update_node(device_id, available=not suspected)
+
+    def sync_links(self, network_manager, device_ids: Optional[Iterable[str]] = None):
+        """Take measured link bandwidths from a NetworkManager."""
+        for device_id in (device_ids if device_ids is not None else list(self.nodes)):
+            bandwidth = network_manager.link_bandwidth.get(network_manager.endpoint(device_id))
+            if bandwidth is not None:
+                self.update_node(device_id, bandwidth=bandwidth)
+
+    def record_cached(self, device_id: str, container_id: str, cached_bytes: float):
+        """Note that a node holds cached_bytes of a container's image chunks."""
+        if cached_bytes > 0:
+            self._cached.setdefault(container_id, {})[device_id] = cached_bytes
+        else:
+            self.forget_cached(device_id, container_id)
+
+    def forget_cached(self, device_id: str, container_id: str):
+        cached = self._cached.get(container_id)
+        if cached is not None:
+            cached.pop(device_id, None)
+            if not cached:
+                del self._cached[container_id]
+
+    def reserve(self, device_id: str, cpu: float, memory: float):
+        node = self.nodes.get(device_id)
+        if node is not None:
+            node.reserved_cpu += cpu
+            node.reserved_memory += memory
+
+    def release(self, device_id: str, cpu: float, memory: float):
+        node = self.nodes.get(device_id)
+        if node is not None:
+            node.reserved_cpu = max(node.reserved_cpu - cpu, 0.0)
+            node.reserved_memory = max(node.reserved_memory - memory, 0.0)
+
+    def select(self,
+               container_id: str,
+               image_bytes: float,
+               memory: float = 0.0,
+               cpu: float = 0.0,
+               exclude: Iterable[str] = ()) -> Optional[PlacementDecision]:
+        """
+        Target with the shortest predicted transfer (latency plus the bytes
+        it does not cache over its link) among available nodes with room for
+        the container; None if none has.
+
+        Args:
+            container_id: Container to place
+            image_bytes: Expected checkpoint size
+            memory: Memory the container needs, bytes
+            cpu: CPU the container needs, in the units nodes report
+            exclude: Nodes not to consider, such as the source
+        """
+        excluded: Set[str] = set(exclude)
+        memory_needed = memory * (1.0 + self.memory_headroom)
+        best: Optional[PlacementDecision] = None
+        best_time = math.inf
+        evaluated = 0
+        cached = self._cached.get(container_id, {})
+
+        def consider(device_id: str):
+            nonlocal best, best_time, evaluated
+            node = self.nodes[device_id]
+            if device_id in excluded or not node.available or not node.fits(cpu, memory_needed):
+                return
+            evaluated += 1
+            cached_bytes = min(cached.get(device_id, 0.0), image_bytes)
+            transfer_bytes = image_bytes - cached_bytes
+            predicted = node.latency + transfer_bytes / node.bandwidth
+            if predicted < best_time:
+                best_time = predicted
+                best = PlacementDecision(device_id, predicted, transfer_bytes, cached_bytes)
+
+        for device_id in cached:
+            if device_id in self.nodes:
+                consider(device_id)
+
+        min_latency = self._by_latency.first() or 0.0
+        i = 0
+        while i < len(self._by_bandwidth):
+            (neg_bandwidth, latency), device_id = self._by_bandwidth[i]
+            # Nodes further down have slower links, and these carry the
+            # whole image
+            transfer_time = image_bytes / -neg_bandwidth
+            if min_latency + transfer_time >= best_time:
+                break
+            if latency + transfer_time >= best_time:
+                # The rest of this bandwidth group is further away still
+                i = self._by_bandwidth.position((neg_bandwidth, math.inf))
+                continue
+            if device_id not in cached:
+                consider(device_id)
+            i += 1
+
+        if best is not None:
+            best.evaluated = evaluated
+        return best
+
+    def stats(self) -> Dict:
+        return {
+            "nodes": len(self.nodes),
+            "available": len(self._by_bandwidth),
+            "containers_cached": len(self._cached)
+        }
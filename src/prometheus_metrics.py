@@ -0,0 +1,227 @@
+# src/prometheus_metrics.py
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+PHASES = ("checkpoint", "transfer", "restore", "verify")
+
+DURATION_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+# 1 MiB to 16 GiB in factors of 4
+BYTES_BUCKETS = tuple(float(4 ** i * 1024 * 1024) for i in range(8))
+
+# (metric name, help, stats field) of the per-container gauges
+_CONTAINER_GAUGES = (
+    ("container_cpu_percent", "Container CPU usage percentage", "cpu_percent"),
+    ("container_memory_usage_bytes", "Container memory usage in bytes", "memory_usage"),
+    ("container_memory_percent", "Container memory usage percentage of its limit", "memory_percent"),
+    ("container_network_rx_bytes", "Container bytes received", "network_rx_bytes"),
+    ("container_network_tx_bytes", "Container bytes sent", "network_tx_bytes"),
+)
+
+class MigrationMetrics:
+    def __init__(self,
+                 registry: Optional[CollectorRegistry] = None,
+                 max_containers: int = 500,
+                 duration_buckets: Sequence[float] = DURATION_BUCKETS,
+                 bytes_buckets: Sequence[float] = BYTES_BUCKETS,
+                 expose_default: bool = True):
+        """
+        Labelled container and migration metrics.
+
+        container_migration_duration_seconds stays a gauge holding the last
+        migration's duration, as before; the distribution is the
+        container_migration_total_duration_seconds histogram. The container
+        gauges and container_migrations_total now carry labels, so
+        dashboards reading them as a single series should sum() them.
+
+        Args:
+            registry: Registry to register with; a private one by default so
+                several instances can coexist
+            max_containers: Containers with live series; the least recently
+                updated ones are dropped beyond this
+            expose_default: Also make a private registry visible on
+                prometheus_client's default registry, so an existing
+                start_http_server(port) keeps serving these metrics. Only
+                one instance can do so; later ones stay private.
+        """
+        self.registry = registry if registry is not None else CollectorRegistry()
+        self.max_containers = max_containers
+        self.logger = logging.getLogger("limoce.metrics")
+
+        self._container_gauges = [
+            (Gauge(name, doc, ["container"], registry=self.registry), field)
+            for name, doc, field in _CONTAINER_GAUGES
+        ]
+        self.migration_phase_duration = Histogram(
+            'container_migration_phase_duration_seconds',
+            'Duration of each migration phase',
+            ["phase", "strategy"],
+            buckets=duration_buckets,
+            registry=self.registry
+        )
+        self.migration_duration = Histogram(
+            'container_migration_total_duration_seconds',
+            'End-to-end container migration duration',
+            ["strategy"],
+            buckets=duration_buckets,
+            registry=self.registry
+        )
+        self.last_migration_duration = Gauge(
+            'container_migration_duration_seconds',
+            'Duration of the most recent container migration',
+            registry=self.registry
+        )
+        self.migration_downtime = Histogram(
+            'container_migration_downtime_seconds',
+            'Time the container was frozen during migration',
+            ["strategy"],
+            buckets=duration_buckets,
+            registry=self.registry
+        )
+        self.migration_bytes = Histogram(
+            'container_migration_transferred_bytes',
+            'Bytes sent over the network per migration',
+            ["strategy"],
+            buckets=bytes_buckets,
+            registry=self.registry
+        )
+        self.migration_counter = Counter(
+            'container_migrations_total',
+            'Total number of container migrations',
+            ["strategy", "status"],
+            registry=self.registry
+        )
+
+        self._lock = threading.Lock()
+        self._containers: "OrderedDict[str, None]" = OrderedDict()
+        self._sampler: Optional[threading.Thread] = None
+        self._sampler_stop = threading.Event()
+
+        self._exposed = False
+        if registry is None and expose_default:
+            self._exposed = self._expose_default()
+
+    def _expose_default(self) -> bool:
+        """Register the private registry as a collector on the default one."""
+        try:
+            REGISTRY.register(self.registry)
+        except ValueError:
+            # Another instance already serves these names
+            self.logger.debug("Metrics already exposed on the default registry")
+            return False
+        return True
+
+    def close(self):
+        """Stop sampling and detach from the default registry."""
+        self.stop_sampler()
+        if self._exposed:
+            REGISTRY.unregister(self.registry)
+            self._exposed = False
+
+    @staticmethod
+    def _label(container_id: str) -> str:
+        return container_id[:12]
+
+    def observe_container(self, container_id: str, stats: Dict):
+        """Set a container's resource gauges from a stats dict."""
+        if not stats:
+            return
+        label = self._label(container_id)
+        with self._lock:
+            self._containers[label] = None
+            self._containers.move_to_end(label)
+            while len(self._containers) > self.max_containers:
+                evicted, _ = self._containers.popitem(last=False)
+                self._remove_series(evicted)
+        for gauge, field in self._container_gauges:
+            gauge.labels(container=label).set(stats.get(field, 0))
+
+    def update_containers(self, snapshot):
+        """
+        Set gauges for every container of a StatsSnapshot and drop the
+        series of containers no longer in it.
+        """
+        for container_id in snapshot.container_ids:
+            self.observe_container(container_id, snapshot.get(container_id))
+        present = {self._label(container_id) for container_id in snapshot.container_ids}
+        with self._lock:
+            gone = [label for label in self._containers if label not in present]
+            for label in gone:
+                del self._containers[label]
+                self._remove_series(label)
+
+    def remove_container(self, container_id: str):
+        label = self._label(container_id)
+        with self._lock:
+            if label in self._containers:
+                del self._containers[label]
+                self._remove_series(label)
+
+    def _remove_series(self, label: str):
+        for gauge, _ in self._container_gauges:
+            try:
+                gauge.remove(label)
+            except KeyError:
+                pass
+
+    def observe_migration(self, migration, timing: Optional[Dict] = None):
+        """
+        Record a finished migration.
+
+        Args:
+            migration: MigrationState
+            timing: MigrationCoordinator.timing_breakdown() of it
+        """
+        strategy = migration.strategy
+        self.migration_counter.labels(strategy=strategy, status=migration.status).inc()
+        if migration.end_time is not None:
+            duration = (migration.end_time - migration.start_time).total_seconds()
+            self.migration_duration.labels(strategy=strategy).observe(duration)
+            self.last_migration_duration.set(duration)
+        if migration.status != "completed":
+            return
+
+        for phase, entry in (timing or {}).get("phases", {}).items():
+            if phase in PHASES:
+                self.migration_phase_duration.labels(
+                    phase=phase, strategy=strategy
+                ).observe(entry["duration"])
+        if migration.downtime is not None:
+            self.migration_downtime.labels(strategy=strategy).observe(migration.downtime)
+        self.migration_bytes.labels(strategy=strategy).observe(migration.bytes_transferred)
+
+    def start_sampler(self, container_manager, interval: float = 15.0):
+        """
+        Refresh container gauges every interval (metrics_config['interval'])
+        from one collect_managed_stats() sweep, in a background thread.
+        """
+        if self._sampler is not None:
+            return
+        self._sampler_stop.clear()
+
+        def sample():
+            while not self._sampler_stop.is_set():
+                try:
+                    self.update_containers(container_manager.collect_managed_stats())
+                except Exception as e:
+                    self.logger.error(f"Metrics sampling failed: {e}")
+                self._sampler_stop.wait(interval)
+
+        self._sampler = threading.Thread(target=sample, name="metrics-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop_sampler(self):
+        if self._sampler is not None:
+            self._sampler_stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+    def serve(self, port: int):
+        """
+        Expose these metrics over HTTP (metrics_config['prometheus_port']).
+        When they are on the default registry, this is the same endpoint a
+        plain start_http_server(port) would start.
+        """
+        start_http_server(port, registry=REGISTRY if self._exposed else self.registry)
@@ -0,0 +1,88 @@
+# src/readiness.py
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import aiohttp
+
+PROBE_TCP = "tcp"
+PROBE_HTTP = "http"
+
+@dataclass
+class ReadinessConfig:
+    # 'tcp' (connect succeeds) or 'http' (status below 400); None only
+    # waits for the container to be running
+    probe: Optional[str] = None
+    port: Optional[int] = None
+    # Defaults to the restored container's IP address
+    host: Optional[str] = None
+    path: str = "/"
+    # Retry schedule: first delay, growth factor and cap, in seconds
+    initial_delay: float = 0.005
+    backoff: float = 1.5
+    max_delay: float = 0.1
+    # Per-attempt and overall limits
+    attempt_timeout: float = 1.0
+    timeout: float = 30.0
+
+async def _probe_tcp(host: str, port: int, timeout: float) -> bool:
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    return True
+
+async def _probe_http(session: aiohttp.ClientSession, url: str, timeout: float) -> bool:
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return response.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+        return False
+
+async def wait_until_ready(config: ReadinessConfig, host: str) -> Tuple[Optional[float], int]:
+    """
+    Probe a service with backoff until it answers.
+
+    Returns:
+        (monotonic time of the first successful probe or None on timeout,
+        number of attempts)
+    """
+    logger = logging.getLogger("limoce.readiness")
+    if config.probe not in (PROBE_TCP, PROBE_HTTP):
+        raise ValueError(f"Unknown readiness probe: {config.probe}")
+    if config.port is None:
+        raise ValueError("Readiness probe needs a port")
+
+    deadline = time.monotonic() + config.timeout
+    delay = config.initial_delay
+    attempts = 0
+    session = None
+    if config.probe == PROBE_HTTP:
+        # No keep-alive: a pooled connection could outlive the old instance
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(force_close=True))
+    url = f"http://{host}:{config.port}{config.path}"
+
+    try:
+        while True:
+            attempts += 1
+            attempt_timeout = min(config.attempt_timeout, max(deadline - time.monotonic(), 0.001))
+            if session is not None:
+                ready = await _probe_http(session, url, attempt_timeout)
+            else:
+                ready = await _probe_tcp(host, config.port, attempt_timeout)
+            if ready:
+                return time.monotonic(), attempts
+
+            if time.monotonic() + delay >= deadline:
+                logger.warning(
+                    f"{config.probe} probe of {host}:{config.port} not ready "
+                    f"after {attempts} attempts"
+                )
+                return None, attempts
+            await asyncio.sleep(delay)
+            delay = min(delay * config.backoff, config.max_delay)
+    finally:
+        if session is not None:
+            await session.close()
@@ -1,5 +1,6 @@
 # src/utils/__init__.py
 from .logging_config import setup_logging
 from .env_loader import EnvironmentLoader
+from .ring_buffer import RingBuffer
 
-__all__ = ['setup_logging', 'EnvironmentLoader']
\ No newline at end of file
+__all__ = ['setup_logging', 'EnvironmentLoader', 'RingBuffer']
\ No newline at end of file
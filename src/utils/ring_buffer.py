@@ -0,0 +1,71 @@
+# src/utils/ring_buffer.py
+import math
+from array import array
+from typing import List
+
+class RingBuffer:
+    def __init__(self, capacity: int):
+        """
+        Fixed-size window of floats kept in a flat array, with running
+        sums so mean and variance are O(1).
+
+        Args:
+            capacity: Samples kept; the oldest is overwritten when full
+        """
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+        self._start = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float):
+        if self._count < self.capacity:
+            index = (self._start + self._count) % self.capacity
+            self._count += 1
+        else:
+            index = self._start
+            old = self._data[index]
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._start = (self._start + 1) % self.capacity
+        self._data[index] = value
+        self._sum += value
+        self._sum_sq += value * value
+
+    def clear(self):
+        self._start = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+    def values(self) -> List[float]:
+        """Samples, oldest first."""
+        end = self._start + self._count
+        if end <= self.capacity:
+            return self._data[self._start:end].tolist()
+        return (self._data[self._start:].tolist()
+                + self._data[:end - self.capacity].tolist())
+
+    def last(self) -> float:
+        if not self._count:
+            raise IndexError("Ring buffer is empty")
+        return self._data[(self._start + self._count - 1) % self.capacity]
+
+    def mean(self) -> float:
+        return self._sum / self._count if self._count else 0.0
+
+    def variance(self) -> float:
+        if not self._count:
+            return 0.0
+        mean = self._sum / self._count
+        # Running sums can drift slightly below zero
+        return max(self._sum_sq / self._count - mean * mean, 0.0)
+
+    def std(self) -> float:
+        return math.sqrt(self.variance())
@@ -0,0 +1,108 @@
+# tests/test_cgroup_collector.py
+import pytest
+from src.cgroup_collector import CgroupCollector
+
+MB = 1024 * 1024
+CONTAINER = "ab" * 32
+NET_DEV = (
+    "Inter-|   Receive                            |  Transmit\n"
+    " face |bytes    packets errs drop fifo frame compressed multicast|"
+    "bytes    packets errs drop fifo colls carrier compressed\n"
+    "    lo:    9999      10    0    0    0     0          0         0"
+    "     9999      10    0    0    0     0       0          0\n"
+    "  eth0:    1000      10    0    0    0     0          0         0"
+    "      200       2    0    0    0     0       0          0\n"
+    "  eth1:      24       1    0    0    0     0          0         0"
+    "        6       1    0    0    0     0       0          0\n"
+)
+
+def _write(path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def _proc(tmp_path, pid: int = 4242):
+    proc = tmp_path / "proc"
+    _write(proc / "meminfo", "MemTotal:        8388608 kB\nMemFree:  1 kB\n")
+    _write(proc / str(pid) / "net" / "dev", NET_DEV)
+    return proc
+
+def test_v2_systemd_layout(tmp_path):
+    root = tmp_path / "cgroup"
+    _write(root / "cgroup.controllers", "cpu memory\n")
+    scope = root / "system.slice" / f"docker-{CONTAINER}.scope"
+    _write(scope / "cpu.stat", "usage_usec 1000000\nuser_usec 1\nsystem_usec 1\n")
+    _write(scope / "memory.current", f"{256 * MB}\n")
+    _write(scope / "memory.max", f"{1024 * MB}\n")
+    _write(scope / "cgroup.procs", "4242\n4243\n")
+    collector = CgroupCollector(str(root), proc_root=str(_proc(tmp_path)), cpu_count=2)
+    assert collector.version == 2
+
+    first = collector.collect([CONTAINER, "missing"], now=100.0)
+    assert first.container_ids == [CONTAINER]
+    stats = first.get(CONTAINER)
+    assert stats["cpu_percent"] == 0.0
+    assert stats["memory_usage"] == 256 * MB
+    assert stats["memory_percent"] == pytest.approx(25.0)
+    # Loopback is left out
+    assert stats["network_rx_bytes"] == 1024
+    assert stats["network_tx_bytes"] == 206
+    assert collector.pids(CONTAINER) == [4242, 4243]
+
+    # One CPU-second over two seconds on two CPUs
+    _write(scope / "cpu.stat", "usage_usec 2000000\nuser_usec 1\nsystem_usec 1\n")
+    second = collector.collect([CONTAINER], now=102.0)
+    assert second.get(CONTAINER)["cpu_percent"] == pytest.approx(25.0)
+
+def test_v2_unlimited_memory_uses_host_memory(tmp_path):
+    root = tmp_path / "cgroup"
+    _write(root / "cgroup.controllers", "")
+    scope = root / "docker" / CONTAINER
+    _write(scope / "cpu.stat", "usage_usec 5\n")
+    _write(scope / "memory.current", f"{512 * MB}\n")
+    _write(scope / "memory.max", "max\n")
+    collector = CgroupCollector(str(root), proc_root=str(_proc(tmp_path)), cpu_count=1)
+
+    stats = collector.collect([CONTAINER], now=1.0).get(CONTAINER)
+    # MemTotal from the fake /proc/meminfo, 8 GiB
+    assert stats["memory_percent"] == pytest.approx(6.25)
+    # No processes, so no network namespace to read
+    assert stats["network_rx_bytes"] == 0
+
+def test_v1_cgroupfs_layout(tmp_path):
+    root = tmp_path / "cgroup"
+    cpu = root / "cpu,cpuacct" / "docker" / CONTAINER
+    memory = root / "memory" / "docker" / CONTAINER
+    _write(cpu / "cpuacct.usage", "3000000000\n")
+    _write(memory / "memory.usage_in_bytes", f"{100 * MB}\n")
+    # Page-rounded LONG_MAX means no limit
+    _write(memory / "memory.limit_in_bytes", "9223372036854771712\n")
+    _write(memory / "cgroup.procs", "4242\n")
+    collector = CgroupCollector(
+        str(root), proc_root=str(_proc(tmp_path)), cpu_count=4, host_memory=400 * MB
+    )
+    assert collector.version == 1
+
+    collector.collect([CONTAINER], now=10.0)
+    _write(cpu / "cpuacct.usage", "5000000000\n")
+    stats = collector.collect([CONTAINER], now=11.0).get(CONTAINER)
+    # Two CPU-seconds over one second on four CPUs
+    assert stats["cpu_percent"] == pytest.approx(50.0)
+    assert stats["memory_percent"] == pytest.approx(25.0)
+    assert stats["network_rx_bytes"] == 1024
+
+def test_v1_separate_cpuacct_and_removed_cgroup(tmp_path):
+    root = tmp_path / "cgroup"
+    cpu = root / "cpuacct" / "system.slice" / f"docker-{CONTAINER}.scope"
+    memory = root / "memory" / "system.slice" / f"docker-{CONTAINER}.scope"
+    _write(cpu / "cpuacct.usage", "1\n")
+    _write(memory / "memory.usage_in_bytes", f"{10 * MB}\n")
+    _write(memory / "memory.limit_in_bytes", f"{100 * MB}\n")
+    collector = CgroupCollector(
+        str(root), proc_root=str(_proc(tmp_path)), version=1, cpu_count=1
+    )
+
+    stats = collector.collect([CONTAINER], now=1.0).get(CONTAINER)
+    assert stats["memory_percent"] == pytest.approx(10.0)
+
+    (cpu / "cpuacct.usage").unlink()
+    assert len(collector.collect([CONTAINER], now=2.0)) == 0
@@ -0,0 +1,28 @@
+# tests/test_chunk_store.py
+import os
+from src.chunk_store import ChunkStore
+
+def _write(path, size: int):
+    with open(path, "wb") as f:
+        f.write(os.urandom(size))
+
+def test_pinned_chunks_survive_eviction_until_unpinned(tmp_path):
+    store = ChunkStore(str(tmp_path / "chunks"), max_bytes=2048, chunk_size=1024)
+    image = tmp_path / "pages-1.img"
+    _write(image, 8 * 1024)
+
+    entry = store.add_file(str(image), pin="send/m1/checkpoint")
+    # Larger than max_bytes, yet every chunk is still there to be sent
+    for digest, _ in entry["chunks"]:
+        assert len(store.get(digest)) == 1024
+
+    store.unpin("send/m1/checkpoint")
+    assert store.stats()["bytes"] <= 2048
+
+def test_unpinned_chunks_are_evicted_while_adding(tmp_path):
+    store = ChunkStore(str(tmp_path / "chunks"), max_bytes=2048, chunk_size=1024)
+    image = tmp_path / "pages-1.img"
+    _write(image, 8 * 1024)
+
+    entry = store.add_file(str(image))
+    assert not all(store.has(digest) for digest, _ in entry["chunks"])
@@ -0,0 +1,24 @@
+# tests/test_compression.py
+import pytest
+from src import compression
+from src.compression import CodecProfile, CompressionSelector
+
+@pytest.fixture(autouse=True)
+def eight_cores(monkeypatch):
+    monkeypatch.setattr(compression.psutil, "cpu_count", lambda *args, **kwargs: 8)
+
+def test_parallel_streams_make_compression_pay_off_on_fast_links():
+    selector = CompressionSelector([
+        CodecProfile("none", 0, float("inf"), 1.0),
+        CodecProfile("zlib", 1, 60e6, 0.45),
+    ])
+    # 100 MB/s link: one core compresses too slowly, four keep up
+    assert selector.select(100e6, ["none", "zlib"], cpu_available=4.0, streams=1) == ("none", 0)
+    assert selector.select(100e6, ["none", "zlib"], cpu_available=4.0, streams=4) == ("zlib", 1)
+
+def test_streams_do_not_exceed_idle_or_host_cores(monkeypatch):
+    selector = CompressionSelector()
+    profile = CodecProfile("zlib", 1, 60e6, 0.45)
+    assert selector.effective_throughput(profile, 1e9, 2.0, streams=8) == 120e6
+    monkeypatch.setattr(compression.psutil, "cpu_count", lambda *args, **kwargs: 1)
+    assert selector.effective_throughput(profile, 1e9, 2.0, streams=8) == 60e6
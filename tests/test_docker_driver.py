@@ -0,0 +1,104 @@
+# tests/test_docker_driver.py
+import json
+from contextlib import asynccontextmanager
+import pytest
+from aiohttp import web
+from src.docker_driver import AsyncDockerDriver, DockerAPIError
+
+CONTAINER = "c0ffee"
+
+def _fake_daemon(checkpoints: list) -> web.Application:
+    async def inspect(request):
+        if request.match_info["id"] != CONTAINER:
+            return web.json_response(
+                {"message": f"No such container: {request.match_info['id']}"}, status=404
+            )
+        return web.json_response({"Id": CONTAINER, "State": {"Running": True, "Pid": 4242}})
+
+    async def checkpoint(request):
+        if request.match_info["id"] != CONTAINER:
+            return web.json_response({"message": "No such container"}, status=404)
+        checkpoints.append(await request.json())
+        return web.Response(status=201)
+
+    async def start(request):
+        if request.query.get("checkpoint") == "broken":
+            # Daemons behind a proxy can answer with plain text
+            return web.Response(status=500, text="restore failed")
+        return web.Response(status=204)
+
+    async def events(request):
+        filters = json.loads(request.query.get("filters", "{}"))
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for action in ("checkpoint", "start"):
+            event = {"Type": "container", "Action": action, "id": CONTAINER,
+                     "filters": filters}
+            await response.write(json.dumps(event).encode() + b"\n")
+        return response
+
+    app = web.Application()
+    app.router.add_get("/v1.41/containers/{id}/json", inspect)
+    app.router.add_post("/v1.41/containers/{id}/checkpoints", checkpoint)
+    app.router.add_post("/v1.41/containers/{id}/start", start)
+    app.router.add_get("/v1.41/events", events)
+    return app
+
+@asynccontextmanager
+async def serve_daemon(tmp_path):
+    checkpoints = []
+    runner = web.AppRunner(_fake_daemon(checkpoints))
+    await runner.setup()
+    socket_path = str(tmp_path / "docker.sock")
+    await web.UnixSite(runner, socket_path).start()
+    driver = AsyncDockerDriver(f"unix://{socket_path}")
+    try:
+        yield driver, checkpoints
+    finally:
+        await driver.close()
+        await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_inspect_over_unix_socket(tmp_path):
+    async with serve_daemon(tmp_path) as (driver, _):
+        info = await driver.inspect(CONTAINER)
+        assert info["State"]["Running"]
+        assert await driver.get_pid(CONTAINER) == 4242
+        # Errors are logged and reported as missing
+        assert await driver.inspect("missing") is None
+        assert await driver.get_pid("missing") is None
+
+@pytest.mark.asyncio
+async def test_checkpoint_create_sends_engine_api_body(tmp_path):
+    async with serve_daemon(tmp_path) as (driver, checkpoints):
+        assert await driver.checkpoint_create(CONTAINER, "cp1", "/var/lib/limoce/cp", exit=False)
+        assert checkpoints == [
+            {"CheckpointID": "cp1", "Exit": False, "CheckpointDir": "/var/lib/limoce/cp"}
+        ]
+        assert not await driver.checkpoint_create("missing", "cp1")
+
+@pytest.mark.asyncio
+async def test_error_responses_map_to_docker_api_error(tmp_path):
+    async with serve_daemon(tmp_path) as (driver, _):
+        with pytest.raises(DockerAPIError) as error:
+            await driver._request("GET", "/containers/missing/json")
+        assert error.value.status == 404
+        assert error.value.message == "No such container: missing"
+
+        with pytest.raises(DockerAPIError) as error:
+            await driver._request(
+                "POST", f"/containers/{CONTAINER}/start", params={"checkpoint": "broken"}
+            )
+        assert error.value.status == 500
+        assert error.value.message == "restore failed"
+
+        assert await driver.start(CONTAINER, checkpoint="cp1")
+        assert not await driver.start(CONTAINER, checkpoint="broken")
+
+@pytest.mark.asyncio
+async def test_events_stream_with_filters(tmp_path):
+    async with serve_daemon(tmp_path) as (driver, _):
+        filters = {"container": [CONTAINER], "event": ["checkpoint", "start"]}
+        events = [event async for event in driver.events(filters=filters)]
+        assert [event["Action"] for event in events] == ["checkpoint", "start"]
+        assert events[0]["filters"] == filters
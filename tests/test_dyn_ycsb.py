@@ -0,0 +1,67 @@
+# tests/test_dyn_ycsb.py
+import os
+import stat
+from datetime import datetime, timedelta
+import pytest
+from src.benchmark.dyn_ycsb import DynYCSB
+from src.benchmark.metrics import StatusSample, _merge_timelines
+
+SECONDS = 50
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+# Prints a status line per second to stderr and a summary to stdout
+FAKE_YCSB = f"""#!/bin/sh
+i=1
+while [ $i -le {SECONDS} ]; do
+  echo "2024-05-01 12:00:00:000 $i sec: $((i * 100)) operations; 100.0 current ops/sec; [READ: Count=100, Max=900, Min=90, Avg=300.0, 90=500, 99=800]" >&2
+  i=$((i + 1))
+done
+echo "[OVERALL], Throughput(ops/sec), 100.0"
+echo "[READ], Operations, {SECONDS * 100}"
+echo "[READ], AverageLatency(us), 300.0"
+"""
+
+@pytest.fixture
+def ycsb_home(tmp_path):
+    bin_dir = tmp_path / "ycsb" / "bin"
+    bin_dir.mkdir(parents=True)
+    script = bin_dir / "ycsb"
+    script.write_text(FAKE_YCSB)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return str(tmp_path / "ycsb")
+
+@pytest.mark.asyncio
+async def test_timeline_is_bounded_while_every_sample_is_streamed(ycsb_home, tmp_path):
+    benchmark = DynYCSB(ycsb_home, metrics_dir=str(tmp_path / "metrics"))
+    metrics = await benchmark.execute_workload(
+        "basic", "workload",
+        on_status=lambda sample: benchmark.metrics_collector.add_status("A", sample),
+        timeline_window=10
+    )
+    assert [sample.elapsed for sample in metrics.timeline] == list(range(41, 51))
+    assert metrics.throughput == 100.0
+
+    benchmark.close()
+    status = benchmark.metrics_collector.get_status_dataframe()
+    assert len(status) == SECONDS
+    # An explicit metrics_dir is kept
+    assert os.path.isdir(tmp_path / "metrics" / "status")
+
+def test_close_removes_temporary_metrics_dir(ycsb_home):
+    benchmark = DynYCSB(ycsb_home)
+    metrics_dir = benchmark.metrics_dir
+    assert os.path.isdir(metrics_dir)
+    benchmark.close()
+    assert not os.path.exists(metrics_dir)
+
+def test_merged_timeline_keeps_latest_window():
+    def timeline(first, last):
+        return [
+            StatusSample(START + timedelta(seconds=second), second, second * 10, 10.0)
+            for second in range(first, last + 1)
+        ]
+
+    merged = _merge_timelines([timeline(1, 5), timeline(3, 6)])
+    assert [sample.elapsed for sample in merged] == [2, 3, 4, 5, 6]
+    assert merged[-1].throughput == 10.0
+    assert merged[1].throughput == 20.0
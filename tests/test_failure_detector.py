@@ -0,0 +1,50 @@
+# tests/test_failure_detector.py
+import pytest
+from src.failure_detector import HeartbeatScheduler, PhiAccrualDetector
+
+INTERVAL = 30.0
+
+def test_long_interval_device_not_suspected_before_second_heartbeat():
+    detector = PhiAccrualDetector()
+    detector.watch("node", now=0.0, interval=INTERVAL)
+    # The first reply is one round trip after the watch
+    detector.heartbeat("node", now=0.01)
+
+    assert detector.phi("node", now=20.0) < detector.threshold
+    assert detector.phi("node", now=29.0) < detector.threshold
+    # A late reply, up to the per-heartbeat timeout, is still no failure
+    assert detector.phi("node", now=45.0) < detector.threshold
+
+    detector.heartbeat("node", now=30.02)
+    assert detector.phi("node", now=60.0) < detector.threshold
+    # Several intervals of silence
+    assert detector.phi("node", now=150.0) > detector.threshold
+
+def test_first_reply_is_not_recorded_as_an_interval():
+    detector = PhiAccrualDetector()
+    detector.watch("node", now=0.0, interval=INTERVAL)
+    detector.heartbeat("node", now=0.01)
+    assert detector.stats(now=0.01)["node"]["samples"] == 2
+    detector.heartbeat("node", now=30.0)
+    assert detector.stats(now=30.0)["node"]["samples"] == 3
+
+def test_silent_device_is_suspected():
+    detector = PhiAccrualDetector()
+    detector.watch("node", now=0.0, interval=INTERVAL)
+    assert detector.phi("node", now=10.0) < detector.threshold
+    assert detector.phi("node", now=120.0) > detector.threshold
+
+class _InstantNetwork:
+    async def send_heartbeat(self, source_id, target_id, data, timeout=None):
+        return {"status": "ok"}
+
+@pytest.mark.asyncio
+async def test_scheduler_seeds_detector_with_its_interval():
+    detector = PhiAccrualDetector()
+    scheduler = HeartbeatScheduler(_InstantNetwork(), detector, "source", interval=INTERVAL)
+    scheduler.add_devices(["node"])
+    await scheduler.run_round()
+
+    stats = detector.stats()["node"]
+    assert stats["mean_interval"] == pytest.approx(INTERVAL)
+    assert not detector.is_suspected("node")
@@ -0,0 +1,107 @@
+# tests/test_migration_agent.py
+import hashlib
+import os
+from contextlib import asynccontextmanager
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from src.migration_agent import MigrationAgent
+
+MIGRATION_ID = "migration_1_abcd"
+IMAGE = "checkpoint_c1"
+
+@asynccontextmanager
+async def serve_agent(tmp_path):
+    agent = MigrationAgent(checkpoint_dir=str(tmp_path), max_chunk_bytes=1024)
+    client = TestClient(TestServer(agent.app))
+    await client.start_server()
+    try:
+        yield agent, client
+    finally:
+        await client.close()
+        await agent.stop()
+
+async def _send_segment(client, rel_path: str, data: bytes, offset: int, length: int):
+    response = await client.post(
+        f"/transfer_checkpoint/{MIGRATION_ID}/file",
+        data=data[offset:offset + length],
+        headers={
+            "X-Limoce-Image": IMAGE,
+            "X-Limoce-Path": rel_path,
+            "X-Limoce-Size": str(len(data)),
+            "X-Limoce-Offset": str(offset),
+            "X-Limoce-Length": str(length)
+        }
+    )
+    assert response.status == 200
+    return [offset, length, hashlib.sha256(data[offset:offset + length]).hexdigest()]
+
+async def _commit(client, files, symlinks=None):
+    return await client.post(
+        f"/transfer_checkpoint/{MIGRATION_ID}/commit",
+        json={
+            "checkpoint": {"checkpoint_path": f"/src/{MIGRATION_ID}/{IMAGE}"},
+            "files": files,
+            "symlinks": symlinks or {}
+        }
+    )
+
+@pytest.mark.asyncio
+async def test_resend_at_new_size_with_segments_out_of_order(tmp_path):
+    async with serve_agent(tmp_path) as (agent, client):
+        await _send_segment(client, "pages-1.img", b"a" * 8, 0, 8)
+
+        # The rewritten file is larger, and its second segment arrives first
+        rewritten = b"b" * 4 + b"c" * 8
+        segments = [
+            await _send_segment(client, "pages-1.img", rewritten, 4, 8),
+            await _send_segment(client, "pages-1.img", rewritten, 0, 4),
+        ]
+        response = await _commit(
+            client, {"pages-1.img": {"size": len(rewritten), "segments": sorted(segments)}}
+        )
+        assert response.status == 200, await response.text()
+        with open(tmp_path / MIGRATION_ID / IMAGE / "pages-1.img", "rb") as f:
+            assert f.read() == rewritten
+
+@pytest.mark.asyncio
+async def test_rejects_migration_id_outside_checkpoint_dir(tmp_path):
+    async with serve_agent(tmp_path) as (_, client):
+        response = await client.post(
+            "/transfer_checkpoint/..%2F../file",
+            data=b"x",
+            headers={"X-Limoce-Path": "x.img", "X-Limoce-Size": "1"}
+        )
+        assert response.status in (400, 404)
+
+@pytest.mark.asyncio
+async def test_rejects_symlink_leaving_migration_dir(tmp_path):
+    async with serve_agent(tmp_path) as (_, client):
+        response = await _commit(client, {}, {"parent": "../../../etc"})
+        assert response.status == 400
+        assert not os.path.lexists(tmp_path / MIGRATION_ID / IMAGE / "parent")
+
+@pytest.mark.asyncio
+async def test_accepts_parent_link_to_previous_round(tmp_path):
+    async with serve_agent(tmp_path) as (_, client):
+        response = await _commit(client, {}, {"parent": "../round_0"})
+        assert response.status == 200
+        assert os.readlink(tmp_path / MIGRATION_ID / IMAGE / "parent") == "../round_0"
+
+@pytest.mark.asyncio
+async def test_rejects_oversized_chunk(tmp_path):
+    async with serve_agent(tmp_path) as (_, client):
+        frame = b"0" * 64 + (4096).to_bytes(8, "big") + b"x" * 4096
+        response = await client.post(f"/transfer_checkpoint/{MIGRATION_ID}/chunks", data=frame)
+        assert response.status == 413
+
+@pytest.mark.asyncio
+async def test_expires_abandoned_transfers(tmp_path):
+    async with serve_agent(tmp_path) as (agent, client):
+        await _send_segment(client, "pages-1.img", b"a" * 8, 0, 8)
+        assert len(agent.incoming) == 1
+
+        incoming = next(iter(agent.incoming.values()))
+        expired = await agent.expire_incoming(now=incoming.updated + agent.incoming_ttl + 1)
+        assert expired == [f"{MIGRATION_ID}/{IMAGE}"]
+        assert not agent.incoming
+        assert not os.path.exists(tmp_path / MIGRATION_ID / IMAGE)
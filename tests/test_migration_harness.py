@@ -0,0 +1,84 @@
+# tests/test_migration_harness.py
+import glob
+import stat
+from types import SimpleNamespace
+import pytest
+from src.benchmark.dyn_ycsb import DynYCSB
+from src.benchmark.migration_harness import MigrationUnderLoad
+
+# Records its arguments, then prints a status line every 0.2s; the
+# timestamps do not parse, so they are taken as the lines arrive
+FAKE_YCSB = """#!/bin/sh
+echo "$@" > "$0.args.$$"
+i=1
+while [ $i -le 6 ]; do
+  sleep 0.2
+  echo "now $i sec: $((i * 20)) operations; 100.0 current ops/sec; [READ: Count=20, Avg=300.0, 99=800]" >&2
+  i=$((i + 1))
+done
+echo "[OVERALL], Throughput(ops/sec), 100.0"
+"""
+
+class _FakeCoordinator:
+    def __init__(self):
+        self.migrations = {}
+
+    async def start_migration(self, source_id, target_id, container_id, **options):
+        self.migrations["m1"] = SimpleNamespace(
+            status="completed", strategy="stop_and_copy", downtime=0.1,
+            bytes_transferred=0, error=None
+        )
+        return "m1"
+
+    def timing_breakdown(self, migration_id):
+        return {"phases": {}, "overlap": 0.0}
+
+@pytest.fixture
+def benchmark(tmp_path):
+    bin_dir = tmp_path / "ycsb" / "bin"
+    bin_dir.mkdir(parents=True)
+    script = bin_dir / "ycsb"
+    script.write_text(FAKE_YCSB)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    benchmark = DynYCSB(str(tmp_path / "ycsb"), metrics_dir=str(tmp_path / "metrics"))
+    yield benchmark
+    benchmark.close()
+
+def _shard_props(benchmark):
+    shards = []
+    for path in glob.glob(f"{benchmark.ycsb_home}/bin/ycsb.args.*"):
+        args = open(path).read().split()
+        shards.append(dict(
+            args[i + 1].split("=", 1) for i, arg in enumerate(args) if arg == "-p"
+        ))
+    return shards
+
+@pytest.mark.asyncio
+async def test_sharded_run_splits_workload_file_totals(benchmark, tmp_path):
+    workload_file = tmp_path / "workload"
+    workload_file.write_text("recordcount=1000\noperationcount=1001\ntarget=300\n")
+    harness = MigrationUnderLoad(benchmark, _FakeCoordinator())
+
+    impact = await harness.run(
+        "basic", str(workload_file), "source", "target", "c1",
+        migrate_after=0.5, clients=2
+    )
+
+    shards = _shard_props(benchmark)
+    assert sorted(int(p["operationcount"]) for p in shards) == [500, 501]
+    assert sorted(int(p["target"]) for p in shards) == [150, 150]
+    # Both clients' samples were streamed to the collector and merged
+    assert impact.baseline_throughput == pytest.approx(200.0)
+    assert impact.baseline_p99 == pytest.approx(800.0)
+    assert len(benchmark.metrics_collector.get_status_dataframe()) == 12
+
+@pytest.mark.asyncio
+async def test_sharded_run_without_operation_count_is_refused(benchmark, tmp_path):
+    workload_file = tmp_path / "workload"
+    workload_file.write_text("recordcount=1000\ntarget=300\n")
+    harness = MigrationUnderLoad(benchmark, _FakeCoordinator())
+    with pytest.raises(ValueError):
+        await harness.run(
+            "basic", str(workload_file), "source", "target", "c1",
+            migrate_after=0.5, clients=2
+        )
@@ -0,0 +1,48 @@
+# tests/test_migration_scheduler.py
+import asyncio
+from types import SimpleNamespace
+import pytest
+from src.migration_scheduler import MigrationScheduler
+
+class _RecordingCoordinator:
+    def __init__(self):
+        self.calls = []
+        self.migrations = {}
+
+    async def start_migration(self, source_id, target_id, container_id,
+                              strategy, pipelined, deadline=None):
+        migration_id = f"m{len(self.calls)}"
+        self.calls.append({"container_id": container_id, "deadline": deadline})
+        self.migrations[migration_id] = SimpleNamespace(status="completed")
+        await asyncio.sleep(0.05)
+        return migration_id
+
+@pytest.mark.asyncio
+async def test_remaining_completion_time_is_passed_to_coordinator():
+    coordinator = _RecordingCoordinator()
+    scheduler = MigrationScheduler(coordinator, max_concurrent=1)
+    first = scheduler.submit("a", "b", "c1", deadline=60.0)
+    second = scheduler.submit("a", "b", "c2", deadline=60.0)
+    await asyncio.gather(first, second)
+
+    assert 59.0 < coordinator.calls[0]["deadline"] <= 60.0
+    # The second waited behind the first; that wait is off its budget
+    assert coordinator.calls[1]["deadline"] < coordinator.calls[0]["deadline"]
+
+@pytest.mark.asyncio
+async def test_start_deadline_is_not_passed_as_completion_deadline():
+    coordinator = _RecordingCoordinator()
+    scheduler = MigrationScheduler(coordinator)
+    await scheduler.submit("a", "b", "c1", start_within=5.0)
+    assert coordinator.calls[0]["deadline"] is None
+
+@pytest.mark.asyncio
+async def test_queued_request_fails_once_its_completion_deadline_passes():
+    coordinator = _RecordingCoordinator()
+    scheduler = MigrationScheduler(coordinator, max_concurrent=1)
+    running = scheduler.submit("a", "b", "c1")
+    queued = scheduler.submit("a", "b", "c2", deadline=0.01)
+    with pytest.raises(TimeoutError):
+        await queued
+    await running
+    assert scheduler.stats()["expired"] == 1